@@ -0,0 +1,50 @@
+"""Shared fixtures for the benchmark scripts: recorded storage/*.jsonl rows as dataclasses."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from rot.core.types import Comment, Event, Evidence, Post, ThreadSnapshot, TrendCandidate
+
+STORAGE = Path("storage")
+
+
+def iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    if not path.exists():
+        return
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def snapshot_from_dict(d: Dict[str, Any]) -> ThreadSnapshot:
+    return ThreadSnapshot(
+        snapshot_ts=int(d["snapshot_ts"]),
+        post=Post(**d["post"]),
+        top_comments=[Comment(**c) for c in d.get("top_comments") or []],
+    )
+
+
+def load_snapshots(path: Path = STORAGE / "snapshots.jsonl") -> List[ThreadSnapshot]:
+    return [snapshot_from_dict(r["snapshot"]) for r in iter_jsonl(path) if "snapshot" in r]
+
+
+def event_from_dict(d: Dict[str, Any]) -> Event:
+    return Event(**{**d, "evidence": [Evidence(**ev) for ev in d.get("evidence") or []]})
+
+
+def candidates_from(snaps: List[ThreadSnapshot]) -> List[TrendCandidate]:
+    return [
+        TrendCandidate(
+            key=f"{s.post.subreddit}:{s.post.id}",
+            window_s=1800,
+            features={"score_rate": 0.25, "comment_rate": 0.125},
+            trend_score=0.5,
+            reason="rate_threshold",
+            snapshot=s,
+        )
+        for s in snaps
+    ]
@@ -0,0 +1,88 @@
+"""
+PRAW-shaped fake client with injected per-request latency, built from the
+recorded storage/snapshots.jsonl. Enough surface for RedditIngestor:
+reddit.subreddit(name).<listing>(limit=...), reddit.submission(id=...),
+submission.comments.replace_more(...) and slicing.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+from rot.core.types import ThreadSnapshot
+
+
+class FakeCommentForest:
+    def __init__(self, comments: List[SimpleNamespace], latency_s: float, counter: "Counter") -> None:
+        self._comments = comments
+        self._latency_s = latency_s
+        self._counter = counter
+
+    def replace_more(self, limit: int = 0) -> List[object]:
+        self._counter.hit()
+        time.sleep(self._latency_s)
+        return []
+
+    def __getitem__(self, item):
+        return self._comments[item]
+
+
+class FakeSubmission(SimpleNamespace):
+    pass
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.n = 0
+        self._lock = threading.Lock()
+
+    def hit(self) -> None:
+        with self._lock:
+            self.n += 1
+
+
+class FakeSubreddit:
+    def __init__(self, client: "FakeReddit", name: str) -> None:
+        self._client = client
+        self._name = name
+
+    def _listing(self, limit: int):
+        self._client.requests.hit()
+        time.sleep(self._client.latency_s)
+        return iter(self._client.posts.get(self._name, [])[:limit])
+
+    hot = rising = new = top = lambda self, limit=None: self._listing(limit or 100)
+
+
+class FakeReddit:
+    def __init__(self, snapshots: List[ThreadSnapshot], latency_s: float = 0.05) -> None:
+        self.latency_s = latency_s
+        self.requests = Counter()
+        self.posts: Dict[str, List[FakeSubmission]] = {}
+        self._by_id: Dict[str, FakeSubmission] = {}
+        for s in snapshots:
+            p = s.post
+            if p.id in self._by_id:
+                continue
+            comments = [
+                SimpleNamespace(id=c.id, created_utc=c.created_utc, author=SimpleNamespace(name=c.author),
+                                body=c.body, score=c.score)
+                for c in s.top_comments
+            ] or [SimpleNamespace(id=f"{p.id}_c0", created_utc=p.created_utc, author=None, body="first", score=1)]
+            sub = FakeSubmission(
+                id=p.id, created_utc=p.created_utc, subreddit=p.subreddit, title=p.title, selftext=p.selftext,
+                url=p.url, score=p.score, num_comments=p.num_comments, upvote_ratio=p.upvote_ratio,
+                author=SimpleNamespace(name=p.author), permalink=p.permalink.replace("https://www.reddit.com", ""),
+                link_flair_text=p.flair, crosspost_parent=None,
+            )
+            sub.comments = FakeCommentForest(comments, latency_s, self.requests)
+            self._by_id[p.id] = sub
+            self.posts.setdefault(p.subreddit, []).append(sub)
+
+    def subreddit(self, name: str) -> FakeSubreddit:
+        return FakeSubreddit(self, name)
+
+    def submission(self, id: str) -> FakeSubmission:
+        return self._by_id[id]
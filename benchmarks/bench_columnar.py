@@ -0,0 +1,94 @@
+"""
+snapshots.jsonl vs the partitioned Parquet layout: file size, conversion
+time, and a typical historical query, "score trajectory for post X"
+(snapshot_ts, score, num_comments of one post, in time order).
+
+The recorded storage/snapshots.jsonl is replayed `--cycles` times with
+shifted timestamps and drifting scores to get a realistic multi-day file.
+
+    PYTHONPATH=src python benchmarks/bench_columnar.py [--cycles 2000]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pyarrow.dataset as ds
+
+from _data import STORAGE, iter_jsonl
+from rot.core.columnar import convert_jsonl
+
+
+def _synth(src: Path, dst: Path, cycles: int) -> int:
+    rows = list(iter_jsonl(src))
+    n = 0
+    with dst.open("w", encoding="utf-8") as f:
+        for c in range(cycles):
+            shift = c * 1200  # one poll every 20 minutes
+            for r in rows:
+                snap = r["snapshot"]
+                post = dict(snap["post"], score=snap["post"]["score"] + c, num_comments=snap["post"]["num_comments"] + c // 2)
+                rec = {
+                    "run_id": f"run_{snap['snapshot_ts'] + shift}",
+                    "snapshot": dict(snap, snapshot_ts=snap["snapshot_ts"] + shift, post=post),
+                    "ts": r["ts"] + shift,
+                }
+                f.write(json.dumps(rec) + "\n")
+                n += 1
+    return n
+
+
+def _du(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cycles", type=int, default=2000)
+    ap.add_argument("--post", default="1q41fao")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "snapshots.jsonl"
+        n = _synth(STORAGE / "snapshots.jsonl", src, args.cycles)
+
+        t0 = time.perf_counter()
+        convert_jsonl(str(src), os.path.join(tmp, "columnar"))
+        t_conv = time.perf_counter() - t0
+        root = Path(tmp) / "columnar" / "snapshots"
+
+        t0 = time.perf_counter()
+        traj_jsonl = []
+        with src.open("r", encoding="utf-8") as f:
+            for line in f:
+                r = json.loads(line)
+                p = r["snapshot"]["post"]
+                if p["id"] == args.post:
+                    traj_jsonl.append((r["snapshot"]["snapshot_ts"], p["score"], p["num_comments"]))
+        traj_jsonl.sort()
+        t_jsonl = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        dset = ds.dataset(root, format="parquet", partitioning="hive")
+        table = dset.to_table(
+            columns=["snapshot.snapshot_ts", "snapshot.post.score", "snapshot.post.num_comments"],
+            filter=ds.field("snapshot.post.id") == args.post,
+        ).sort_by("snapshot.snapshot_ts")
+        traj_pq = list(zip(*(table.column(i).to_pylist() for i in range(3))))
+        t_pq = time.perf_counter() - t0
+
+        assert traj_pq == traj_jsonl and traj_jsonl, "trajectories differ"
+
+        size_j, size_p = src.stat().st_size, _du(root)
+        print(f"{n} snapshot rows over {len(list(root.iterdir()))} day partitions; post {args.post}: {len(traj_jsonl)} points")
+        print(f"size      jsonl {size_j / 2**20:8.1f} MiB   parquet {size_p / 2**20:8.1f} MiB  x{size_j / size_p:.1f}")
+        print(f"query     jsonl {t_jsonl * 1000:8.0f} ms    parquet {t_pq * 1000:8.0f} ms   x{t_jsonl / t_pq:.1f}")
+        print(f"convert   {t_conv:.1f}s ({n / t_conv:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
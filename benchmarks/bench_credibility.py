@@ -0,0 +1,126 @@
+"""
+CredibilityScorer on storage/events.jsonl, then on a long synthetic history.
+
+1. The recorded events, scored run by run (authors joined from
+   storage/snapshots.jsonl, since older events don't carry them).
+2. The same events replayed as `--runs` runs of `--batch` events over 30
+   simulated days: fresh post ids, a Zipf-distributed pool of authors,
+   random-walk prices so pending mentions resolve into hits and misses.
+   Reports score_many() time per batch early and late in the history (flat
+   means updates stay O(new events)), events/s and the index size.
+
+    PYTHONPATH=src python benchmarks/bench_credibility.py [--runs 500] [--batch 200] [--authors 5000]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import replace
+from typing import Dict, List
+
+import numpy as np
+
+from _data import STORAGE, event_from_dict, iter_jsonl
+from rot.core.types import Event, Evidence
+from rot.credibility.scorer import CredibilityScorer
+
+
+def _recorded() -> Dict[int, List[Event]]:
+    authors = {}
+    for r in iter_jsonl(STORAGE / "snapshots.jsonl"):
+        post = r.get("snapshot", {}).get("post", {})
+        authors[post.get("id")] = post
+    runs: Dict[int, List[Event]] = defaultdict(list)
+    for r in iter_jsonl(STORAGE / "events.jsonl"):
+        e = event_from_dict(r["event"])
+        if "post" not in e.meta and e.evidence:
+            post = authors.get(e.evidence[0].post_id, {})
+            meta = {"author": post.get("author", ""), "created_utc": post.get("created_utc"), "is_crosspost": post.get("is_crosspost", False)}
+            e = replace(e, meta={**e.meta, "post": meta})
+        runs[int(r.get("ts", 0))].append(e)
+    return runs
+
+
+def _synthetic(template: List[Event], args: argparse.Namespace, rng: random.Random):
+    """Yield (now, events) per run."""
+    authors = [f"user{i}" for i in range(args.authors)]
+    weights = 1.0 / np.arange(1, args.authors + 1) ** 1.1
+    pool = rng.choices(authors, weights=weights.tolist(), k=args.runs * args.batch)
+    symbols = sorted({s for e in template for s in e.entities}) or ["SPY"]
+    price = {s: 100.0 for s in symbols}
+    subs = sorted({e.evidence[0].subreddit for e in template if e.evidence}) or ["wallstreetbets"]
+    step = 30 * 86400 // args.runs
+    now = 1_760_000_000
+    n = 0
+    for run in range(args.runs):
+        now += step
+        for s in symbols:
+            price[s] *= float(np.exp(rng.gauss(0.0, 0.02)))
+        batch = []
+        for _ in range(args.batch):
+            t = template[n % len(template)]
+            ents = t.entities or [rng.choice(symbols)]
+            batch.append(
+                replace(
+                    t,
+                    entities=ents,
+                    evidence=[Evidence(f"p{n}", "", rng.choice(subs), t.evidence[0].excerpt if t.evidence else "")],
+                    meta={
+                        "post": {"author": pool[n], "created_utc": now - rng.randrange(3600), "is_crosspost": rng.random() < 0.05},
+                        "market": {s: {"symbol": s, "last_close": price[s]} for s in ents},
+                    },
+                )
+            )
+            n += 1
+        yield now, batch
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=500)
+    ap.add_argument("--batch", type=int, default=200)
+    ap.add_argument("--authors", type=int, default=5000)
+    args = ap.parse_args()
+
+    runs = _recorded()
+    template = [e for evs in runs.values() for e in evs]
+    scorer = CredibilityScorer()
+    t0 = time.perf_counter()
+    scored = [e for now, evs in sorted(runs.items()) for e in scorer.score_many(evs, now=now or None)]
+    dt = time.perf_counter() - t0
+    print(f"recorded: {len(scored)} events in {len(runs)} runs, {dt * 1000:.1f} ms")
+    for e in sorted(scored, key=lambda e: -e.meta["credibility"]["score"])[:3]:
+        print(f"  {e.evidence[0].subreddit:<15} {','.join(e.entities) or '-':<18} {e.meta['credibility']}")
+    if not template:
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "reputation.sqlite3")
+        scorer = CredibilityScorer(path=path)
+        times = []
+        t0 = time.perf_counter()
+        for now, batch in _synthetic(template, args, random.Random(3)):
+            t1 = time.perf_counter()
+            out = scorer.score_many(batch, now=now)
+            times.append(time.perf_counter() - t1)
+        wall = time.perf_counter() - t0
+        total = args.runs * args.batch
+        tenth = max(1, len(times) // 10)
+        early, late = np.median(times[:tenth]) * 1000, np.median(times[-tenth:]) * 1000
+        score_s = sum(times)
+        print(f"\nsynthetic: {total:,} events, {args.runs} runs of {args.batch}, {args.authors:,} authors")
+        print(f"score_many per batch: p50 {np.median(times) * 1000:.1f} ms  p99 {np.percentile(times, 99) * 1000:.1f} ms"
+              f"  first 10% {early:.1f} ms  last 10% {late:.1f} ms")
+        print(f"{total / score_s:,.0f} events/s scored (wall incl. generation {wall:.1f}s)")
+        print(f"index {scorer.index.stats()}  {os.path.getsize(path) / 2**20:.1f} MiB")
+        c = np.array([e.meta["credibility"]["score"] for e in out])
+        print(f"last batch scores: min {c.min():.3f} p50 {np.median(c):.3f} max {c.max():.3f}")
+        scorer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Near-duplicate clustering (rot.extract.dedupe).
+
+1. Recorded: the candidates of each poll in storage/snapshots.jsonl through
+   EventClusterer, polls in order: events before/after and merged clusters.
+2. Synthetic stream: `--posts` posts, one every `--every` seconds, drawn from
+   stories built out of the recorded vocabulary; 30% are duplicates of an
+   earlier story (verbatim cross-posts or reposts with ~10% of the words
+   changed). Reports NearDuplicateIndex.add() cost per post as the window
+   fills, pair precision/recall against the true stories, and the cost of
+   brute-force exact Jaccard against the whole window for comparison.
+
+    PYTHONPATH=src python benchmarks/bench_dedupe.py [--posts 20000] [--every 2]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from collections import defaultdict
+from itertools import groupby
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from _data import candidates_from, load_snapshots
+from rot.core.types import Evidence
+from rot.extract.dedupe import EventClusterer, NearDuplicateIndex, normalize, shingles
+from rot.extract.event_builder import EventBuilder
+
+
+def _recorded() -> List[str]:
+    snaps = load_snapshots()
+    builder = EventBuilder(clusterer=EventClusterer())
+    before = after = 0
+    for _, group in groupby(sorted(snaps, key=lambda s: s.snapshot_ts), key=lambda s: s.snapshot_ts):
+        pairs = [(c, e) for c in candidates_from(list(group)) for e in builder.from_candidate(c)]
+        events = builder.merge_duplicates(pairs)
+        before, after = before + len(pairs), after + len(events)
+        for e in events:
+            cl = e.meta.get("cluster")
+            if cl and cl["merged"] > 1:
+                print(f"  merged {cl['merged']} {cl['subreddits']}: " + " | ".join(ev.excerpt[:40] for ev in e.evidence[:3]))
+    print(f"recorded: {before} events -> {after} after clustering")
+    return [normalize(s.post.title, s.post.selftext) for s in snaps]
+
+
+def _stream(vocab: List[str], args: argparse.Namespace, rng: random.Random) -> List[Tuple[int, str]]:
+    """(story id, text) per post."""
+    stories: List[str] = []
+    out = []
+    for _ in range(args.posts):
+        if stories and rng.random() < 0.3:
+            sid = rng.randrange(max(0, len(stories) - 200), len(stories))  # recent stories get reposted
+            words = stories[sid].split()
+            if rng.random() < 0.5:
+                words = [rng.choice(vocab) if rng.random() < 0.1 else w for w in words]
+            out.append((sid, " ".join(words)))
+        else:
+            stories.append(" ".join(rng.choices(vocab, k=rng.randint(12, 80))))
+            out.append((len(stories) - 1, stories[-1]))
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--posts", type=int, default=20000)
+    ap.add_argument("--every", type=int, default=2, help="seconds between posts (window is 6h)")
+    ap.add_argument("--brute", type=int, default=40, help="posts to time with brute-force Jaccard")
+    args = ap.parse_args()
+
+    texts = _recorded()
+    vocab = sorted({w for t in texts for w in re.findall(r"[a-z]{3,}", t)}) or ["word"]
+    rng = random.Random(5)
+    stream = _stream(vocab, args, rng)
+
+    index = NearDuplicateIndex()
+    cluster_of: Dict[int, str] = {}
+    costs = []
+    for i, (_, text) in enumerate(stream):
+        t0 = time.perf_counter()
+        cluster_of[i] = index.add(f"p{i}", i * args.every, text, (), Evidence(f"p{i}", "", "s", text[:40]))
+        costs.append(time.perf_counter() - t0)
+
+    window = index.window_s // args.every
+    print(f"\nsynthetic: {args.posts:,} posts, window {window:,} posts, {len(vocab):,}-word vocabulary")
+    for lo, hi in ((0, window // 10), (window // 2, window), (args.posts - window // 10, args.posts)):
+        if hi > lo:
+            print(f"  add() posts {lo:>6}-{hi:<6} mean {np.mean(costs[lo:hi]) * 1e6:7.1f} us  p99 {np.percentile(costs[lo:hi], 99) * 1e6:7.1f} us")
+
+    # pair precision/recall within the window
+    tp = fp = fn = 0
+    by_story: Dict[int, List[int]] = defaultdict(list)
+    for i, (sid, _) in enumerate(stream):
+        by_story[sid].append(i)
+    for i, (sid, _) in enumerate(stream):
+        for j in by_story[sid]:
+            if i < j <= i + window:
+                tp, fn = tp + (cluster_of[i] == cluster_of[j]), fn + (cluster_of[i] != cluster_of[j])
+    members: Dict[str, List[int]] = defaultdict(list)
+    for i, cid in cluster_of.items():
+        members[cid].append(i)
+    for ids in members.values():
+        for a in range(len(ids)):
+            for b in range(a + 1, len(ids)):
+                if ids[b] - ids[a] <= window and stream[ids[a]][0] != stream[ids[b]][0]:
+                    fp += 1
+    print(f"  duplicate pairs: recall {tp / max(1, tp + fn):.3f}  precision {tp / max(1, tp + fp):.3f}  "
+          f"({len(members):,} clusters for {len(by_story):,} stories)")
+
+    # brute force: exact Jaccard of each new post against every post in the window
+    sets = [set(shingles(t).tolist()) for _, t in stream[-window - args.brute :]]
+    t0 = time.perf_counter()
+    for k in range(window, len(sets)):
+        s = sets[k]
+        max(len(s & o) / len(s | o) for o in sets[k - window : k])
+    brute = (time.perf_counter() - t0) / max(1, len(sets) - window)
+    print(f"  brute-force Jaccard vs the window: {brute * 1e6:,.0f} us/post "
+          f"({brute / np.mean(costs[-window // 10:]):.0f}x the LSH index)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+MarketEnricher round-trips for one run: per-event, per-symbol fetching (the
+old Ticker.history() pattern) vs enrich_events() with one batched provider
+call. Uses InMemoryProvider with injected latency; no network.
+
+    PYTHONPATH=src python benchmarks/bench_enrich_batch.py [--events 200] [--latency 0.05]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, Sequence
+
+from rot.core.types import Event
+from rot.market.enricher import MarketEnricher
+from rot.market.provider import InMemoryProvider, MarketDataProvider
+
+
+class PerSymbol(MarketDataProvider):
+    """One provider round-trip per symbol, like the old _fetch()."""
+
+    def __init__(self, inner: InMemoryProvider) -> None:
+        super().__init__()
+        self.inner = inner
+
+    def _fetch_quotes(self, symbols: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        for s in symbols:
+            out.update(self.inner.quotes([s]))
+        return out
+
+
+def _events(n: int, universe, rng) -> list:
+    return [
+        Event("other", rng.sample(universe, 3), "unknown", "unknown", [], 0.3, meta={})
+        for _ in range(n)
+    ]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=200)
+    ap.add_argument("--symbols", type=int, default=120)
+    ap.add_argument("--latency", type=float, default=0.05)
+    args = ap.parse_args()
+
+    rng = random.Random(1)
+    universe = [f"S{i:03d}" for i in range(args.symbols)]
+    closes = {s: [rng.uniform(5, 500) for _ in range(5)] for s in universe}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_fake = InMemoryProvider(closes, latency_s=args.latency)
+        legacy = MarketEnricher(cache_path=os.path.join(tmp, "a.json"), provider=PerSymbol(legacy_fake))
+        evs = _events(args.events, universe, random.Random(2))
+        t0 = time.perf_counter()
+        for e in evs:
+            legacy.enrich_event(e)
+        t_legacy = time.perf_counter() - t0
+
+        batch_fake = InMemoryProvider(closes, latency_s=args.latency)
+        batch = MarketEnricher(cache_path=os.path.join(tmp, "b.json"), provider=batch_fake)
+        evs2 = _events(args.events, universe, random.Random(2))
+        t0 = time.perf_counter()
+        batch.enrich_events(evs2)
+        t_batch = time.perf_counter() - t0
+
+    assert [e.meta["market"] for e in evs] == [e.meta["market"] for e in evs2]
+    print(f"{args.events} events over {args.symbols} symbols, {args.latency * 1000:.0f}ms per request")
+    print(f"per-event/per-symbol  {len(legacy_fake.calls):>5} requests  {t_legacy:8.2f}s")
+    print(f"enrich_events batch   {len(batch_fake.calls):>5} requests  {t_batch:8.2f}s  x{t_legacy / t_batch:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Entity extraction throughput over the recorded storage/snapshots.jsonl posts:
+the original per-call regex extraction (run twice per candidate, as the runner
+used to) vs EntityExtractor cold (cache off), batched, and warm (cached).
+
+    PYTHONPATH=src python benchmarks/bench_extract.py [--repeat N]
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from typing import List
+
+from _data import load_snapshots
+from rot.extract.entity_extractor import EntityExtractor
+from rot.market.enricher import ALIAS_MAP, NON_EQUITY_TOKENS
+
+_TICKER_RE = re.compile(r"(?:\$([A-Z]{1,5})\b|\b([A-Z]{1,5})\b)")
+
+
+def legacy_extract(title: str, body: str) -> List[str]:
+    matches = _TICKER_RE.findall(f"{title}\n{body}")
+    dollar = [a for (a, b) in matches if a]
+    bare = [b for (a, b) in matches if b]
+    out = []
+    for s in dollar if dollar else bare:
+        s = ALIAS_MAP.get(s.upper(), s.upper())
+        if s in NON_EQUITY_TOKENS or len(s) == 1:
+            continue
+        out.append(s)
+    return sorted(set(out))[:5]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    posts = [s.post for s in load_snapshots()]
+    n = len(posts) * args.repeat
+
+    # Without company names the engine must reproduce the regex exactly.
+    plain = EntityExtractor(names={}, cache_size=0)
+    assert [plain.extract_post(p) for p in posts] == [legacy_extract(p.title, p.selftext) for p in posts]
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        for p in posts:
+            legacy_extract(p.title, p.selftext)
+            legacy_extract(p.title, p.selftext)
+    t_legacy = time.perf_counter() - t0
+
+    cold = EntityExtractor(cache_size=0)
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        for p in posts:
+            cold.extract_post(p)
+    t_cold = time.perf_counter() - t0
+
+    warm = EntityExtractor()
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        warm.extract_many(posts)  # batch; 2nd lookup per candidate is a cache hit
+        warm.extract_many(posts)
+    t_warm = time.perf_counter() - t0
+
+    named = sum(1 for p in posts if cold.extract_post(p) != legacy_extract(p.title, p.selftext))
+    print(f"{len(posts)} posts x{args.repeat}; company-name matches changed {named} posts")
+    print(f"legacy regex x2       {n / t_legacy:>12,.0f} posts/s")
+    print(f"extractor (no cache)  {n / t_cold:>12,.0f} posts/s")
+    print(f"extractor batch+cache {n / t_warm:>12,.0f} posts/s  x{t_legacy / t_warm:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+RedditIngestor.poll wall-clock: serial vs max_workers>1 against a fake
+PRAW-like client with injected latency (no network). Also checks that both
+modes return identical snapshots and SeenStore state, and counts the clients
+(OAuth sessions) created over `--polls` polls: the worker pool and its
+per-thread clients live as long as the ingestor.
+
+    PYTHONPATH=src python benchmarks/bench_ingest_poll.py [--latency 0.05] [--workers 8] [--polls 3]
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from _data import load_snapshots
+from _fake_reddit import FakeReddit
+from rot.ingest.reddit_ingestor import RedditIngestor
+
+
+def _poll(snaps, workers: int, latency: float, subs, limit: int, polls: int):
+    fake = FakeReddit(snaps, latency_s=latency)
+    clients = []
+
+    def factory():
+        clients.append(fake)
+        return fake
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ing = RedditIngestor(
+            subreddits=subs,
+            listing="hot",
+            limit_per_sub=limit,
+            include_comments=True,
+            state_path=str(Path(tmp) / "seen.json"),
+            max_workers=workers,
+            reddit_factory=factory,
+        )
+        t0 = time.perf_counter()
+        out = ing.poll()
+        dt = time.perf_counter() - t0
+        seen = dict(ing.seen._data)
+        for _ in range(polls - 1):
+            ing.poll()
+        ing.close()
+    return out, seen, dt, fake.requests.n, len(clients)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency", type=float, default=0.05)
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--limit", type=int, default=50)
+    ap.add_argument("--polls", type=int, default=3)
+    args = ap.parse_args()
+
+    snaps = load_snapshots()
+    subs = sorted({s.post.subreddit for s in snaps})
+
+    base, seen_a, t_serial, n, _ = _poll(snaps, 1, args.latency, subs, args.limit, args.polls)
+    conc, seen_b, t_conc, _, clients = _poll(snaps, args.workers, args.latency, subs, args.limit, args.polls)
+
+    strip = lambda xs: [(s.post, s.top_comments) for s in xs]  # noqa: E731
+    assert strip(base) == strip(conc), "concurrent poll changed snapshots"
+    assert seen_a.keys() == seen_b.keys(), "concurrent poll changed SeenStore"
+
+    print(f"{len(subs)} subreddits, {len(base)} snapshots, {n} requests @ {args.latency * 1000:.0f}ms")
+    print(f"serial        {t_serial:8.2f}s")
+    print(f"workers={args.workers:<4} {t_conc:8.2f}s  x{t_serial / t_conc:.1f}")
+    print(f"clients created over {args.polls} polls: {clients} (at most 1 + workers)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+JsonlLogger write throughput: unbuffered (open/append/close per record) vs
+buffered mode at each durability level.
+
+    PYTHONPATH=src python benchmarks/bench_jsonl_logger.py [--records N]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from rot.core.logging import JsonlLogger
+
+
+def _sample_records(path: Path, limit: int = 200) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    if path.exists():
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    out.append(json.loads(line))
+                if len(out) >= limit:
+                    break
+    if not out:
+        out = [{"run_id": "run_0", "snapshot": {"snapshot_ts": 0, "post": {"id": "x", "title": "t" * 80}}}]
+    return out
+
+
+def _run(records: List[Dict[str, Any]], n: int, **logger_kw: Any) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        with JsonlLogger(root=tmp, **logger_kw) as log:
+            for i in range(n):
+                log.write("snapshots", records[i % len(records)])
+        return n / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--records", type=int, default=20000)
+    ap.add_argument("--source", default="storage/snapshots.jsonl")
+    args = ap.parse_args()
+
+    records = _sample_records(Path(args.source))
+    cases = [
+        ("unbuffered", {}),
+        ("buffered/none", {"buffered": True, "durability": "none"}),
+        ("buffered/flush", {"buffered": True, "durability": "flush"}),
+        ("buffered/fsync", {"buffered": True, "durability": "fsync"}),
+    ]
+
+    base = None
+    for name, kw in cases:
+        rps = _run(records, args.records, **kw)
+        base = base or rps
+        print(f"{name:<16} {rps:>12,.0f} records/s  x{rps / base:.1f}")
+
+
+if __name__ == "__main__":
+    main()
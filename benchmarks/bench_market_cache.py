@@ -0,0 +1,199 @@
+"""
+MarketEnricher with 5k cached symbols: the old whole-file JSON cache vs the
+KVCache backends (rot.core.kvcache).
+
+1. Throughput: `--runs` runs of `--batch` events (3 tickers each) drawn from
+   `--symbols` cached symbols, with `--new` never-seen symbols per run (so
+   every run writes). Reports events/s and bytes written per run for
+     legacy   the previous enricher: one dict, the whole file rewritten
+              pretty-printed after every run with a miss
+     json     KVCache: compact, atomic, expired entries dropped
+     sqlite   SqliteKVCache, write-through of the new symbols only; "cold"
+              is a fresh process (empty memory layer) per run
+2. Concurrency: `--procs` processes each writing `--writes` batches of new
+   keys to one shared cache file and reading back a sample; reports writes/s
+   and how many written keys survived.
+
+    PYTHONPATH=src python benchmarks/bench_market_cache.py [--symbols 5000] [--runs 50] [--procs 4]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import random
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from rot.core.kvcache import KVCache, open_kv_cache
+from rot.core.types import Event
+from rot.market.enricher import MarketEnricher
+from rot.market.provider import InMemoryProvider
+
+
+class LegacyEnricher(MarketEnricher):
+    """The enricher before KVCache: a dict, rewritten with indent=2 on every miss."""
+
+    def __init__(self, cache_path: str, provider) -> None:
+        super().__init__(cache_path=cache_path, provider=provider, cache=KVCache(cache_path))
+        p = Path(cache_path)
+        self._legacy_path = p
+        self._legacy = json.loads(p.read_text(encoding="utf-8")) if p.exists() else {}
+
+    def prefetch(self, symbols: Iterable[str]) -> Dict[str, Any]:
+        market: Dict[str, Any] = {}
+        missing: Dict[str, None] = {}
+        now = time.time()
+        for raw in symbols:
+            sym = self.get_symbol(raw)
+            if not sym or sym in market:
+                continue
+            entry = self._legacy.get(sym)
+            if isinstance(entry, dict) and now - entry.get("ts", 0) <= self.ttl_s:
+                market[sym] = entry["data"]
+            else:
+                missing[sym] = None
+        if missing:
+            fetched = self.provider.quotes(list(missing))
+            for sym in missing:
+                market[sym] = fetched.get(sym) or {"symbol": sym, "price_error": "no data returned"}
+                self._legacy[sym] = {"ts": int(now), "data": market[sym]}
+            self._legacy_path.write_text(json.dumps(self._legacy, ensure_ascii=False, indent=2), encoding="utf-8")
+        return market
+
+
+def _quotes(symbols: List[str], rng: random.Random) -> Dict[str, List[float]]:
+    return {s: [rng.uniform(5, 500) for _ in range(5)] for s in symbols}
+
+
+def _runs(args: argparse.Namespace, universe: List[str]) -> List[List[Event]]:
+    rng = random.Random(2)
+    out = []
+    for r in range(args.runs):
+        fresh = [f"N{r:03d}{i:02d}" for i in range(args.new)]
+        evs = [Event("other", rng.sample(universe, 3), "unknown", "unknown", [], 0.3, meta={}) for _ in range(args.batch)]
+        for i, sym in enumerate(fresh):
+            evs[i % len(evs)].entities.append(sym)
+        out.append(evs)
+    return out
+
+
+def _seed(path: str, provider: InMemoryProvider, universe: List[str]) -> None:
+    cache = open_kv_cache(path, namespace="market")
+    cache.put_many(provider.quotes(universe))
+    cache.close()
+
+
+def _wchar() -> int:
+    """Bytes this process has passed to write() so far (Linux), else 0."""
+    try:
+        with open("/proc/self/io", encoding="ascii") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("wchar"))
+    except (OSError, StopIteration):
+        return 0
+
+
+def _throughput(args: argparse.Namespace, tmp: Path) -> None:
+    rng = random.Random(1)
+    universe = [f"S{i:04d}" for i in range(args.symbols)]
+    runs = _runs(args, universe)
+    closes = _quotes(universe + [s for evs in runs for e in evs for s in e.entities if s.startswith("N")], rng)
+    events = args.runs * args.batch
+    print(f"{args.symbols:,} cached symbols, {args.runs} runs of {args.batch} events, {args.new} new symbols per run")
+
+    results = {}
+    for name in ("legacy", "json", "sqlite warm", "sqlite cold"):
+        provider = InMemoryProvider(closes)
+        path = tmp / name.replace(" ", "_") / ("market_cache.sqlite3" if name.startswith("sqlite") else "market_cache.json")
+        path.parent.mkdir(exist_ok=True)
+        if name == "legacy":
+            path.write_text(json.dumps({s: {"ts": int(time.time()), "data": d} for s, d in provider.quotes(universe).items()}, indent=2))
+        else:
+            _seed(str(path), provider, universe)
+        provider.calls.clear()
+
+        def make() -> MarketEnricher:
+            if name == "legacy":
+                return LegacyEnricher(str(path), provider)
+            return MarketEnricher(cache_path=str(path), provider=provider)
+
+        enricher = make()
+        written = 0
+        t0 = time.perf_counter()
+        for evs in runs:
+            if name == "sqlite cold":
+                enricher.close()
+                enricher = make()
+            batch = [replace(e, entities=list(e.entities), meta={}) for e in evs]
+            before = _wchar()
+            out = enricher.enrich_events(batch)
+            written += _wchar() - before
+        dt = time.perf_counter() - t0
+        enricher.close()
+        results[name] = out
+        print(f"  {name:<12} {events / dt:>9,.0f} events/s  {dt / args.runs * 1000:7.2f} ms/run  "
+              f"{written / args.runs / 1024:8.1f} KiB written/run  {len(provider.calls)} provider calls")
+
+    base = [e.meta["market"] for e in results["legacy"]]
+    for name, out in results.items():
+        assert [e.meta["market"] for e in out] == base, name
+
+
+def _worker(path: str, proc: int, writes: int, batch: int, q) -> None:
+    cache = open_kv_cache(path, namespace="market")
+    rng = random.Random(proc)
+    mine: List[str] = []
+    t0 = time.perf_counter()
+    for w in range(writes):
+        keys = [f"P{proc}-{w}-{i}" for i in range(batch)]
+        cache.put_many({k: {"symbol": k, "last_close": rng.random()} for k in keys})
+        mine += keys
+        cache.get_many(rng.sample(mine, min(len(mine), 200)))
+    q.put((mine, time.perf_counter() - t0))
+    cache.close()
+
+
+def _concurrency(args: argparse.Namespace, tmp: Path) -> None:
+    print(f"\n{args.procs} processes x {args.writes} put_many({args.batch_keys}) + get_many(200) on one file")
+    ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+    for name, fname in (("json", "shared.json"), ("sqlite", "shared.sqlite3")):
+        path = str(tmp / fname)
+        q = ctx.Queue()
+        procs = [ctx.Process(target=_worker, args=(path, p, args.writes, args.batch_keys, q)) for p in range(args.procs)]
+        t0 = time.perf_counter()
+        for p in procs:
+            p.start()
+        res = [q.get() for _ in procs]
+        for p in procs:
+            p.join()
+        wall = time.perf_counter() - t0
+        written = [k for keys, _ in res for k in keys]
+        cache = open_kv_cache(path, namespace="market")
+        kept = len(cache.get_many(written))
+        cache.close()
+        puts = args.procs * args.writes
+        print(f"  {name:<7} {puts / wall:>8,.0f} put_many/s  {len(written) / wall:>9,.0f} keys/s  "
+              f"{kept:,}/{len(written):,} written keys survived")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--symbols", type=int, default=5000)
+    ap.add_argument("--runs", type=int, default=50)
+    ap.add_argument("--batch", type=int, default=200)
+    ap.add_argument("--new", type=int, default=10)
+    ap.add_argument("--procs", type=int, default=4)
+    ap.add_argument("--writes", type=int, default=200)
+    ap.add_argument("--batch-keys", type=int, default=20)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _throughput(args, Path(tmp))
+        _concurrency(args, Path(tmp))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Cost of the instrumentation calls in rot.core.metrics, disabled vs enabled,
+and of a full replay of storage/snapshots.jsonl with metrics off and on.
+Prints a sample of the Prometheus text scraped from the local endpoint.
+
+    PYTHONPATH=src python benchmarks/bench_metrics.py [--calls 200000]
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+import urllib.request
+
+from _data import STORAGE
+from rot.app.replay import build_replay_runner, run_replay
+from rot.core import metrics
+
+
+def _per_call_ns(n: int) -> dict:
+    out = {}
+    t0 = time.perf_counter()
+    for _ in range(n):
+        with metrics.span("rot_stage_seconds", stage="bench"):
+            pass
+    out["span"] = (time.perf_counter() - t0) / n * 1e9
+    t0 = time.perf_counter()
+    for _ in range(n):
+        metrics.inc("rot_cache_lookups_total", 3, cache="bench", result="hit")
+    out["inc"] = (time.perf_counter() - t0) / n * 1e9
+    return out
+
+
+def _replay_s(repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            runner = build_replay_runner(str(STORAGE / "snapshots.jsonl"), str(STORAGE / "market_cache.json"), tmp)
+            with contextlib.redirect_stdout(io.StringIO()):
+                best = min(best, run_replay(runner)["wall_s"])
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=200_000)
+    args = ap.parse_args()
+
+    metrics.disable()
+    off = _per_call_ns(args.calls)
+    replay_off = _replay_s()
+
+    server = metrics.serve(0)
+    on = _per_call_ns(args.calls)
+    replay_on = _replay_s()
+
+    print(f"span      disabled {off['span']:7.0f} ns   enabled {on['span']:7.0f} ns")
+    print(f"inc       disabled {off['inc']:7.0f} ns   enabled {on['inc']:7.0f} ns")
+    print(f"replay    disabled {replay_off * 1000:7.1f} ms   enabled {replay_on * 1000:7.1f} ms")
+
+    url = f"http://127.0.0.1:{server.server_port}/metrics"
+    text = urllib.request.urlopen(url, timeout=5).read().decode()
+    print(f"\n{url} ({len(text.splitlines())} lines), excerpt:")
+    for line in text.splitlines():
+        if "stage=\"detect\"" in line and "_bucket" not in line or "cache=\"market\"" in line:
+            print("  " + line)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+TradeBuilder.build_many with option chains: N underlyings with synthetic
+chains (SyntheticOptionsProvider over an InMemoryProvider), one event per
+underlying with a random stance/horizon and the stub reasoner's structures.
+
+Reports the cold cycle (chains generated and cached) and warm cycles (chains
+served from the OptionsChainCache: selection, pricing and ranking of every
+candidate structure), the strategy mix, and raw rot.market.pricing
+throughput: implied vol and greeks over all contracts, and payoff/max-loss
+evaluation of random two-leg structures.
+
+    PYTHONPATH=src python benchmarks/bench_options.py [--underlyings 500] [--cycles 5] [--structures 10000]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections import Counter
+from typing import List, Tuple
+
+import numpy as np
+
+from rot.core.types import Event, ReasoningPacket
+from rot.market.options import ChainSet, OptionsChainCache, SyntheticOptionsProvider
+from rot.market.pricing import bs_greeks, bs_price, evaluate_structures, implied_vol
+from rot.market.provider import InMemoryProvider
+from rot.market.trade_builder import TradeBuilder
+
+STRUCTURES = ["debit_spread (defined risk)", "calendar (if catalyst known)"]
+
+
+def _items(symbols: List[str], rng: random.Random) -> List[Tuple[ReasoningPacket, Event]]:
+    out = []
+    for sym in symbols:
+        e = Event(
+            event_type=rng.choice(["earnings_rumor", "product_news", "macro", "other"]),  # type: ignore[arg-type]
+            entities=[sym],
+            stance=rng.choice(["bullish", "bearish", "mixed", "unknown"]),  # type: ignore[arg-type]
+            time_horizon=rng.choice(["intraday", "1w", "earnings", "longer", "unknown"]),  # type: ignore[arg-type]
+            evidence=[],
+            confidence=0.5,
+        )
+        p = ReasoningPacket(
+            thesis=f"{sym} thesis",
+            catalyst_window="unknown",
+            market_expectation="unknown",
+            invalidations=[],
+            recommended_structures=rng.choice([STRUCTURES, ["straddle"], ["strangle"], []]),
+            risk_notes=[],
+        )
+        out.append((p, e))
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--underlyings", type=int, default=500)
+    ap.add_argument("--cycles", type=int, default=5)
+    ap.add_argument("--structures", type=int, default=10_000)
+    args = ap.parse_args()
+
+    rng = random.Random(7)
+    symbols = [f"S{i:04d}" for i in range(args.underlyings)]
+    closes = {s: [10 ** rng.uniform(0.5, 3.0)] * 2 for s in symbols}
+    cache = OptionsChainCache(SyntheticOptionsProvider(InMemoryProvider(closes)))
+    builder = TradeBuilder(chains=cache)
+    items = _items(symbols, rng)
+
+    t0 = time.perf_counter()
+    ideas = builder.build_many(items)
+    cold = time.perf_counter() - t0
+
+    chains = cache.get_many(symbols)
+    cs = ChainSet(list(chains.values()))
+    print(f"{args.underlyings} underlyings, {len(cs)} contracts ({len(cs) // max(1, cs.n_groups)} per chain)")
+    print(f"cold  (generate + cache + select) {cold * 1000:8.1f} ms")
+
+    t0 = time.perf_counter()
+    for _ in range(args.cycles):
+        ideas = builder.build_many(items)
+    warm = (time.perf_counter() - t0) / args.cycles
+    print(f"warm  (cached chains, select + price + rank) {warm * 1000:8.1f} ms  = {args.underlyings / warm:,.0f} events/s")
+
+    flat = [i for batch in ideas for i in batch]
+    print("strategies:", dict(Counter(i.strategy for i in flat)))
+    print("no-trade reasons:", dict(Counter(r for i in flat for r in i.do_not_trade_reasons)))
+    sample = next(i for i in flat if i.legs)
+    print(f"e.g. {sample.underlying} {sample.strategy} max_loss={sample.max_loss} q={sample.quality_score} "
+          f"{sample.time_stop}: " + ", ".join(f"{l.side} {l.kind} {l.strike:g} {l.expiry}" for l in sample.legs))
+
+    _bench_pricing(cs, args.structures)
+
+
+def _timed(fn, *a, repeat: int = 3):
+    """Result and best-of-`repeat` seconds, after one warm-up call."""
+    out = fn(*a)
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*a)
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+def _bench_pricing(cs: ChainSet, n: int) -> None:
+    spot, t = cs.spot[cs.group], np.maximum(cs.dte, 1) / 365.0
+    _, dt_iv = _timed(implied_vol, cs.mid, cs.is_call, spot, cs.strike, t, 0.04)
+    _, dt_g = _timed(bs_greeks, cs.is_call, spot, cs.strike, t, cs.iv, 0.04)
+    print(f"\nimplied_vol {len(cs):,} contracts {dt_iv * 1000:7.1f} ms   greeks {dt_g * 1000:6.1f} ms")
+
+    rng = np.random.default_rng(1)
+    s0 = rng.uniform(10, 500, n)
+    k1 = s0 * rng.uniform(0.85, 1.1, n)
+    strike = np.stack([k1, k1 * rng.uniform(1.0, 1.15, n)], axis=1)
+    is_call = np.repeat(rng.random(n)[:, None] < 0.5, 2, axis=1)
+    qty = np.where(rng.random(n) < 0.5, 1.0, -1.0)[:, None] * np.array([1.0, -1.0])  # verticals, long or short
+    t = np.stack([np.full(n, 14.0), rng.choice([14.0, 49.0], n)], axis=1) / 365.0  # some calendars/diagonals
+    iv = rng.uniform(0.2, 0.8, (n, 2))
+    premium = bs_price(is_call, s0[:, None], strike, t, iv, 0.04)
+    ev, dt_ev = _timed(evaluate_structures, strike, is_call, qty, premium, s0, t, iv, 0.04)
+    print(f"evaluate_structures {n:,} two-leg structures {dt_ev * 1000:7.1f} ms  = {n / dt_ev:,.0f}/s "
+          f"({ev['grid'].shape[1]} grid points, {int(np.isinf(ev['max_loss']).sum())} with unbounded loss)")
+
+
+if __name__ == "__main__":
+    main()
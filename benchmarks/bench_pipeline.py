@@ -0,0 +1,98 @@
+"""
+Sequential run_once() cycles vs StagedRunner on a fake pipeline whose stages
+only sleep (ingest 50ms, detect 20ms, enrich 200ms per poll, reason 100ms per
+event). Reports how many polls each keeps up with, the achieved ingest
+cadence, and the staged runner's per-stage stats.
+
+    PYTHONPATH=src python benchmarks/bench_pipeline.py [--seconds 5] [--interval 0.25]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from typing import Any, Dict, List
+
+from rot.app.pipeline import StagedRunner
+
+
+class FakeRunner:
+    """Duck-typed PipelineRunner with sleeping stages."""
+
+    def __init__(self, events_per_poll: int = 4) -> None:
+        self.events_per_poll = events_per_poll
+        self.ideas = 0
+        self.poll_times: List[float] = []
+        self._lock = threading.Lock()
+
+    def ingest(self, run_id: str) -> List[int]:
+        self.poll_times.append(time.monotonic())
+        time.sleep(0.05)
+        return list(range(self.events_per_poll))
+
+    def detect(self, run_id: str, snapshots) -> Dict[str, Any]:
+        time.sleep(0.02)
+        return {"events": list(snapshots)}
+
+    def enrich(self, run_id: str, events):
+        time.sleep(0.2)
+        return events
+
+    def reason(self, run_id: str, e):
+        time.sleep(0.1)
+        return {"packet": e}
+
+    def trade(self, run_id: str, packet, e):
+        with self._lock:
+            self.ideas += 1
+        return [packet]
+
+    def trade_batch(self, run_id: str, packets, events):
+        with self._lock:
+            self.ideas += len(packets)
+        return list(packets)
+
+    def end_run(self, run_id: str | None = None) -> None:
+        pass
+
+    def run_once(self) -> None:
+        run_id = "run"
+        events = self.enrich(run_id, self.detect(run_id, self.ingest(run_id))["events"])
+        for e in events:
+            self.trade(run_id, self.reason(run_id, e), e)
+
+
+def _cadence(times: List[float]) -> float:
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    return sum(gaps) / len(gaps) if gaps else 0.0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--interval", type=float, default=0.25)
+    ap.add_argument("--reason-workers", type=int, default=8)
+    args = ap.parse_args()
+
+    seq = FakeRunner()
+    end = time.monotonic() + args.seconds
+    while time.monotonic() < end:
+        t0 = time.monotonic()
+        seq.run_once()
+        time.sleep(max(0.0, args.interval - (time.monotonic() - t0)))
+
+    staged = FakeRunner()
+    sr = StagedRunner(staged, interval_s=args.interval, reason_workers=args.reason_workers).start()
+    time.sleep(args.seconds)
+    sr.stop(drain=True)
+
+    print(f"{args.seconds:.0f}s at a {args.interval * 1000:.0f}ms poll interval")
+    print(f"sequential  polls {len(seq.poll_times):4d}  ideas {seq.ideas:4d}  cadence {_cadence(seq.poll_times) * 1000:6.0f} ms")
+    print(f"staged      polls {len(staged.poll_times):4d}  ideas {staged.ideas:4d}  cadence {_cadence(staged.poll_times) * 1000:6.0f} ms")
+    print(json.dumps(sr.stats(), indent=1, default=lambda x: round(x, 2)))
+    assert staged.ideas == len(staged.poll_times) * staged.events_per_poll, "staged runner lost items"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+SlowCycleProfiler around PipelineRunner.run_once on recorded data
+(FakeReddit with per-request latency, 4 ingest workers, ReplayProvider):
+run_once time with no profiler, with the stack sampler, and with cProfile,
+then the summary of the last slow-cycle dump.
+
+    PYTHONPATH=src python benchmarks/bench_profiling.py [--cycles 10] [--latency 0.01]
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+from pathlib import Path
+
+from _data import STORAGE, load_snapshots
+from _fake_reddit import FakeReddit
+from rot.app.profiling import SlowCycleProfiler
+from rot.app.runner import PipelineRunner
+from rot.core.logging import JsonlLogger
+from rot.credibility.scorer import CredibilityScorer
+from rot.extract.event_builder import EventBuilder
+from rot.ingest.reddit_ingestor import RedditIngestor
+from rot.market.enricher import MarketEnricher
+from rot.market.provider import ReplayProvider
+from rot.market.symbol_validator import SymbolValidator
+from rot.market.trade_builder import TradeBuilder
+from rot.reasoner.deepseek_client import DeepSeekReasoner
+from rot.trend.trend_engine import TrendEngine
+from rot.trend.trend_store import TrendStore
+
+
+def _runner(tmp: Path, fake: FakeReddit) -> PipelineRunner:
+    provider = ReplayProvider.from_file(str(STORAGE / "market_cache.json"))
+    return PipelineRunner(
+        ingestor=RedditIngestor(
+            subreddits=sorted(fake.posts), listing="hot", limit_per_sub=100, include_comments=True,
+            max_workers=4, state_path=str(tmp / "seen.sqlite3"), reddit_factory=lambda: fake,
+        ),
+        trend_engine=TrendEngine(store=TrendStore(), window_s=1800),
+        event_builder=EventBuilder(),
+        cred=CredibilityScorer(),
+        reasoner=DeepSeekReasoner(api_key=None),
+        trade_builder=TradeBuilder(),
+        logger=JsonlLogger(root=str(tmp / "out"), buffered=True),
+        enricher=MarketEnricher(cache_path=str(tmp / "market.json"), provider=provider),
+        symbol_validator=SymbolValidator(cache_path=str(tmp / "valid.json"), provider=provider),
+    )
+
+
+def _cycles(runner: PipelineRunner, fake: FakeReddit, n: int, profiler=None) -> float:
+    subs = [s for posts in fake.posts.values() for s in posts]
+    total = 0.0
+    for _ in range(n):
+        for s in subs:  # every post moved, so nothing is deduped away
+            s.score += 3
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if profiler is None:
+                runner.run_once()
+            else:
+                profiler.run(runner.run_once)
+        total += time.perf_counter() - t0
+    return total / n
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cycles", type=int, default=10)
+    ap.add_argument("--latency", type=float, default=0.01)
+    args = ap.parse_args()
+
+    snaps = load_snapshots()
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        profilers = {
+            "none": None,
+            "sample": SlowCycleProfiler(threshold_s=0.0, out_dir=f"{tmp}/profiles", keep=3, mode="sample"),
+            "cprofile": SlowCycleProfiler(threshold_s=0.0, out_dir=f"{tmp}/profiles", keep=3, mode="cprofile"),
+        }
+        for name, prof in profilers.items():
+            fake = FakeReddit(snaps, latency_s=args.latency)
+            runner = _runner(Path(tmp) / name, fake)
+            results[name] = _cycles(runner, fake, args.cycles, prof)
+            runner.ingestor.close()
+
+        base = results["none"]
+        for name, t in results.items():
+            print(f"{name:<9} run_once {t * 1000:8.1f} ms  ({(t / base - 1) * 100:+.1f}%)")
+        kept = sorted(p.name for p in Path(f"{tmp}/profiles").iterdir())
+        print(f"\n{len(kept)} dumps kept (keep=3), newest {kept[-1]}: {sorted(p.name for p in profilers['cprofile'].last_dump.iterdir())}")
+        print((profilers["cprofile"].last_dump / "summary.txt").read_text().split("cProfile")[0])
+
+
+if __name__ == "__main__":
+    main()
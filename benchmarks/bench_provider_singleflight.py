@@ -0,0 +1,59 @@
+"""
+Concurrent callers asking the same MarketDataProvider for overlapping symbols:
+without coalescing every caller pays its own round-trip; with single-flight
+only one fetch per symbol is in flight and the others wait for its result.
+Uses InMemoryProvider with injected latency; no network.
+
+    PYTHONPATH=src python benchmarks/bench_provider_singleflight.py [--threads 16] [--latency 0.05]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from rot.core.ratelimit import RateLimiter
+from rot.market.provider import InMemoryProvider
+
+
+class NoCoalesce(InMemoryProvider):
+    def quotes(self, symbols) -> Dict[str, Dict[str, Any]]:
+        return self._fetch_quotes(list(dict.fromkeys(symbols)))
+
+
+def _run(p: InMemoryProvider, batches: List[List[str]], threads: int) -> float:
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        results = list(ex.map(p.quotes, batches))
+    dt = time.perf_counter() - t0
+    for b, r in zip(batches, results):
+        assert list(r) == list(dict.fromkeys(b))
+        assert all("last_close" in r[s] for s in b)
+    return dt
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--symbols", type=int, default=10)
+    ap.add_argument("--latency", type=float, default=0.05)
+    ap.add_argument("--rpm", type=float, default=600.0)
+    args = ap.parse_args()
+
+    rng = random.Random(7)
+    universe = [f"S{i:02d}" for i in range(args.symbols)]
+    closes = {s: [100.0, 101.0 + i] for i, s in enumerate(universe)}
+    batches = [rng.sample(universe, 3) for _ in range(args.threads)]
+
+    print(f"{args.threads} threads x 3 symbols from {args.symbols}, {args.latency * 1000:.0f}ms per request")
+    for name, cls in (("no coalescing", NoCoalesce), ("single-flight", InMemoryProvider)):
+        p = cls(closes, latency_s=args.latency, rate_limiter=RateLimiter.per_minute(args.rpm, burst=4))
+        dt = _run(p, batches, args.threads)
+        fetched = sum(len(c) for c in p.calls)
+        print(f"{name:<16} {len(p.calls):4d} requests {fetched:4d} symbol fetches {dt:7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
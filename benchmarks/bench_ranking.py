@@ -0,0 +1,78 @@
+"""
+Ranking 100k candidates: the original full sorts (top_n via sorted(), ticker
+ranking re-validating every symbol, plus the separate ticker_candidate_count
+pass) vs one Leaderboards pass with a per-run ValidationMemo.
+
+    PYTHONPATH=src python benchmarks/bench_ranking.py [--candidates 100000]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+from typing import Dict, List
+
+from rot.core.types import Post, ThreadSnapshot, TrendCandidate
+from rot.market.provider import InMemoryProvider
+from rot.market.symbol_validator import SymbolValidator, ValidationMemo
+from rot.trend.leaderboard import Leaderboards
+
+
+def _legacy(candidates, extracted, validator, n=5):
+    top_all = sorted(candidates, key=lambda c: c.trend_score, reverse=True)[:n]
+    count = sum(1 for c in candidates if any(validator.is_valid(s) for s in extracted.get(c.key, [])))
+    pairs = []
+    for c in candidates:
+        good = sorted({validator.normalize(s) for s in extracted.get(c.key, []) if validator.is_valid(validator.normalize(s))})[:5]
+        if good:
+            pairs.append((c, good))
+    pairs.sort(key=lambda x: x[0].trend_score, reverse=True)
+    return top_all, pairs[:n], count
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--candidates", type=int, default=100_000)
+    ap.add_argument("--symbols", type=int, default=2_000)
+    args = ap.parse_args()
+
+    rng = random.Random(3)
+    syms = ["".join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 5))) for _ in range(args.symbols)]
+    subs = ["wallstreetbets", "stocks", "options", "investing"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        validator = SymbolValidator(cache_path=os.path.join(tmp, "valid.json"), provider=InMemoryProvider())
+        # Pre-seed the validator cache so no network is touched.
+        now = int(time.time())
+        validator._cache.update({s: {"ok": rng.random() < 0.6, "ts": now} for s in syms})
+
+        candidates: List[TrendCandidate] = []
+        extracted: Dict[str, List[str]] = {}
+        for i in range(args.candidates):
+            post = Post(f"p{i}", 0, rng.choice(subs), "t", "", "", 0, 0, None, "a", "")
+            c = TrendCandidate(f"{post.subreddit}:{post.id}", 1800, {}, rng.random(), "rate_threshold", ThreadSnapshot(0, post))
+            candidates.append(c)
+            extracted[c.key] = rng.sample(syms, rng.randint(0, 3))
+
+        t0 = time.perf_counter()
+        top_all, top_ticker, count = _legacy(candidates, extracted, validator)
+        t_legacy = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        boards = Leaderboards(n=5, memo=ValidationMemo(validator))
+        boards.extend(candidates, extracted)
+        got = (boards.all.items(), boards.ticker.items(), boards.ticker_count)
+        t_boards = time.perf_counter() - t0
+
+    assert got == (top_all, top_ticker, count), "leaderboards disagree with legacy ranking"
+    print(f"{args.candidates} candidates, {args.symbols} symbols")
+    print(f"legacy sorts      {t_legacy * 1000:8.1f} ms")
+    print(f"leaderboards      {t_boards * 1000:8.1f} ms  x{t_legacy / t_boards:.1f}  "
+          f"(+{len(boards.by_subreddit)} subreddit / {len(boards.by_ticker)} ticker boards)")
+
+
+if __name__ == "__main__":
+    main()
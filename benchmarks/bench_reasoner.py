@@ -0,0 +1,122 @@
+"""
+DeepSeekReasoner against a local mock of the chat completions API (SSE
+streaming, injected latency): one request at a time without a cache vs
+reason_many() with bounded concurrency, coalescing and the content-addressed
+cache, over two cycles of the same events (as when posts keep trending).
+Also checks the timeout fallback. No network.
+
+    PYTHONPATH=src python benchmarks/bench_reasoner.py [--events 40] [--latency 0.2]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rot.core.types import Event, Evidence
+from rot.reasoner.deepseek_client import DeepSeekReasoner
+
+ANSWER = {
+    "thesis": "Chatter about {sym} ahead of earnings; unverified.",
+    "catalyst_window": "earnings",
+    "market_expectation": "elevated IV into the print",
+    "invalidations": ["No follow-through volume"],
+    "recommended_structures": ["debit_spread (defined risk)"],
+    "risk_notes": ["IV crush after earnings"],
+}
+
+
+class MockChat(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency_s = 0.2
+    requests = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with MockChat.lock:
+            MockChat.requests += 1
+        user = body["messages"][-1]["content"]
+        time.sleep(self.latency_s * (50 if '"SLOW"' in user else 1))
+        answer = json.dumps({k: (v.format(sym="X") if isinstance(v, str) else v) for k, v in ANSWER.items()})
+        pieces = ["```json\n"] + [answer[i : i + 40] for i in range(0, len(answer), 40)] + ["\n```"]
+        events = b"".join(
+            b"data: " + json.dumps({"choices": [{"delta": {"content": p}}]}).encode() + b"\n\n" for p in pieces
+        ) + b"data: [DONE]\n\n"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(events)))
+        self.end_headers()
+        self.wfile.write(events)
+
+
+def _events(n: int, rng: random.Random):
+    syms = ["AAPL", "TSLA", "NVDA", "AMD", "GME", "PLTR", "SPY", "MSFT"]
+    out = []
+    for i in range(n):
+        ev = Evidence(f"p{i}", f"https://reddit.com/p{i}", "wallstreetbets", f"{rng.choice(syms)} to the moon #{i}")
+        out.append(Event("other", [rng.choice(syms)], "unknown", "unknown", [ev], 0.3, meta={"market": {"x": i}}))
+    # a few exact reposts: same content, must share one request
+    return out + out[: n // 4]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=40)
+    ap.add_argument("--latency", type=float, default=0.2)
+    ap.add_argument("--concurrency", type=int, default=8)
+    args = ap.parse_args()
+
+    MockChat.latency_s = args.latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockChat)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    events = _events(args.events, random.Random(2))
+
+    base = DeepSeekReasoner(api_key="test", base_url=url, max_concurrency=1, cache_size=0)
+    MockChat.requests = 0
+    t0 = time.perf_counter()
+    ref = [base.reason(e) for e in events]
+    t_base = time.perf_counter() - t0
+    n_base = MockChat.requests
+
+    fast = DeepSeekReasoner(api_key="test", base_url=url, max_concurrency=args.concurrency)
+    MockChat.requests = 0
+    t0 = time.perf_counter()
+    first = fast.reason_many(events)
+    t_first = time.perf_counter() - t0
+    n_first = MockChat.requests
+    t0 = time.perf_counter()
+    second = fast.reason_many(events)
+    t_second = time.perf_counter() - t0
+
+    strip = lambda p: (p.thesis, p.invalidations, p.recommended_structures, p.risk_notes)  # noqa: E731
+    assert [strip(p) for p in ref] == [strip(p) for p in first] == [strip(p) for p in second]
+    assert not any(p.raw.get("stub") for p in first + second)
+
+    print(f"{len(events)} events ({args.events} distinct), {args.latency * 1000:.0f}ms mock latency")
+    print(f"sequential, no cache   {n_base:4d} requests {t_base:7.2f}s")
+    print(f"concurrent x{args.concurrency:<2d} cycle 1 {n_first:4d} requests {t_first:7.2f}s  x{t_base / t_first:.1f}")
+    print(f"concurrent    cycle 2 {MockChat.requests - n_first:4d} requests {t_second * 1000:7.1f}ms")
+    print(f"stats {fast.stats()}")
+
+    slow = DeepSeekReasoner(api_key="test", base_url=url, timeout_s=args.latency * 3)
+    e = Event("other", ["SLOW"], "unknown", "unknown", [], 0.1)
+    t0 = time.perf_counter()
+    p = slow.reason(e)
+    print(f"timeout fallback after {time.perf_counter() - t0:.2f}s: {p.raw}")
+    assert p.raw.get("stub") and p.raw.get("fallback") == "timeout"
+
+    for r in (base, fast, slow):
+        r.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Performance regression harness: replay a synthetic multi-day history
+(storage/snapshots.jsonl repeated `--cycles` times with shifted timestamps)
+through PipelineRunner with ReplayIngestor and recorded market data, and
+print per-stage throughput as JSON. Peak traced memory is reported too, to
+check that replay stays flat as the history grows.
+
+    PYTHONPATH=src python benchmarks/bench_replay.py [--cycles 200]
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from _data import STORAGE, iter_jsonl
+from rot.app.replay import build_replay_runner, run_replay
+
+
+def _synth(src: Path, dst: Path, cycles: int) -> int:
+    rows = list(iter_jsonl(src))
+    n = 0
+    with dst.open("w", encoding="utf-8") as f:
+        for c in range(cycles):
+            shift = c * 1200  # one poll every 20 minutes
+            for r in rows:
+                snap = r["snapshot"]
+                post = dict(snap["post"], score=snap["post"]["score"] + 7 * c, num_comments=snap["post"]["num_comments"] + c)
+                f.write(json.dumps({"snapshot": dict(snap, snapshot_ts=snap["snapshot_ts"] + shift, post=post)}) + "\n")
+                n += 1
+    return n
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cycles", type=int, default=200)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "snapshots.jsonl"
+        _synth(STORAGE / "snapshots.jsonl", src, args.cycles)
+        size = src.stat().st_size
+        runner = build_replay_runner(str(src), str(STORAGE / "market_cache.json"), str(Path(tmp) / "out"))
+
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):  # the runner prints leaderboards
+            report = run_replay(runner)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    report["history_mib"] = round(size / 2**20, 1)
+    report["peak_traced_mib"] = round(peak / 2**20, 1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+PollScheduler vs the old fixed sleep, simulated on a fake clock over a few
+hours: 8 sources (one busy subreddit with a 30-minute burst, one medium, six
+quiet), 50 posts per listing, each poll taking `--cycle` seconds.
+
+Each post changes as a Poisson process with its source's rate. Reported per
+strategy: API requests per minute, and the mean delay between a post
+changing and a poll observing it (weighted by changes), overall and during
+the burst.
+
+    PYTHONPATH=src python benchmarks/bench_scheduler.py [--hours 3] [--cycle 3] [--rpm 0]
+"""
+from __future__ import annotations
+
+import argparse
+import math
+from typing import Callable, Dict, List, Tuple
+
+from rot.ingest.scheduler import PollScheduler, Source
+
+POSTS = 50
+BURST = (3600.0, 5400.0)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.t = 0.0
+
+    def __call__(self) -> float:
+        return self.t
+
+    def sleep(self, s: float) -> None:
+        self.t += max(0.0, s)
+
+
+def _rates() -> Dict[Source, Callable[[float], float]]:
+    rates: Dict[Source, Callable[[float], float]] = {
+        ("wallstreetbets", "hot"): lambda t: 0.05 if BURST[0] <= t < BURST[1] else 0.01,
+        ("stocks", "hot"): lambda t: 0.004,
+    }
+    for i in range(6):
+        rates[(f"quiet{i}", "hot")] = lambda t: 0.0003
+    return rates
+
+
+class Sim:
+    def __init__(self, rates: Dict[Source, Callable[[float], float]]) -> None:
+        self.rates = rates
+        self.last = {src: 0.0 for src in rates}
+        self.requests = 0
+        # (sum of change-weighted delay, number of changes) overall and in the burst
+        self.delay = {"all": [0.0, 0.0], "burst": [0.0, 0.0]}
+
+    def poll(self, src: Source, t: float) -> Tuple[int, int]:
+        t0, self.last[src] = self.last[src], t
+        dt = max(1e-9, t - t0)
+        r = self.rates[src](t0 + dt / 2)
+        frac = 1.0 - math.exp(-r * dt)
+        changes = POSTS * r * dt  # expected change events since the last poll
+        for key in ("all",) + (("burst",) if BURST[0] <= t < BURST[1] else ()):
+            self.delay[key][0] += changes * dt / 2
+            self.delay[key][1] += changes
+        self.requests += 1
+        return POSTS, int(round(POSTS * frac))
+
+    def report(self, name: str, seconds: float) -> None:
+        d = {k: v[0] / v[1] if v[1] else 0.0 for k, v in self.delay.items()}
+        print(f"{name:<10} {self.requests / (seconds / 60):6.1f} req/min   mean detection delay "
+              f"{d['all']:6.1f}s overall  {d['burst']:6.1f}s in the burst")
+
+
+def fixed(hours: float, interval: float, cycle: float) -> Sim:
+    clock, sim = FakeClock(), Sim(_rates())
+    while clock() < hours * 3600:
+        for src in sim.rates:
+            sim.poll(src, clock())
+        clock.sleep(cycle)  # the cycle itself
+        clock.sleep(interval)  # then the old fixed sleep
+    return sim
+
+
+def adaptive(hours: float, interval: float, cycle: float, rpm: float) -> Tuple[Sim, PollScheduler]:
+    clock, sim = FakeClock(), Sim(_rates())
+    sched = PollScheduler(sim.rates, base_interval_s=interval, requests_per_min=rpm or None, clock=clock, sleep=clock.sleep)
+    while clock() < hours * 3600:
+        sources: List[Source] = sched.wait()
+        stats = {}
+        for src in sources:
+            listed, changed = sim.poll(src, clock())
+            stats[src] = {"listed": listed, "changed": changed, "requests": 1}
+        clock.sleep(cycle)
+        sched.record_poll(stats)
+    return sim, sched
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--hours", type=float, default=3.0)
+    ap.add_argument("--interval", type=float, default=20.0)
+    ap.add_argument("--cycle", type=float, default=3.0)
+    ap.add_argument("--rpm", type=float, default=0.0, help="0 = spend what the fixed interval spends")
+    args = ap.parse_args()
+
+    seconds = args.hours * 3600
+    budget = f"{args.rpm:g} req/min" if args.rpm else "same spend as fixed"
+    print(f"{len(_rates())} sources, {args.hours:g}h simulated, {args.cycle:g}s per cycle, budget: {budget}")
+    fixed(args.hours, args.interval, args.cycle).report("fixed", seconds)
+    sim, sched = adaptive(args.hours, args.interval, args.cycle, args.rpm)
+    sim.report("adaptive", seconds)
+    for name, s in sched.stats()["sources"].items():  # type: ignore[union-attr]
+        print(f"  {name:<22} interval {s['interval_s']:6.1f}s  change rate {s['change_rate']}/s")
+
+
+if __name__ == "__main__":
+    main()
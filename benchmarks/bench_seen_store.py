@@ -0,0 +1,77 @@
+"""
+SeenStore at scale: 1M remembered posts, then poll cycles of one 100-post
+listing each (batch is_changed, ~30 updates, save). Compares the JSON backend
+(parse everything at startup, rewrite everything per save) with the SQLite
+backend (no startup read, batched lookups, dirty-only upserts).
+
+    PYTHONPATH=src python benchmarks/bench_seen_store.py [--records 1000000] [--cycles 20]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from rot.ingest.seen_store import SeenStore, SqliteSeenStore
+
+
+def _fill(store: SeenStore, n: int, now: int) -> None:
+    for i in range(n):
+        store.update(f"p{i}", i % 500, i % 50, now - (i % 86_400))
+    store.save()
+
+
+def _cycles(store: SeenStore, n: int, cycles: int, rng: random.Random, now: int):
+    times = []
+    for c in range(cycles):
+        t0 = time.perf_counter()
+        ids = [f"p{rng.randrange(n + 1000)}" for _ in range(100)]
+        items = [(pid, rng.randrange(500), rng.randrange(50)) for pid in ids]
+        changed = store.is_changed_many(items)
+        for (pid, score, nc), ch in list(zip(items, changed))[:30]:
+            if ch:
+                store.update(pid, score, nc, now + c)
+        store.save()
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    return times[len(times) // 2], times[-1]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--records", type=int, default=1_000_000)
+    ap.add_argument("--cycles", type=int, default=20)
+    args = ap.parse_args()
+    now = int(time.time())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{args.records} records, {args.cycles} cycles of a 100-post listing")
+        for name, make in (
+            ("json", lambda: SeenStore(os.path.join(tmp, "seen.json"))),
+            ("sqlite", lambda: SqliteSeenStore(os.path.join(tmp, "seen.sqlite3"), import_json=None)),
+        ):
+            t0 = time.perf_counter()
+            _fill(make(), args.records, now)
+            t_fill = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            store = make()
+            store.load()
+            first = store.is_changed_many([("p1", 1, 1)])
+            t_open = time.perf_counter() - t0
+            assert first == [False]
+
+            p50, worst = _cycles(store, args.records, args.cycles, random.Random(5), now)
+            path = store.path
+            store.close()
+            size = os.path.getsize(path) / 2**20
+            print(
+                f"{name:<7} fill {t_fill:6.1f}s  open {t_open * 1000:8.1f} ms  "
+                f"cycle p50 {p50 * 1000:8.1f} ms  max {worst * 1000:8.1f} ms  {size:6.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Record encoding: legacy dataclasses.asdict + json.dumps vs rot.core.serialize
+(pure-Python field encoders and the orjson backend) on the recorded
+storage/snapshots.jsonl corpus, wrapped the way PipelineRunner logs them.
+
+    PYTHONPATH=src python benchmarks/bench_serialize.py [--repeat N]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import asdict, is_dataclass
+from typing import Any, Callable, List
+
+from _data import candidates_from, load_snapshots
+from rot.core import serialize
+
+
+def _legacy_jsonable(obj: Any) -> Any:
+    if is_dataclass(obj):
+        return asdict(obj)
+    if isinstance(obj, (list, tuple)):
+        return [_legacy_jsonable(x) for x in obj]
+    if isinstance(obj, dict):
+        return {k: _legacy_jsonable(v) for k, v in obj.items()}
+    return obj
+
+
+def _legacy(rec: Any) -> str:
+    return json.dumps(_legacy_jsonable(rec), ensure_ascii=False)
+
+
+def _time(fn: Callable[[Any], str], records: List[Any], repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for r in records:
+            fn(r)
+    return len(records) * repeat / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    snaps = load_snapshots()
+    if not snaps:
+        raise SystemExit("storage/snapshots.jsonl is empty")
+    records: List[Any] = [{"run_id": "run_0", "snapshot": s, "ts": 0} for s in snaps]
+    records += [{"run_id": "run_0", "candidate": c, "ts": 0} for c in candidates_from(snaps)]
+
+    for r in records:
+        py = serialize.dumps(r, backend="python")
+        assert json.loads(py) == json.loads(_legacy(r))
+        if serialize.orjson is not None:
+            assert py == serialize.dumps(r, backend="orjson"), "backends disagree"
+
+    cases = [("asdict+json", _legacy), ("serialize/python", lambda r: serialize.dumps(r, backend="python"))]
+    if serialize.orjson is not None:
+        cases.append(("serialize/orjson", lambda r: serialize.dumps(r, backend="orjson")))
+
+    print(f"{len(records)} records ({len(snaps)} snapshots + candidates)")
+    base = None
+    for name, fn in cases:
+        rps = _time(fn, records, args.repeat)
+        base = base or rps
+        print(f"{name:<18} {rps:>12,.0f} records/s  x{rps / base:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+SymbolSet startup and lookups over a full-size symbol directory (~12k
+symbols in synthetic nasdaqlisted.txt / otherlisted.txt files): parsing the
+listing files vs loading the mmap'd binary snapshot, and is_valid() cost.
+
+    PYTHONPATH=src python benchmarks/bench_symbols.py [--nasdaq 5000] [--other 7000]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+
+from rot.market.symbols import SymbolSet
+
+
+def _write_listings(root: str, n_nasdaq: int, n_other: int, rng: random.Random) -> None:
+    seen = set()
+
+    def sym() -> str:
+        while True:
+            s = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(1, 5)))
+            if s not in seen:
+                seen.add(s)
+                return s
+
+    with open(os.path.join(root, "nasdaqlisted.txt"), "w", encoding="utf-8") as f:
+        f.write("Symbol|Security Name|Market Category|Test Issue|Financial Status|Round Lot Size|ETF|NextShares\n")
+        for _ in range(n_nasdaq):
+            etf = "Y" if rng.random() < 0.2 else "N"
+            f.write(f"{sym()}|Example Corp - Common Stock|Q|N|N|100|{etf}|N\n")
+        f.write("File Creation Time: 0101202600:00|||||||\n")
+    with open(os.path.join(root, "otherlisted.txt"), "w", encoding="utf-8") as f:
+        f.write("ACT Symbol|Security Name|Exchange|CQS Symbol|ETF|Round Lot Size|Test Issue|NASDAQ Symbol\n")
+        for i in range(n_other):
+            s = sym() + (".B" if i % 500 == 0 else "")
+            exch = rng.choice("NAPZV")
+            etf = "Y" if exch == "P" else "N"
+            f.write(f"{s}|Example Holdings Inc. Common Stock|{exch}|{s}|{etf}|100|N|{s}\n")
+        f.write("File Creation Time: 0101202600:00|||||||\n")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--nasdaq", type=int, default=5_000)
+    ap.add_argument("--other", type=int, default=7_000)
+    ap.add_argument("--lookups", type=int, default=1_000_000)
+    args = ap.parse_args()
+
+    rng = random.Random(11)
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_listings(tmp, args.nasdaq, args.other, rng)
+        kw = dict(
+            cache_path=os.path.join(tmp, "symbols.csv"),
+            listing_paths=[os.path.join(tmp, "nasdaqlisted.txt"), os.path.join(tmp, "otherlisted.txt")],
+            index_path=os.path.join(tmp, "symbols.idx"),
+        )
+
+        t0 = time.perf_counter()
+        cold = SymbolSet(**kw)
+        t_parse = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        warm = SymbolSet(**kw)
+        t_load = time.perf_counter() - t0
+        assert warm.index.symbols == cold.index.symbols
+        assert [warm.index.get(s) for s in cold.index.symbols] == [cold.index.get(s) for s in cold.index.symbols]
+
+        probes = [rng.choice(cold.index.symbols) if rng.random() < 0.5 else "ZZZZZZ" for _ in range(1000)]
+        loops = max(1, args.lookups // len(probes))
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            for p in probes:
+                warm.is_valid(p)
+        t_lookup = (time.perf_counter() - t0) / (loops * len(probes))
+
+        size = os.path.getsize(kw["index_path"])
+        print(f"{len(cold.index)} symbols, snapshot {size / 1024:.0f} KiB")
+        print(f"parse listings   {t_parse * 1000:8.1f} ms")
+        print(f"load snapshot    {t_load * 1000:8.1f} ms  x{t_parse / t_load:.1f}")
+        print(f"is_valid         {t_lookup * 1e9:8.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+TrendEngine.detect per-cycle cost while tracking tens of thousands of posts:
+
+  legacy     original loop, 2 features from the single previous snapshot
+  py-rich    per-object Python loop computing the same windowed/EWMA/accel
+             features as the NumPy engine (also used to check its output)
+  numpy      ring-buffer TrendStore + vectorized TrendEngine
+
+Each cycle 10% of the posts are new, so slot allocation, expiry and the
+first-sighting threshold are exercised too. `--hot` is the fraction of posts
+that move between polls: at 100% nearly every post is a candidate and the
+run is dominated by building TrendCandidate objects (which numpy cannot
+help with); at 10%, closer to a real front page, the per-post cost shows.
+Engines run interleaved, best of `--repeat`, with the collector paused.
+
+The numpy engine has to read every post object just as the legacy loop
+does, so the two stay within about 25% of each other (either way, run to run)
+while numpy computes 9 features instead of 2; the same features one post at
+a time (py-rich) cost 5-14x more.
+
+The last table is TrendStore.append alone, for a batch of new posts while
+`--tracked` posts are held, so every append evicts: its cost follows the
+batch, not the number of tracked posts.
+
+    PYTHONPATH=src python benchmarks/bench_trend_engine.py [--posts 10000 50000] [--cycles 20] [--hot 1.0 0.1]
+        [--repeat 3] [--tracked 10000 50000 200000]
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import math
+import random
+import statistics
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Tuple
+
+import numpy as np
+
+from rot.core.types import Post, ThreadSnapshot, TrendCandidate
+from rot.trend.trend_engine import TrendEngine
+from rot.trend.trend_store import TrendStore
+
+
+class LegacyEngine:
+    def __init__(self, window_s: int = 1800, threshold: float = 0.01) -> None:
+        self._last: Dict[str, ThreadSnapshot] = {}
+        self.window_s = window_s
+        self.threshold = threshold
+
+    def detect(self, snapshots: List[ThreadSnapshot]) -> List[TrendCandidate]:
+        out = []
+        for snap in snapshots:
+            key = f"{snap.post.subreddit}:{snap.post.id}"
+            prev = self._last.get(key)
+            self._last[key] = snap
+            if prev is None:
+                continue
+            dt = max(1, snap.snapshot_ts - prev.snapshot_ts)
+            features = {
+                "score_rate": (snap.post.score - prev.post.score) / dt,
+                "comment_rate": (snap.post.num_comments - prev.post.num_comments) / dt,
+            }
+            trend_score = features["score_rate"] + 2.0 * features["comment_rate"]
+            if trend_score >= self.threshold:
+                out.append(TrendCandidate(key, self.window_s, features, trend_score, "rate_threshold", snap))
+        return out
+
+
+class PyRichEngine:
+    """Reference: the NumPy engine's features, one post at a time."""
+
+    def __init__(self, window_s: int = 1800, threshold: float = 0.01, halflife_s: float = 300.0, depth: int = 16,
+                 first_threshold: float = 1.0):
+        self._hist: Dict[str, Deque[Tuple[int, float, float]]] = {}
+        self._ewma: Dict[str, Tuple[float, float]] = {}  # running EWMA, reset after a gap > window
+        self.window_s, self.threshold, self.halflife_s, self.depth = window_s, threshold, halflife_s, depth
+        self.first_threshold = first_threshold
+
+    def _rates(self, h: List[Tuple[int, float, float]], i: int) -> Dict[str, float]:
+        steps = [((b[i] - a[i]) / max(1, b[0] - a[0]), max(1, b[0] - a[0])) for a, b in zip(h, h[1:])]
+        last = steps[-1][0] if steps else 0.0
+        accel = (steps[-1][0] - steps[-2][0]) / ((steps[-1][1] + steps[-2][1]) / 2.0) if len(steps) > 1 else 0.0
+        window = (h[-1][i] - h[0][i]) / max(1, h[-1][0] - h[0][0]) if len(h) > 1 else 0.0
+        return {"last": last, "window": window, "accel": accel}
+
+    def _update_ewma(self, key: str, dq: Deque[Tuple[int, float, float]], x: Tuple[int, float, float]) -> None:
+        prev = dq[-1] if dq else None
+        if prev is None or prev[0] < x[0] - self.window_s:
+            self._ewma.pop(key, None)
+            return
+        dt = max(1, x[0] - prev[0])
+        alpha = 1.0 - math.pow(0.5, dt / self.halflife_s)
+        steps = ((x[1] - prev[1]) / dt, (x[2] - prev[2]) / dt)
+        old = self._ewma.get(key)
+        self._ewma[key] = steps if old is None else tuple(o + alpha * (r - o) for o, r in zip(old, steps))
+
+    def detect(self, snapshots: List[ThreadSnapshot]) -> List[TrendCandidate]:
+        out = []
+        for snap in snapshots:
+            p = snap.post
+            key = f"{p.subreddit}:{p.id}"
+            dq = self._hist.setdefault(key, deque(maxlen=self.depth))
+            x = (snap.snapshot_ts, float(p.score), float(p.num_comments))
+            self._update_ewma(key, dq, x)
+            dq.append(x)
+            h = [x for x in dq if x[0] >= snap.snapshot_ts - self.window_s]
+            sr, cr = self._rates(h, 1), self._rates(h, 2)
+            age = max(1, snap.snapshot_ts - p.created_utc)
+            first = len(h) < 2
+            ewma = self._ewma.get(key, (0.0, 0.0))
+            f = {
+                "score_rate": p.score / age if first else ewma[0],
+                "comment_rate": p.num_comments / age if first else ewma[1],
+                "score_rate_last": sr["last"], "comment_rate_last": cr["last"],
+                "score_rate_window": sr["window"], "comment_rate_window": cr["window"],
+                "score_accel": sr["accel"], "comment_accel": cr["accel"],
+                "samples": float(len(h)),
+            }
+            trend_score = f["score_rate"] + 2.0 * f["comment_rate"]
+            if trend_score >= (self.first_threshold if first else self.threshold):
+                reason = "lifetime_rate" if first else "rate_threshold"
+                out.append(TrendCandidate(key, self.window_s, f, trend_score, reason, snap))
+        return out
+
+
+def _same(a: List[TrendCandidate], b: List[TrendCandidate]) -> bool:
+    if [c.key for c in a] != [c.key for c in b]:
+        return False
+    return all(math.isclose(x.features[k], y.features[k], rel_tol=1e-9, abs_tol=1e-12)
+               for x, y in zip(a, b) for k in x.features)
+
+
+def _cycles(
+    n_posts: int, n_cycles: int, seed: int = 7, churn: float = 0.1, hot: float = 1.0
+) -> List[List[ThreadSnapshot]]:
+    """`n_posts` per cycle; each cycle `churn` of them are replaced by new posts.
+    A `hot` fraction of the posts gains score/comments every poll, the rest are flat."""
+    rng = random.Random(seed)
+    ids = list(range(n_posts))
+    score = {i: rng.randint(0, 500) for i in ids}
+    com = {i: rng.randint(0, 200) for i in ids}
+    moving = {i: rng.random() < hot for i in ids}
+    nxt = n_posts
+    out = []
+    for c in range(n_cycles):
+        ts = 1_700_000_000 + 20 * c
+        if c:
+            for j in rng.sample(range(n_posts), int(n_posts * churn)):
+                ids[j], nxt = nxt, nxt + 1
+                score[ids[j]], com[ids[j]] = rng.randint(0, 500), rng.randint(0, 200)
+                moving[ids[j]] = rng.random() < hot
+        snaps = []
+        for i in ids:
+            if moving[i]:
+                score[i] += rng.randint(-1, 6)
+                com[i] += rng.randint(0, 3)
+            p = Post(f"p{i}", ts - 3600, "wallstreetbets", "t", "", "", score[i], com[i], 0.9, "a", "")
+            snaps.append(ThreadSnapshot(ts, p))
+        out.append(snaps)
+    return out
+
+
+def _check(cycles) -> None:
+    ref, vec = PyRichEngine(), TrendEngine(TrendStore())
+    for snaps in cycles:
+        assert _same(ref.detect(snaps), vec.detect(snaps)), "numpy engine disagrees with reference"
+
+
+def _bench(engine, cycles) -> Tuple[float, float]:
+    """(median seconds, mean candidates) per cycle.
+
+    The collector is paused while timing, as timeit does: a full collection
+    walks every snapshot the benchmark holds, and which engine happens to
+    trigger it says nothing about the engine.
+    """
+    engine.detect(cycles[0])  # warm: first sighting of every post
+    n, times = 0, []
+    gc.collect()
+    gc.disable()
+    try:
+        for snaps in cycles[1:]:
+            t0 = time.perf_counter()
+            n += len(engine.detect(snaps))
+            times.append(time.perf_counter() - t0)
+    finally:
+        gc.enable()
+    return statistics.median(times), n / (len(cycles) - 1)
+
+
+def _best(engines: Dict[str, Callable[[], object]], cycles, repeat: int) -> Dict[str, Tuple[float, float]]:
+    """Best of `repeat` _bench runs per engine, fresh engine each run, engines interleaved."""
+    best: Dict[str, Tuple[float, float]] = {}
+    for _ in range(repeat):
+        for name, make in engines.items():
+            r = _bench(make(), cycles)
+            if name not in best or r[0] < best[name][0]:
+                best[name] = r
+    return best
+
+
+def _store_scaling(tracked: List[int], batch: int = 2_000, rounds: int = 30) -> None:
+    """
+    TrendStore.append cost for a batch of new posts while `tracked` posts are
+    held: every append evicts as many least recently updated posts, so this is
+    the expiry/LRU path. It should not depend on `tracked`.
+    """
+    for n in tracked:
+        store = TrendStore(max_entries=n, initial_capacity=n + batch)
+        ts, x = np.full(batch, 1_700_000_000, dtype=np.int64), np.zeros(batch)
+        for i in range(0, n, batch):
+            store.append([f"s:{j}" for j in range(i, i + batch)], ts, x, x)
+        times = []
+        for r in range(rounds):
+            keys = [f"s:{j}" for j in range(n + r * batch, n + (r + 1) * batch)]
+            t0 = time.perf_counter()
+            store.append(keys, ts + r + 1, x, x)
+            times.append(time.perf_counter() - t0)
+        assert len(store) == n
+        print(f"{n:>9,} tracked  append {batch:,} new posts {statistics.median(times) * 1000:6.2f} ms")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--posts", type=int, nargs="+", default=[10_000, 50_000])
+    ap.add_argument("--cycles", type=int, default=20)
+    ap.add_argument("--hot", type=float, nargs="+", default=[1.0, 0.1])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--tracked", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    args = ap.parse_args()
+
+    _check(_cycles(500, 25))
+    _check(_cycles(500, 25, hot=0.1))
+
+    for hot, n in ((h, n) for h in args.hot for n in args.posts):
+        cycles = _cycles(n, args.cycles, hot=hot)
+        r = _best(
+            {
+                "legacy": LegacyEngine,
+                "py-rich": PyRichEngine,
+                "numpy": lambda: TrendEngine(TrendStore(max_entries=n * 2)),
+            },
+            cycles,
+            args.repeat,
+        )
+        (legacy, n_legacy), (rich, _), (vec, n_vec) = r["legacy"], r["py-rich"], r["numpy"]
+        print(
+            f"{n:>7} posts/cycle {hot:4.0%} hot  legacy {legacy * 1000:7.1f} ms  py-rich {rich * 1000:7.1f} ms  "
+            f"numpy {vec * 1000:7.1f} ms  (x{legacy / vec:.2f} vs legacy, x{rich / vec:.1f} vs py-rich)  "
+            f"candidates/cycle legacy {n_legacy:,.0f} numpy {n_vec:,.0f}"
+        )
+
+    _store_scaling(args.tracked)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+TrendStore soak: simulate days of 20s polling with steady post churn and show
+that entry count and traced memory stay flat once the window is full.
+
+    PYTHONPATH=src python benchmarks/bench_trend_store_soak.py [--days 3] [--posts-per-cycle 100]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+from rot.core.types import Post, ThreadSnapshot
+from rot.trend.trend_engine import TrendEngine
+from rot.trend.trend_store import TrendStore
+
+
+def _snap(i: int, ts: int) -> ThreadSnapshot:
+    post = Post(
+        id=f"p{i}", created_utc=ts, subreddit="wallstreetbets", title="x" * 80, selftext="y" * 2000,
+        url="", score=ts % 997, num_comments=ts % 101, upvote_ratio=0.9, author="a", permalink="",
+    )
+    return ThreadSnapshot(snapshot_ts=ts, post=post)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--days", type=float, default=3.0)
+    ap.add_argument("--interval", type=int, default=20)
+    ap.add_argument("--posts-per-cycle", type=int, default=100)
+    ap.add_argument("--new-per-cycle", type=int, default=5)
+    ap.add_argument("--max-entries", type=int, default=100_000)
+    args = ap.parse_args()
+
+    engine = TrendEngine(store=TrendStore(max_entries=args.max_entries), window_s=1800)
+    cycles = int(args.days * 86400 / args.interval)
+    report_every = max(1, cycles // 12)
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    first_id = 0
+    for cycle in range(cycles):
+        ts = cycle * args.interval
+        first_id += args.new_per_cycle
+        snaps = [_snap(first_id + j, ts) for j in range(args.posts_per_cycle)]
+        engine.detect(snaps)
+        if cycle % report_every == 0 or cycle == cycles - 1:
+            cur, _ = tracemalloc.get_traced_memory()
+            st = engine.store.stats()
+            print(
+                f"day {ts / 86400:5.2f}  entries={st['entries']:>7}  expired={st['expired']:>8}  "
+                f"approx={st['approx_bytes'] / 1024:8.0f} KiB  traced={cur / 1024:8.0f} KiB"
+            )
+    dt = time.perf_counter() - t0
+    print(f"{cycles} cycles, {cycles * args.posts_per_cycle / dt:,.0f} snapshots/s")
+
+
+if __name__ == "__main__":
+    main()
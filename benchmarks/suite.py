@@ -0,0 +1,392 @@
+"""
+Benchmark suite for the pipeline hot paths, with machine-readable output.
+
+Each case builds its fixture once (synthetic or from the recorded
+storage/*.jsonl), then times one operation repeatedly for at least
+`--min-time` seconds. Results are written as JSON: per case the number of
+timed ops, items per op, mean/p50/p99/min/max seconds per op and items/s,
+plus the git commit and interpreter, so runs can be stored and compared
+across commits.
+
+    PYTHONPATH=src python benchmarks/suite.py [-k detect] [--min-time 1] [--out bench.json]
+    PYTHONPATH=src python benchmarks/suite.py --compare bench.json [--threshold 0.2]
+
+--compare exits with status 1 if any case's p50 regressed by more than
+`--threshold` against the saved run.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from _data import STORAGE, iter_jsonl, load_snapshots
+from _fake_reddit import FakeReddit
+from rot.app.runner import PipelineRunner
+from rot.core.logging import JsonlLogger
+from rot.core.types import Post, ThreadSnapshot, TrendCandidate
+from rot.credibility.scorer import CredibilityScorer
+from rot.extract.entity_extractor import EntityExtractor
+from rot.extract.event_builder import EventBuilder
+from rot.ingest.reddit_ingestor import RedditIngestor
+from rot.ingest.seen_store import SeenStore, SqliteSeenStore
+from rot.market.enricher import MarketEnricher
+from rot.market.provider import InMemoryProvider, ReplayProvider
+from rot.market.symbol_validator import SymbolValidator
+from rot.market.trade_builder import TradeBuilder
+from rot.reasoner.deepseek_client import DeepSeekReasoner
+from rot.trend.ticker_ranker import top_ticker_candidates
+from rot.trend.trend_engine import TrendEngine
+from rot.trend.trend_store import TrendStore
+
+
+@dataclass
+class Case:
+    """
+    fn(x) is the timed operation; `prepare` (untimed) produces x before each
+    call, for cases that need fresh input every time.
+    """
+
+    fn: Callable[[Any], Any]
+    items: int = 1
+    prepare: Optional[Callable[[], Any]] = None
+    close: Optional[Callable[[], None]] = None
+
+
+CASES: Dict[str, Callable[[Path], Case]] = {}
+
+
+def case(name: str) -> Callable[[Callable[[Path], Case]], Callable[[Path], Case]]:
+    def register(setup: Callable[[Path], Case]) -> Callable[[Path], Case]:
+        CASES[name] = setup
+        return setup
+
+    return register
+
+
+def _recorded() -> List[ThreadSnapshot]:
+    snaps = load_snapshots()
+    if not snaps:
+        raise SystemExit("storage/snapshots.jsonl is empty; the suite needs the recorded fixture")
+    return snaps
+
+
+def _rand_symbols(rng: random.Random, n: int) -> List[str]:
+    return ["".join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 5))) for _ in range(n)]
+
+
+# -- cases ---------------------------------------------------------------
+
+
+def _detect_case(posts: List[Post], step_s: int = 60) -> Case:
+    engine = TrendEngine(store=TrendStore(), window_s=1800)
+    rng = random.Random(7)
+    state = {"ts": max(p.created_utc for p in posts) + 60, "scores": [p.score for p in posts], "coms": [p.num_comments for p in posts]}
+
+    def prepare() -> List[ThreadSnapshot]:
+        state["ts"] += step_s
+        out = []
+        for i, p in enumerate(posts):
+            state["scores"][i] += rng.randint(0, 20)
+            state["coms"][i] += rng.randint(0, 5)
+            out.append(ThreadSnapshot(state["ts"], Post(
+                p.id, p.created_utc, p.subreddit, p.title, p.selftext, p.url,
+                state["scores"][i], state["coms"][i], p.upvote_ratio, p.author, p.permalink,
+            )))
+        return out
+
+    return Case(fn=engine.detect, items=len(posts), prepare=prepare)
+
+
+@case("trend_engine.detect[recorded]")
+def _detect_recorded(tmp: Path) -> Case:
+    uniq = {s.post.id: s.post for s in _recorded()}
+    return _detect_case(list(uniq.values()))
+
+
+@case("trend_engine.detect[10k posts]")
+def _detect_synthetic(tmp: Path) -> Case:
+    rng = random.Random(1)
+    subs = ["wallstreetbets", "stocks", "options", "investing"]
+    posts = [Post(f"p{i}", 1_700_000_000 - rng.randint(0, 86_400), rng.choice(subs), "t", "", "", rng.randint(0, 500),
+                  rng.randint(0, 100), None, "a", "") for i in range(10_000)]
+    return _detect_case(posts)
+
+
+def _extract_case(cache_size: int) -> Case:
+    builder = EventBuilder(EntityExtractor(cache_size=cache_size))
+    posts = [s.post for s in _recorded()]
+
+    def fn(_: Any) -> None:
+        for p in posts:
+            builder.extract_entities(p.title, p.selftext, p.id)
+
+    return Case(fn=fn, items=len(posts))
+
+
+@case("event_builder.extract_entities[cold]")
+def _extract_cold(tmp: Path) -> Case:
+    return _extract_case(cache_size=0)
+
+
+@case("event_builder.extract_entities[warm]")
+def _extract_warm(tmp: Path) -> Case:
+    return _extract_case(cache_size=50_000)
+
+
+@case("top_ticker_candidates[10k candidates]")
+def _ticker_rank(tmp: Path) -> Case:
+    rng = random.Random(3)
+    syms = _rand_symbols(rng, 2_000)
+    validator = SymbolValidator(cache_path=str(tmp / "valid.json"), provider=InMemoryProvider())
+    now = int(time.time())
+    validator._cache.update({s: {"ok": rng.random() < 0.6, "ts": now} for s in syms})
+
+    base = _recorded()
+    cands: List[TrendCandidate] = []
+    extracted: Dict[str, List[str]] = {}
+    for i in range(10_000):
+        snap = base[i % len(base)]
+        c = TrendCandidate(f"{snap.post.subreddit}:{snap.post.id}:{i}", 1800, {}, rng.random(), "rate_threshold", snap)
+        cands.append(c)
+        extracted[c.key] = rng.sample(syms, rng.randint(0, 3))
+
+    return Case(fn=lambda _: top_ticker_candidates(cands, extracted, validator), items=len(cands))
+
+
+def _logger_case(tmp: Path, buffered: bool, per_op: int) -> Case:
+    records = [r for r in iter_jsonl(STORAGE / "snapshots.jsonl")][:per_op]
+    records = (records * (per_op // max(1, len(records)) + 1))[:per_op]
+    log = JsonlLogger(root=str(tmp / "jsonl"), buffered=buffered)
+
+    def fn(_: Any) -> None:
+        for r in records:
+            log.write("snapshots", r)
+
+    return Case(fn=fn, items=per_op, close=log.close)
+
+
+@case("jsonl_logger.write[buffered]")
+def _logger_buffered(tmp: Path) -> Case:
+    return _logger_case(tmp, buffered=True, per_op=1_000)
+
+
+@case("jsonl_logger.write[unbuffered]")
+def _logger_unbuffered(tmp: Path) -> Case:
+    return _logger_case(tmp, buffered=False, per_op=100)
+
+
+def _seed_seen(store: SeenStore, n: int) -> None:
+    now = int(time.time())
+    for i in range(n):
+        store.update(f"p{i}", i % 997, i % 89, now)
+    store.save()
+
+
+@case("seen_store.load[json 100k]")
+def _seen_load(tmp: Path) -> Case:
+    path = str(tmp / "seen.json")
+    _seed_seen(SeenStore(path), 100_000)
+    return Case(fn=lambda s: s.load(), items=100_000, prepare=lambda: SeenStore(path))
+
+
+@case("seen_store.save[json 100k]")
+def _seen_save(tmp: Path) -> Case:
+    store = SeenStore(str(tmp / "seen.json"))
+    _seed_seen(store, 100_000)
+    n = [0]
+
+    def prepare() -> SeenStore:
+        n[0] += 1
+        store.update(f"p{n[0] % 100}", n[0], 1, int(time.time()))
+        return store
+
+    return Case(fn=lambda s: s.save(), items=100_000, prepare=prepare)
+
+
+@case("seen_store.poll_cycle[sqlite 100k]")
+def _seen_sqlite(tmp: Path) -> Case:
+    store = SqliteSeenStore(str(tmp / "seen.sqlite3"), import_json=str(tmp / "none.json"))
+    _seed_seen(store, 100_000)
+    rng = random.Random(5)
+    n = [0]
+
+    def fn(_: Any) -> None:
+        # one listing batch: lookup 100 posts, update the changed ones, persist
+        n[0] += 1
+        items = [(f"p{rng.randrange(100_000)}", n[0], 1) for _ in range(100)]
+        for (pid, score, nc), changed in zip(items, store.is_changed_many(items)):
+            if changed:
+                store.update(pid, score, nc, int(time.time()))
+        store.save()
+
+    return Case(fn=fn, items=100, close=store.close)
+
+
+@case("market_enricher.prefetch[5k cached]")
+def _enricher_cached(tmp: Path) -> Case:
+    rng = random.Random(9)
+    syms = sorted(set(_rand_symbols(rng, 6_000)))[:5_000]
+    enricher = MarketEnricher(cache_path=str(tmp / "market.sqlite3"), provider=InMemoryProvider())
+    enricher.cache.put_many({s: {"symbol": s, "last_price": 1.0} for s in syms})
+    lookups = [rng.choice(syms) for _ in range(1_000)]
+    return Case(fn=lambda _: enricher.prefetch(lookups), items=len(lookups))
+
+
+@case("pipeline.run_once[recorded, fake reddit+market]")
+def _run_once(tmp: Path) -> Case:
+    snaps = _recorded()
+    fake = FakeReddit(snaps, latency_s=0.0)
+    provider = ReplayProvider.from_file(str(STORAGE / "market_cache.json"))
+    runner = PipelineRunner(
+        ingestor=RedditIngestor(
+            subreddits=sorted(fake.posts), listing="hot", limit_per_sub=100,
+            state_path=str(tmp / "seen.sqlite3"), reddit_factory=lambda: fake,
+        ),
+        trend_engine=TrendEngine(store=TrendStore(), window_s=1800),
+        event_builder=EventBuilder(),
+        cred=CredibilityScorer(),
+        reasoner=DeepSeekReasoner(api_key=None),
+        trade_builder=TradeBuilder(),
+        logger=JsonlLogger(root=str(tmp / "out"), buffered=True),
+        enricher=MarketEnricher(cache_path=str(tmp / "market.json"), provider=provider),
+        symbol_validator=SymbolValidator(cache_path=str(tmp / "valid.json"), provider=provider),
+    )
+    subs = [s for posts in fake.posts.values() for s in posts]
+
+    def prepare() -> None:
+        # every post moved since the last poll, so none is deduped away
+        for s in subs:
+            s.score += 3
+            s.num_comments += 1
+
+    def close() -> None:
+        runner.ingestor.close()
+        runner.log.close()
+
+    return Case(fn=lambda _: runner.run_once(), items=len(subs), prepare=prepare, close=close)
+
+
+# -- harness -------------------------------------------------------------
+
+
+def _pct(sorted_vals: List[float], q: float) -> float:
+    i = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[i]
+
+
+def measure(c: Case, min_time: float, min_ops: int = 5, max_ops: int = 100_000) -> Dict[str, Any]:
+    prepare = c.prepare or (lambda: None)
+    c.fn(prepare())  # warm-up
+    times: List[float] = []
+    spent = 0.0
+    while (spent < min_time or len(times) < min_ops) and len(times) < max_ops:
+        x = prepare()
+        t0 = time.perf_counter()
+        c.fn(x)
+        dt = time.perf_counter() - t0
+        times.append(dt)
+        spent += dt
+    times.sort()
+    mean = spent / len(times)
+    return {
+        "ops": len(times),
+        "items_per_op": c.items,
+        "mean_s": mean,
+        "p50_s": _pct(times, 0.50),
+        "p99_s": _pct(times, 0.99),
+        "min_s": times[0],
+        "max_s": times[-1],
+        "items_per_s": c.items / mean if mean > 0 else 0.0,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(selected: List[str], min_time: float) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for name in selected:
+        with tempfile.TemporaryDirectory() as tmp:
+            # the runner prints leaderboards; keep stdout for the report
+            with contextlib.redirect_stdout(io.StringIO()):
+                c = CASES[name](Path(tmp))
+                try:
+                    results[name] = measure(c, min_time)
+                finally:
+                    if c.close:
+                        c.close()
+        r = results[name]
+        print(f"{name:<50} p50 {r['p50_s'] * 1e3:9.3f} ms  p99 {r['p99_s'] * 1e3:9.3f} ms  "
+              f"{r['items_per_s']:>12,.0f} items/s  ({r['ops']} ops)", file=sys.stderr)
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": int(time.time()),
+        "min_time_s": min_time,
+        "cases": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    """Print p50 ratios against `baseline`; True if nothing regressed past `threshold`."""
+    ok = True
+    print(f"vs {str(baseline.get('commit'))[:12]}:", file=sys.stderr)
+    for name, r in current["cases"].items():
+        old = baseline.get("cases", {}).get(name)
+        if not old:
+            continue
+        ratio = r["p50_s"] / old["p50_s"] if old["p50_s"] > 0 else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag, ok = "  REGRESSION", False
+        print(f"  {name:<50} x{ratio:5.2f}{flag}", file=sys.stderr)
+    return ok
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-k", dest="pattern", default="", help="only cases whose name contains this")
+    ap.add_argument("--min-time", type=float, default=1.0, help="seconds of timed ops per case")
+    ap.add_argument("--out", default=None, help="write the JSON report here instead of stdout")
+    ap.add_argument("--compare", default=None, help="JSON report of an earlier run")
+    ap.add_argument("--threshold", type=float, default=0.2)
+    ap.add_argument("--list", action="store_true")
+    args = ap.parse_args()
+
+    if args.list:
+        print("\n".join(CASES))
+        return
+    selected = [n for n in CASES if args.pattern in n]
+    report = run(selected, args.min_time)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if args.compare and not compare(report, json.loads(Path(args.compare).read_text(encoding="utf-8")), args.threshold):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,90 @@
 from __future__ import annotations
 
+import os
 import time
+from typing import Optional
 
+from rot.core import metrics
 from rot.core.logging import JsonlLogger
 from rot.ingest.reddit_ingestor import RedditIngestor
+from rot.ingest.scheduler import PollScheduler
 from rot.trend.trend_store import TrendStore
 from rot.trend.trend_engine import TrendEngine
+from rot.extract.dedupe import EventClusterer
+from rot.extract.entity_extractor import COMPANY_ALIASES, EntityExtractor
 from rot.extract.event_builder import EventBuilder
 from rot.credibility.scorer import CredibilityScorer
 from rot.reasoner.deepseek_client import DeepSeekReasoner
+from rot.market.options import OptionsChainCache, YFinanceOptionsProvider
+from rot.market.provider import default_provider
+from rot.market.symbol_validator import SymbolValidator
+from rot.market.symbols import SymbolSet
 from rot.market.trade_builder import TradeBuilder
 from rot.app.runner import PipelineRunner
+from rot.app.pipeline import StagedRunner
+from rot.app.profiling import SlowCycleProfiler
 
 
-def loop(interval_s: int = 20) -> None:
-    logger = JsonlLogger(root="storage")
+def loop(
+    interval_s: int = 20,
+    staged: bool = False,
+    metrics_port: Optional[int] = None,
+    profile_slow_s: Optional[float] = None,
+) -> None:
+    """
+    metrics_port (or ROT_METRICS_PORT) enables instrumentation: Prometheus
+    text on http://127.0.0.1:<port>/metrics and one snapshot per run in
+    storage/metrics.jsonl.
 
-    ingestor = RedditIngestor(subreddits=["wallstreetbets", "stocks"], listing="hot", limit_per_sub=50)
+    profile_slow_s (or ROT_PROFILE_SLOW_S) profiles every run_once() and
+    keeps a dump of each cycle slower than that under storage/profiles/
+    (ROT_PROFILE_MODE=cprofile adds pstats; ROT_PROFILE_KEEP, default 20).
+    """
+    if metrics_port is None and os.getenv("ROT_METRICS_PORT"):
+        metrics_port = int(os.environ["ROT_METRICS_PORT"])
+    if profile_slow_s is None and os.getenv("ROT_PROFILE_SLOW_S"):
+        profile_slow_s = float(os.environ["ROT_PROFILE_SLOW_S"])
+    profiler = (
+        SlowCycleProfiler(
+            threshold_s=profile_slow_s,
+            mode=os.getenv("ROT_PROFILE_MODE", "sample"),  # type: ignore[arg-type]
+            keep=int(os.getenv("ROT_PROFILE_KEEP", "20")),
+        )
+        if profile_slow_s
+        else None
+    )
+    metrics_server = metrics.serve(metrics_port) if metrics_port else None
+
+    logger = JsonlLogger(root="storage", buffered=True)
+
+    ingestor_rpm = 90  # stay under Reddit's 100 QPM OAuth budget
+    ingestor = RedditIngestor(
+        subreddits=["wallstreetbets", "stocks"],
+        listing="hot",
+        limit_per_sub=50,
+        max_workers=4,
+        requests_per_min=ingestor_rpm,
+        state_path="storage/seen_posts.sqlite3",  # imports seen_posts.json on first run
+        seen_horizon_s=7 * 24 * 3600,
+    )
     trend_engine = TrendEngine(store=TrendStore(), window_s=1800)
-    event_builder = EventBuilder()
-    cred = CredibilityScorer()
-    reasoner = DeepSeekReasoner(api_key=None)
-    trade_builder = TradeBuilder()
+    # Ticker directory (storage/nasdaqlisted.txt, otherlisted.txt): listed
+    # symbols validate without a lookup and company names become aliases
+    symbols = SymbolSet()
+    extractor = EntityExtractor()
+    if symbols.authoritative():
+        extractor.add_names({**symbols.company_names(), **COMPANY_ALIASES})
+    event_builder = EventBuilder(extractor=extractor, clusterer=EventClusterer())
+    cred = CredibilityScorer(path="storage/reputation.sqlite3")
+    # Stub packets unless ROT_DEEPSEEK_API_KEY is set
+    reasoner = DeepSeekReasoner(
+        api_key=os.getenv("ROT_DEEPSEEK_API_KEY"),
+        cache_path="storage/reasoning_cache.jsonl",
+    )
+    # Option chains share the market provider's throttle; cached 15 minutes per underlying
+    trade_builder = TradeBuilder(
+        chains=OptionsChainCache(YFinanceOptionsProvider(rate_limiter=default_provider().rate_limiter))
+    )
 
     runner = PipelineRunner(
         ingestor=ingestor,
@@ -31,18 +94,44 @@ def loop(interval_s: int = 20) -> None:
         reasoner=reasoner,
         trade_builder=trade_builder,
         logger=logger,
+        symbol_validator=SymbolValidator(symbols=symbols),
     )
 
-    while True:
-        summary = runner.run_once()
-        print(f"✅ {summary['run_id']} | snapshots={summary['snapshots']} candidates={summary['candidates']} ticker_candidates={summary['ticker_candidates']} events={summary['events']} ideas={summary['trade_ideas']} top_all={summary['top_signals']} top_ticker={summary['top_ticker_signals']}")
-        print(
-            f"✅ {summary['run_id']} | snapshots={summary['snapshots']} "
-            f"candidates={summary['candidates']} ticker_candidates={summary['ticker_candidates']} "
-            f"events={summary['events']} ideas={summary['trade_ideas']} "
-            f"top_all={summary['top_signals']} top_ticker={summary['top_ticker_signals']}"
-        )
-        time.sleep(interval_s)
+    try:
+        if staged:
+            # Overlapping stages: polls keep their cadence while enrichment and
+            # reasoning catch up in the background.
+            staged_runner = StagedRunner(runner, interval_s=interval_s).start()
+            try:
+                while True:
+                    time.sleep(interval_s)
+                    print(f"📊 {staged_runner.stats()}")
+            finally:
+                staged_runner.stop(drain=True)
+        else:
+            # Per-subreddit cadence: the request spend of polling everything
+            # every interval_s, shifted from quiet sources to busy ones. The
+            # ingestor's rate limiter still caps bursts at ingestor_rpm.
+            scheduler = PollScheduler(ingestor.sources(), base_interval_s=interval_s)
+            while True:
+                sources = scheduler.wait()
+                if profiler:
+                    summary = profiler.run(runner.run_once, sources)
+                else:
+                    summary = runner.run_once(sources)
+                scheduler.record_poll(ingestor.last_poll)
+                print(
+                    f"✅ {summary['run_id']} | snapshots={summary['snapshots']} "
+                    f"candidates={summary['candidates']} ticker_candidates={summary['ticker_candidates']} "
+                    f"events={summary['events']} ideas={summary['trade_ideas']} "
+                    f"top_all={summary['top_signals']} top_ticker={summary['top_ticker_signals']}"
+                )
+    finally:
+        ingestor.close()
+        reasoner.close()
+        logger.close()
+        if metrics_server is not None:
+            metrics_server.shutdown()
 
 
 if __name__ == "__main__":
@@ -1,25 +1,46 @@
 from __future__ import annotations
 
+import os
+
 from rot.core.logging import JsonlLogger
 from rot.ingest.reddit_ingestor import RedditIngestor
 from rot.trend.trend_store import TrendStore
 from rot.trend.trend_engine import TrendEngine
+from rot.extract.dedupe import EventClusterer
+from rot.extract.entity_extractor import COMPANY_ALIASES, EntityExtractor
 from rot.extract.event_builder import EventBuilder
 from rot.credibility.scorer import CredibilityScorer
 from rot.reasoner.deepseek_client import DeepSeekReasoner
+from rot.market.options import OptionsChainCache, YFinanceOptionsProvider
+from rot.market.provider import default_provider
+from rot.market.symbol_validator import SymbolValidator
+from rot.market.symbols import SymbolSet
 from rot.market.trade_builder import TradeBuilder
 from rot.app.runner import PipelineRunner
 
 
 def main() -> None:
-    logger = JsonlLogger(root="storage")
+    logger = JsonlLogger(root="storage", buffered=True)
 
     ingestor = RedditIngestor(subreddits=["wallstreetbets", "stocks"], listing="rising")
     trend_engine = TrendEngine(store=TrendStore(), window_s=1800)
-    event_builder = EventBuilder()
-    cred = CredibilityScorer()
-    reasoner = DeepSeekReasoner(api_key=None)
-    trade_builder = TradeBuilder()
+    # Ticker directory (storage/nasdaqlisted.txt, otherlisted.txt): listed
+    # symbols validate without a lookup and company names become aliases
+    symbols = SymbolSet()
+    extractor = EntityExtractor()
+    if symbols.authoritative():
+        extractor.add_names({**symbols.company_names(), **COMPANY_ALIASES})
+    event_builder = EventBuilder(extractor=extractor, clusterer=EventClusterer())
+    cred = CredibilityScorer(path="storage/reputation.sqlite3")
+    # Stub packets unless ROT_DEEPSEEK_API_KEY is set
+    reasoner = DeepSeekReasoner(
+        api_key=os.getenv("ROT_DEEPSEEK_API_KEY"),
+        cache_path="storage/reasoning_cache.jsonl",
+    )
+    # Option chains share the market provider's throttle; cached 15 minutes per underlying
+    trade_builder = TradeBuilder(
+        chains=OptionsChainCache(YFinanceOptionsProvider(rate_limiter=default_provider().rate_limiter))
+    )
 
     runner = PipelineRunner(
         ingestor=ingestor,
@@ -29,9 +50,15 @@ def main() -> None:
         reasoner=reasoner,
         trade_builder=trade_builder,
         logger=logger,
+        symbol_validator=SymbolValidator(symbols=symbols),
     )
 
-    runner.run_once()
+    try:
+        runner.run_once()
+    finally:
+        ingestor.close()
+        reasoner.close()
+        logger.close()
 
 
 if __name__ == "__main__":
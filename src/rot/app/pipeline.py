@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from rot.app.runner import PipelineRunner
+from rot.core.types import Event, ReasoningPacket, ThreadSnapshot
+
+_STOP = object()
+
+
+class StageStats:
+    """Counters and a sliding window of per-item latencies for one stage."""
+
+    def __init__(self, window: int = 1024) -> None:
+        self.processed = 0
+        self.errors = 0
+        self.busy = 0
+        self._lat: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def begin(self) -> None:
+        with self._lock:
+            self.busy += 1
+
+    def record(self, seconds: float, ok: bool = True, n: int = 1) -> None:
+        with self._lock:
+            self.busy = max(0, self.busy - 1)
+            self.processed += n
+            if not ok:
+                self.errors += n
+            self._lat.append(seconds)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            lat = sorted(self._lat)
+            out: Dict[str, float] = {"processed": self.processed, "errors": self.errors, "busy": self.busy}
+        if lat:
+            out["p50_ms"] = lat[len(lat) // 2] * 1000.0
+            out["p99_ms"] = lat[min(len(lat) - 1, int(len(lat) * 0.99))] * 1000.0
+            out["max_ms"] = lat[-1] * 1000.0
+        return out
+
+
+class Stage:
+    """
+    One pipeline stage: `fn(item)` returns an iterable of items for the next
+    stage (empty to drop). `workers` threads pull from a bounded input queue
+    of `maxsize`; a full queue blocks the upstream stage (backpressure).
+
+    With `batch` > 1, `fn` gets a list instead: the item a worker woke up for
+    plus whatever is already queued behind it, up to `batch` items. It never
+    waits for more.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Any], Optional[Iterable[Any]]],
+        workers: int = 1,
+        maxsize: int = 64,
+        batch: int = 1,
+    ) -> None:
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, int(workers))
+        self.batch = max(1, int(batch))
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, int(maxsize)))
+        self.stats = StageStats()
+        self.last_error: Optional[BaseException] = None
+        self._threads: List[threading.Thread] = []
+
+
+class StagePipeline:
+    """
+    Stages connected by bounded queues, each served by its own worker threads.
+
+    submit() feeds the first stage and blocks while its queue is full. An
+    exception in a stage is counted, kept as `last_error`, and drops that item
+    only. stop(drain=True) waits until every queued item went through all
+    stages.
+    """
+
+    def __init__(self, stages: List[Stage]) -> None:
+        if not stages:
+            raise ValueError("StagePipeline needs at least one stage")
+        self.stages = stages
+        self._started = False
+
+    def start(self) -> "StagePipeline":
+        if self._started:
+            return self
+        self._started = True
+        for i, st in enumerate(self.stages):
+            nxt = self.stages[i + 1] if i + 1 < len(self.stages) else None
+            for w in range(st.workers):
+                t = threading.Thread(target=self._work, args=(st, nxt), name=f"rot-{st.name}-{w}", daemon=True)
+                t.start()
+                st._threads.append(t)
+        return self
+
+    def _work(self, st: Stage, nxt: Optional[Stage]) -> None:
+        while True:
+            item = st.queue.get()
+            if item is _STOP:
+                st.queue.task_done()
+                return
+            items = [item]
+            stop = False
+            while len(items) < st.batch:
+                try:
+                    more = st.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is _STOP:
+                    stop = True
+                    break
+                items.append(more)
+            st.stats.begin()
+            t0 = time.perf_counter()
+            ok = True
+            try:
+                out = st.fn(items if st.batch > 1 else item)
+                if out is not None and nxt is not None:
+                    for o in out:
+                        nxt.queue.put(o)
+            except Exception as e:
+                ok = False
+                st.last_error = e
+            finally:
+                st.stats.record(time.perf_counter() - t0, ok, n=len(items))
+                for _ in range(len(items) + stop):
+                    st.queue.task_done()
+            if stop:
+                return
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> None:
+        self.stages[0].queue.put(item, timeout=timeout)
+
+    def join(self) -> None:
+        """Block until every submitted item has left the last stage."""
+        for st in self.stages:
+            st.queue.join()
+
+    def stop(self, drain: bool = True) -> None:
+        if drain:
+            self.join()
+        else:
+            for st in self.stages:
+                while True:
+                    try:
+                        st.queue.get_nowait()
+                        st.queue.task_done()
+                    except queue.Empty:
+                        break
+        for st in self.stages:
+            for _ in st._threads:
+                st.queue.put(_STOP)
+            for t in st._threads:
+                t.join()
+            st._threads.clear()
+        self._started = False
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per stage: queue depth, in-flight items, counts and latency percentiles."""
+        out = {}
+        for st in self.stages:
+            s = st.stats.snapshot()
+            s["queue_depth"] = st.queue.qsize()
+            s["queue_max"] = st.queue.maxsize
+            s["workers"] = st.workers
+            out[st.name] = s
+        return out
+
+
+class StagedRunner:
+    """
+    PipelineRunner's stages, overlapped.
+
+    A timer thread polls every `interval_s` on a fixed schedule (not
+    `interval_s` after the previous cycle finished), so slow market data or
+    reasoning never delays ingestion; a missed tick is skipped and counted.
+    Each poll flows through detect -> enrich -> reason -> trade, where detect
+    is single-threaded (trend state is order dependent) and reasoning runs
+    `reason_workers` events at a time. The trade stage takes every reasoned
+    event already queued and builds ideas per run with one trade_batch()
+    call, so option chains are fetched once per batch, not per event. When
+    downstream queues fill up, the timer blocks on submit until there is room
+    again.
+    """
+
+    def __init__(
+        self,
+        runner: PipelineRunner,
+        interval_s: float = 20.0,
+        reason_workers: int = 4,
+        enrich_workers: int = 1,
+        maxsize: int = 8,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.runner = runner
+        self.interval_s = interval_s
+        self.clock = clock
+        self.ticks = 0
+        self.missed_ticks = 0
+        self.ingest_stats = StageStats()
+        self.last_error: Optional[BaseException] = None
+        self._stop = threading.Event()
+        self._timer: Optional[threading.Thread] = None
+
+        self.pipeline = StagePipeline(
+            [
+                Stage("detect", self._detect, workers=1, maxsize=maxsize),
+                Stage("enrich", self._enrich, workers=enrich_workers, maxsize=maxsize),
+                Stage("reason", self._reason, workers=reason_workers, maxsize=maxsize * 16),
+                Stage("trade", self._trade, workers=1, maxsize=maxsize * 16, batch=maxsize * 16),
+            ]
+        )
+
+    # -- stage adapters: items are (run_id, payload) tuples ---------------
+
+    def _detect(self, item: Tuple[str, List[ThreadSnapshot]]) -> Iterator[Tuple[str, List[Event]]]:
+        run_id, snapshots = item
+        yield run_id, self.runner.detect(run_id, snapshots)["events"]
+
+    def _enrich(self, item: Tuple[str, List[Event]]) -> Iterator[Tuple[str, Event]]:
+        run_id, events = item
+        for e in self.runner.enrich(run_id, events):
+            yield run_id, e
+
+    def _reason(self, item: Tuple[str, Event]) -> Iterator[Tuple[str, Event, ReasoningPacket]]:
+        run_id, e = item
+        yield run_id, e, self.runner.reason(run_id, e)
+
+    def _trade(self, items: List[Tuple[str, Event, ReasoningPacket]]) -> None:
+        runs: Dict[str, Tuple[List[ReasoningPacket], List[Event]]] = {}
+        for run_id, e, packet in items:
+            packets, events = runs.setdefault(run_id, ([], []))
+            packets.append(packet)
+            events.append(e)
+        for run_id, (packets, events) in runs.items():
+            self.runner.trade_batch(run_id, packets, events)
+        return None
+
+    # -- ingestion timer ---------------------------------------------------
+
+    def poll_once(self) -> None:
+        run_id = f"run_{int(time.time())}"
+        self.ingest_stats.begin()
+        t0 = time.perf_counter()
+        ok = True
+        try:
+            snapshots = self.runner.ingest(run_id)
+        except Exception as e:
+            ok = False
+            self.last_error = e
+            snapshots = []
+        finally:
+            self.ingest_stats.record(time.perf_counter() - t0, ok)
+        self.ticks += 1
+        self.pipeline.submit((run_id, snapshots))
+        self.runner.end_run(run_id)
+
+    def _tick_loop(self) -> None:
+        next_t = self.clock()
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                # keep ticking: a dead timer thread would stop ingestion for good
+                self.last_error = e
+            next_t += self.interval_s
+            now = self.clock()
+            if now > next_t:
+                skipped = int((now - next_t) // self.interval_s) + 1
+                self.missed_ticks += skipped
+                next_t += skipped * self.interval_s
+            self._stop.wait(max(0.0, next_t - now))
+
+    def start(self) -> "StagedRunner":
+        self.pipeline.start()
+        self._stop.clear()
+        self._timer = threading.Thread(target=self._tick_loop, name="rot-ingest", daemon=True)
+        self._timer.start()
+        return self
+
+    def stop(self, drain: bool = True) -> None:
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.join()
+            self._timer = None
+        self.pipeline.stop(drain=drain)
+        self.runner.end_run()
+
+    def stats(self) -> Dict[str, Any]:
+        ingest = self.ingest_stats.snapshot()
+        ingest["ticks"] = self.ticks
+        ingest["missed_ticks"] = self.missed_ticks
+        return {"ingest": ingest, **self.pipeline.stats()}
@@ -0,0 +1,225 @@
+"""
+Slow-cycle capture for the run loop.
+
+SlowCycleProfiler wraps one call (PipelineRunner.run_once) at a time. A
+sampling thread records the Python stacks of every thread every
+`sample_interval_s`, so time spent in ingest workers (PRAW), market data
+fetches (yfinance) or the reasoner pool is visible too. mode="cprofile" also
+runs cProfile on the calling thread. Cycles faster than `threshold_s` are
+thrown away. Slower ones are written to
+<out_dir>/<UTC time>-<run_id>-<ms>ms/:
+
+    stacks.folded   collapsed stacks (flamegraph.pl, speedscope, inferno)
+    profile.pstats  cProfile stats (mode="cprofile"; python -m pstats ...)
+    summary.txt     wall time, samples by package, top frames, top pstats
+
+Only the newest `keep` dumps are kept.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import shutil
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+
+Mode = Literal["sample", "cprofile"]
+
+# Innermost frames of threads that are parked, not working.
+_IDLE: frozenset = frozenset({
+    ("threading", "wait"),
+    ("threading", "Condition.wait"),
+    ("concurrent.futures.thread", "_worker"),
+    ("queue", "get"),
+    ("queue", "Queue.get"),
+    ("selectors", "select"),
+    ("selectors", "PollSelector.select"),
+    ("selectors", "EpollSelector.select"),
+})
+
+_STDLIB = frozenset(getattr(sys, "stdlib_module_names", ())) | {"__main__"}
+
+
+def _frame_key(f: Any) -> Tuple[str, str]:
+    code = f.f_code
+    return f.f_globals.get("__name__", "?"), getattr(code, "co_qualname", code.co_name)
+
+
+def _package(module: str) -> str:
+    # rot.* by subpackage (rot.market, rot.ingest...), everything else by top level
+    parts = module.split(".")
+    return ".".join(parts[:2]) if parts[0] == "rot" else parts[0]
+
+
+class StackSampler:
+    """Background thread counting collapsed stacks of all other threads."""
+
+    def __init__(self, interval_s: float = 0.005) -> None:
+        self.interval_s = interval_s
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._focus = 0
+
+    def start(self) -> "StackSampler":
+        self._focus = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rot-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.stacks
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval_s):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack: List[Tuple[str, str]] = []
+                f = frame
+                while f is not None:
+                    stack.append(_frame_key(f))
+                    f = f.f_back
+                if ident != self._focus and stack and stack[0] in _IDLE:
+                    continue
+                stack.reverse()
+                self.stacks[(names.get(ident, str(ident)),) + tuple(stack)] += 1
+            self.samples += 1
+
+
+def collapsed(stacks: Counter) -> str:
+    """Brendan Gregg's folded format: `thread;outer;...;inner count` per line."""
+    lines = []
+    for stack, n in stacks.most_common():
+        thread, frames = stack[0], stack[1:]
+        lines.append(";".join([thread] + [f"{m}:{fn}" for m, fn in frames]) + f" {n}")
+    return "\n".join(lines) + "\n"
+
+
+def by_package(stacks: Counter) -> Counter:
+    """
+    Samples attributed to the innermost non-stdlib frame's package (yfinance,
+    praw, rot.core, ...), or to the innermost stdlib module if there is none.
+    """
+    out: Counter = Counter()
+    for stack, n in stacks.items():
+        frames = stack[1:]
+        owner = None
+        for module, _ in reversed(frames):
+            if module.split(".")[0] not in _STDLIB:
+                owner = _package(module)
+                break
+        if owner is None:
+            owner = frames[-1][0].split(".")[0] if frames else "?"
+        out[owner] += n
+    return out
+
+
+class SlowCycleProfiler:
+    def __init__(
+        self,
+        threshold_s: float,
+        out_dir: str = "storage/profiles",
+        keep: int = 20,
+        mode: Mode = "sample",
+        sample_interval_s: float = 0.005,
+    ) -> None:
+        if mode not in ("sample", "cprofile"):
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.threshold_s = threshold_s
+        self.out_dir = Path(out_dir)
+        self.keep = max(1, int(keep))
+        self.mode = mode
+        self.sample_interval_s = sample_interval_s
+        self.cycles = 0
+        self.dumps = 0
+        self.last_dump: Optional[Path] = None
+
+    def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call fn(*args, **kwargs) under the profiler; dump if it was slow."""
+        sampler = StackSampler(self.sample_interval_s).start()
+        prof = cProfile.Profile() if self.mode == "cprofile" else None
+        result: Any = None
+        t0 = time.perf_counter()
+        try:
+            if prof is not None:
+                prof.enable()
+            result = fn(*args, **kwargs)
+            return result
+        finally:
+            if prof is not None:
+                prof.disable()
+            elapsed = time.perf_counter() - t0
+            stacks = sampler.stop()
+            self.cycles += 1
+            if elapsed >= self.threshold_s:
+                run_id = result.get("run_id") if isinstance(result, dict) else None
+                try:
+                    self.last_dump = self._dump(elapsed, stacks, prof, run_id or "cycle", sampler.samples)
+                    self.dumps += 1
+                    self._rotate()
+                except OSError as e:
+                    # profiling must never take the loop down
+                    print(f"profiling: could not write slow-cycle dump: {e}", file=sys.stderr)
+
+    def _dump(self, elapsed: float, stacks: Counter, prof: Optional[cProfile.Profile], run_id: str, samples: int) -> Path:
+        stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+        name = f"{stamp}-{run_id}-{int(elapsed * 1000)}ms".replace(os.sep, "_")
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.out_dir / f".tmp-{name}"
+        tmp.mkdir(parents=True, exist_ok=True)
+
+        (tmp / "stacks.folded").write_text(collapsed(stacks), encoding="utf-8")
+
+        total = sum(stacks.values()) or 1
+        lines = [
+            f"run_id: {run_id}",
+            f"wall: {elapsed:.3f}s (threshold {self.threshold_s:.3f}s)",
+            f"samples: {samples} every {self.sample_interval_s * 1000:.1f}ms, {sum(stacks.values())} thread-stacks",
+            "",
+            "samples by package (innermost non-stdlib frame):",
+        ]
+        for pkg, n in by_package(stacks).most_common(15):
+            lines.append(f"  {n / total:6.1%}  {pkg}")
+        leaf: Counter = Counter()
+        for stack, n in stacks.items():
+            if len(stack) > 1:
+                leaf["{}:{}".format(*stack[-1])] += n
+        lines += ["", "top frames (self samples):"]
+        for fn, n in leaf.most_common(15):
+            lines.append(f"  {n / total:6.1%}  {fn}")
+
+        if prof is not None:
+            prof.dump_stats(str(tmp / "profile.pstats"))
+            buf = io.StringIO()
+            pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(25)
+            lines += ["", "cProfile (calling thread), by cumulative time:", buf.getvalue()]
+
+        (tmp / "summary.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        final = self.out_dir / name
+        if final.exists():
+            shutil.rmtree(final)
+        os.replace(tmp, final)
+        return final
+
+    def _rotate(self) -> None:
+        dumps = sorted(p for p in self.out_dir.iterdir() if p.is_dir() and not p.name.startswith("."))
+        for old in dumps[: -self.keep]:
+            shutil.rmtree(old, ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"cycles": self.cycles, "dumps": self.dumps, "last_dump": str(self.last_dump) if self.last_dump else None}
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+from rot.app.runner import PipelineRunner
+from rot.core.logging import JsonlLogger
+from rot.credibility.scorer import CredibilityScorer
+from rot.extract.dedupe import EventClusterer
+from rot.extract.event_builder import EventBuilder
+from rot.ingest.replay import ReplayIngestor
+from rot.market.enricher import MarketEnricher
+from rot.market.options import OptionsChainCache, SyntheticOptionsProvider
+from rot.market.provider import ReplayProvider
+from rot.market.symbol_validator import SymbolValidator
+from rot.market.trade_builder import TradeBuilder
+from rot.reasoner.deepseek_client import DeepSeekReasoner
+from rot.trend.trend_engine import TrendEngine
+from rot.trend.trend_store import TrendStore
+
+
+def build_replay_runner(
+    snapshots_path: str = "storage/snapshots.jsonl",
+    market_cache: str = "storage/market_cache.json",
+    out_dir: str = "storage/replay",
+    speed: Optional[float] = None,
+) -> PipelineRunner:
+    """
+    PipelineRunner over recorded data only: snapshots from `snapshots_path`,
+    market data replayed from `market_cache` (no yfinance, no Reddit creds),
+    option chains synthesized around the replayed prices.
+    Everything the run writes, caches included, goes to `out_dir`, so live
+    storage is never touched and repeated replays see the same inputs.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    provider = ReplayProvider.from_file(market_cache)
+    return PipelineRunner(
+        ingestor=ReplayIngestor(snapshots_path, speed=speed),  # type: ignore[arg-type]
+        trend_engine=TrendEngine(store=TrendStore(), window_s=1800),
+        event_builder=EventBuilder(clusterer=EventClusterer()),
+        cred=CredibilityScorer(),
+        reasoner=DeepSeekReasoner(api_key=None),
+        trade_builder=TradeBuilder(chains=OptionsChainCache(SyntheticOptionsProvider(provider))),
+        logger=JsonlLogger(root=out_dir, buffered=True),
+        enricher=MarketEnricher(cache_path=os.path.join(out_dir, "market_cache.json"), provider=provider),
+        symbol_validator=SymbolValidator(cache_path=os.path.join(out_dir, "symbol_valid_cache.json"), provider=provider),
+    )
+
+
+class _Meter:
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self.items = 0
+
+    def add(self, seconds: float, items: int) -> None:
+        self.seconds += seconds
+        self.items += items
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "items": self.items,
+            "seconds": round(self.seconds, 4),
+            "items_per_s": round(self.items / self.seconds, 1) if self.seconds > 0 else 0.0,
+        }
+
+
+def run_replay(runner: PipelineRunner, max_polls: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Drive `runner` (with a ReplayIngestor) through the recording, stage by
+    stage, and return per-stage throughput. Items are snapshots for ingest
+    and detect, events for enrich and reason, trade ideas for trade.
+    """
+    ingestor = runner.ingestor
+    meters = {name: _Meter() for name in ("ingest", "detect", "enrich", "reason", "trade")}
+    totals = {"polls": 0, "snapshots": 0, "candidates": 0, "events": 0, "trade_ideas": 0}
+    t_start = time.perf_counter()
+
+    while not getattr(ingestor, "exhausted", False):
+        if max_polls is not None and totals["polls"] >= max_polls:
+            break
+        run_id = f"replay_{totals['polls']:06d}"
+
+        t0 = time.perf_counter()
+        snaps = runner.ingest(run_id)
+        t1 = time.perf_counter()
+        if not snaps:
+            continue
+        meters["ingest"].add(t1 - t0, len(snaps))
+
+        detected = runner.detect(run_id, snaps)
+        t2 = time.perf_counter()
+        meters["detect"].add(t2 - t1, len(snaps))
+
+        scored = runner.enrich(run_id, detected["events"])
+        t3 = time.perf_counter()
+        meters["enrich"].add(t3 - t2, len(scored))
+
+        packets = runner.reason_batch(run_id, scored)
+        t4 = time.perf_counter()
+        meters["reason"].add(t4 - t3, len(scored))
+
+        ideas = len(runner.trade_batch(run_id, packets, scored))
+        meters["trade"].add(time.perf_counter() - t4, ideas)
+
+        runner.end_run(run_id)
+        totals["polls"] += 1
+        totals["snapshots"] += len(snaps)
+        totals["candidates"] += detected["candidates"]
+        totals["events"] += len(scored)
+        totals["trade_ideas"] += ideas
+
+    wall = time.perf_counter() - t_start
+    runner.log.close()
+    return {
+        **totals,
+        "wall_s": round(wall, 4),
+        "snapshots_per_s": round(totals["snapshots"] / wall, 1) if wall > 0 else 0.0,
+        "stages": {name: m.summary() for name, m in meters.items()},
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Replay recorded snapshots through the pipeline.")
+    ap.add_argument("snapshots", nargs="?", default="storage/snapshots.jsonl")
+    ap.add_argument("--market-cache", default="storage/market_cache.json")
+    ap.add_argument("--out", default="storage/replay")
+    ap.add_argument("--speed", type=float, default=0.0, help="1=real time, 60=a minute per second, 0=max")
+    ap.add_argument("--max-polls", type=int, default=None)
+    args = ap.parse_args()
+
+    runner = build_replay_runner(args.snapshots, args.market_cache, args.out, speed=args.speed)
+    print(json.dumps(run_replay(runner, args.max_polls), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,20 @@
 from __future__ import annotations
 
 import time
+from typing import Any, Dict, List, Optional
 
+from rot.core import metrics
 from rot.core.logging import JsonlLogger
-from rot.ingest.reddit_ingestor import RedditIngestor
+from rot.core.types import Event, ReasoningPacket, ThreadSnapshot, TradeIdea
+from rot.ingest.reddit_ingestor import RedditIngestor, Source
 from rot.trend.trend_engine import TrendEngine
-from rot.trend.ranker import top_n_candidates
-from rot.trend.ticker_ranker import top_ticker_candidates
+from rot.trend.leaderboard import Leaderboards
 from rot.extract.event_builder import EventBuilder
 from rot.credibility.scorer import CredibilityScorer
 from rot.reasoner.deepseek_client import DeepSeekReasoner
 from rot.market.trade_builder import TradeBuilder
 from rot.market.enricher import MarketEnricher
-from rot.market.symbol_validator import SymbolValidator
+from rot.market.symbol_validator import SymbolValidator, ValidationMemo
 
 
 class PipelineRunner:
@@ -38,21 +40,45 @@ class PipelineRunner:
         self.enricher = enricher or MarketEnricher()
         self.symbol_validator = symbol_validator or SymbolValidator()
 
-    def run_once(self) -> dict:
-        run_id = f"run_{int(time.time())}"
-
-        # 1) ingest
-        snapshots = self.ingestor.poll()
-        for s in snapshots:
-            self.log.write("snapshots", {"run_id": run_id, "snapshot": s})
-
-        # 2) trend detect
+    # -- stages ----------------------------------------------------------
+    # run_once() calls these in sequence; rot.app.pipeline.StagedRunner runs
+    # the same methods as overlapping, queue-connected stages.
+
+    # Each stage records its duration into the rot_stage_seconds histogram
+    # and its output count into rot_items_total (no-ops unless enabled).
+
+    def ingest(self, run_id: str, sources: Optional[List[Source]] = None) -> List[ThreadSnapshot]:
+        """Poll the ingestor; `sources` limits a RedditIngestor to those (subreddit, listing) pairs."""
+        with metrics.span("rot_stage_seconds", stage="ingest"):
+            snapshots = self.ingestor.poll() if sources is None else self.ingestor.poll(sources)
+            for s in snapshots:
+                self.log.write("snapshots", {"run_id": run_id, "snapshot": s})
+        metrics.inc("rot_items_total", len(snapshots), kind="snapshots")
+        return snapshots
+
+    def detect(self, run_id: str, snapshots: List[ThreadSnapshot]) -> Dict[str, Any]:
+        """Trend detection, extraction, ranking and event building for one poll."""
+        with metrics.span("rot_stage_seconds", stage="detect"):
+            out = self._detect(run_id, snapshots)
+        metrics.inc("rot_items_total", out["candidates"], kind="candidates")
+        return out
+
+    def _detect(self, run_id: str, snapshots: List[ThreadSnapshot]) -> Dict[str, Any]:
         candidates = self.trend_engine.detect(snapshots)
         for c in candidates:
             self.log.write("trend_candidates", {"run_id": run_id, "candidate": c})
 
+        # Build extracted entities map once (used by prints + ticker ranking)
+        extracted = self.event_builder.extract_batch(c.snapshot.post for c in candidates)
+        extracted_by_key: dict[str, list[str]] = {c.key: ents for c, ents in zip(candidates, extracted)}
+
+        # Rank every candidate in one pass (all / ticker-aware / per-subreddit /
+        # per-ticker), validating each distinct symbol once per run.
+        boards = Leaderboards(n=5, memo=ValidationMemo(self.symbol_validator))
+        boards.extend(candidates, extracted_by_key)
+
         # 2a) Top signals (ALL)
-        top_all = top_n_candidates(candidates, n=5)
+        top_all = boards.all.items()
         for rank, c in enumerate(top_all, start=1):
             p = c.snapshot.post
             self.log.write(
@@ -68,13 +94,6 @@ class PipelineRunner:
                 },
             )
 
-        # Build extracted entities map once (used by prints + ticker ranking)
-        extracted_by_key: dict[str, list[str]] = {}
-        for c in candidates:
-            p = c.snapshot.post
-            ents = self.event_builder.extract_entities(p.title, p.selftext)
-            extracted_by_key[c.key] = ents
-
         if top_all:
             print("🔥 Top signals:")
             for i, c in enumerate(top_all, start=1):
@@ -85,28 +104,21 @@ class PipelineRunner:
 
         # 2b) Build events once, reuse downstream
         # Also track ticker-aware candidate count for summary
-        events = []
+        pairs = []
         ticker_candidates = []
 
         for c in candidates:
-            evs = self.event_builder.from_candidate(c)  # returns [] if no tickers
+            evs = self.event_builder.from_candidate(c, extracted_by_key.get(c.key))
             if evs:
                 ticker_candidates.append(c)
-                events.extend(evs)
+                pairs.extend((c, e) for e in evs)
 
-        ticker_candidate_count = sum(
-            1
-            for c in candidates
-            if any(self.symbol_validator.is_valid(sym) for sym in extracted_by_key.get(c.key, []))
-        )
+        # Cross-posts and reposts of one story become a single event
+        events = self.event_builder.merge_duplicates(pairs)
+        metrics.inc("rot_items_total", len(pairs) - len(events), kind="merged_events")
 
         # 2c) Top signals (TICKER-AWARE)
-        top_ticker_pairs = top_ticker_candidates(
-            candidates=candidates,
-            extracted=extracted_by_key,
-            validator=self.symbol_validator,
-            n=5,
-        )
+        top_ticker_pairs = boards.ticker.items()
 
         for rank, (c, syms) in enumerate(top_ticker_pairs, start=1):
             p = c.snapshot.post
@@ -129,30 +141,110 @@ class PipelineRunner:
             p = c.snapshot.post
             print(f"  {i}. {p.subreddit} | {p.title[:80]} [{','.join(syms)}] (score={c.trend_score:.3f})")
 
-        # 3) enrich + score events
-        events = [self.enricher.enrich_event(e) for e in events]
-        scored = [self.cred.score(e) for e in events]
-        for e in scored:
-            self.log.write("events", {"run_id": run_id, "event": e})
+        # 2d) Per-subreddit / per-ticker boards; "board" is the subreddit or symbol
+        for stream, by in (("top_by_subreddit", boards.by_subreddit), ("top_by_ticker", boards.by_ticker)):
+            for board, top in sorted(by.items()):
+                for rank, c in enumerate(top.items(), start=1):
+                    p = c.snapshot.post
+                    self.log.write(
+                        stream,
+                        {
+                            "run_id": run_id,
+                            "board": board,
+                            "rank": rank,
+                            "trend_score": c.trend_score,
+                            "subreddit": p.subreddit,
+                            "title": p.title,
+                            "post_id": p.id,
+                            "permalink": p.permalink,
+                        },
+                    )
 
-        # 4) reason + ideas
-        idea_count = 0
-        for e in scored:
+        return {
+            "events": events,
+            "candidates": len(candidates),
+            "ticker_candidates": len(ticker_candidates),
+            "ticker_candidate_count": boards.ticker_count,
+            "top_signals": len(top_all),
+            "top_ticker_signals": len(top_ticker_pairs),
+        }
+
+    def enrich(self, run_id: str, events: List[Event]) -> List[Event]:
+        """Market enrichment (one batched fetch) + credibility scoring."""
+        with metrics.span("rot_stage_seconds", stage="enrich"):
+            events = self.enricher.enrich_events(events)
+            scored = self.cred.score_many(events)
+            for e in scored:
+                self.log.write("events", {"run_id": run_id, "event": e})
+        metrics.inc("rot_items_total", len(scored), kind="events")
+        return scored
+
+    def reason(self, run_id: str, e: Event) -> ReasoningPacket:
+        with metrics.span("rot_stage_seconds", stage="reason"):
             packet = self.reasoner.reason(e)
             self.log.write("reasoning", {"run_id": run_id, "event": e, "packet": packet})
+        return packet
+
+    def reason_batch(self, run_id: str, events: List[Event]) -> List[ReasoningPacket]:
+        """reason() for all events of a run, with the reasoner's concurrency."""
+        with metrics.span("rot_stage_seconds", stage="reason"):
+            packets = self.reasoner.reason_many(events)
+            for e, packet in zip(events, packets):
+                self.log.write("reasoning", {"run_id": run_id, "event": e, "packet": packet})
+        return packets
+
+    def trade(self, run_id: str, packet: ReasoningPacket, e: Event) -> List[TradeIdea]:
+        with metrics.span("rot_stage_seconds", stage="trade"):
             ideas = self.trade_builder.build(packet, e)
             for idea in ideas:
-                idea_count += 1
                 self.log.write("trade_ideas", {"run_id": run_id, "trade_idea": idea})
+        metrics.inc("rot_items_total", len(ideas), kind="trade_ideas")
+        return ideas
+
+    def trade_batch(self, run_id: str, packets: List[ReasoningPacket], events: List[Event]) -> List[TradeIdea]:
+        """trade() for all events of a run; option chains are fetched once for the batch."""
+        with metrics.span("rot_stage_seconds", stage="trade"):
+            ideas = [i for batch in self.trade_builder.build_many(list(zip(packets, events))) for i in batch]
+            for idea in ideas:
+                self.log.write("trade_ideas", {"run_id": run_id, "trade_idea": idea})
+        metrics.inc("rot_items_total", len(ideas), kind="trade_ideas")
+        return ideas
+
+    def end_run(self, run_id: str | None = None) -> None:
+        snap = metrics.snapshot()
+        if snap is not None:
+            self.log.write("metrics", {"run_id": run_id, "metrics": snap})
+        # Buffered loggers hold records until a threshold; make each run durable.
+        self.log.flush()
+        self.symbol_validator.flush()
+
+    def run_once(self, sources: Optional[List[Source]] = None) -> dict:
+        run_id = f"run_{int(time.time())}"
+        t0 = time.perf_counter()
+
+        # 1) ingest
+        snapshots = self.ingest(run_id, sources)
+
+        # 2) trend detect, extract, rank, build events
+        detected = self.detect(run_id, snapshots)
+
+        # 3) enrich + score events
+        scored = self.enrich(run_id, detected["events"])
+
+        # 4) reason + ideas
+        idea_count = len(self.trade_batch(run_id, self.reason_batch(run_id, scored), scored))
+
+        metrics.observe("rot_stage_seconds", time.perf_counter() - t0, stage="run_once")
+        self.end_run(run_id)
 
         return {
             "run_id": run_id,
             "snapshots": len(snapshots),
-            "candidates": len(candidates),
-            "ticker_candidates": len(ticker_candidates),
-            "ticker_candidate_count": ticker_candidate_count,
+            "candidates": detected["candidates"],
+            "ticker_candidates": detected["ticker_candidates"],
+            "ticker_candidate_count": detected["ticker_candidate_count"],
             "events": len(scored),
             "trade_ideas": idea_count,
-            "top_signals": len(top_all),
-            "top_ticker_signals": len(top_ticker_pairs),
+            "top_signals": detected["top_signals"],
+            "top_ticker_signals": detected["top_ticker_signals"],
         }
@@ -0,0 +1,421 @@
+"""
+Columnar storage for pipeline streams: Parquet (or Arrow IPC) next to JSONL.
+
+Each stream is written under <root>/<stream>/date=YYYY-MM-DD/ as immutable
+part files, one per flush, with zstd compression and `row_group_size` rows
+per row group. Records are flattened into one column per leaf field: the
+dataclasses in rot.core.types define the schema of the known payloads
+(`snapshot.post.score`, `candidate.trend_score`, ...), List[str] fields stay
+list<string>, and anything without a fixed shape (comments, evidence, legs,
+meta/raw/features dicts) is kept as a JSON string column.
+
+pyarrow is optional: importing this module works without it; ParquetLogger
+and the converter raise ImportError when used.
+
+    python -m rot.core.columnar storage/snapshots.jsonl storage/columnar
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+import typing
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Literal, Optional, Tuple
+
+from rot.core.serialize import dumps, to_jsonable
+from rot.core.types import Event, ReasoningPacket, ThreadSnapshot, TradeIdea, TrendCandidate
+
+try:  # optional dependency
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on environment
+    pa = None
+
+Format = Literal["parquet", "arrow"]
+
+# Which dataclass each top-level key of a stream's records holds.
+STREAM_TYPES: Dict[str, Dict[str, type]] = {
+    "snapshots": {"snapshot": ThreadSnapshot},
+    "trend_candidates": {"candidate": TrendCandidate},
+    "events": {"event": Event},
+    "reasoning": {"event": Event, "packet": ReasoningPacket},
+    "trade_ideas": {"trade_idea": TradeIdea},
+}
+
+# Column kinds
+_INT, _FLOAT, _STR, _BOOL, _STRS, _JSON = "int", "float", "str", "bool", "strs", "json"
+
+# (column name, path into the jsonable record, kind)
+Column = Tuple[str, Tuple[str, ...], str]
+
+# typed (dataclass) columns per stream; extra keys get their kinds from the data
+_TYPED: Dict[str, List[Column]] = {}
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("pyarrow is required for columnar storage: pip install pyarrow")
+
+
+def _kind(hint: Any) -> Optional[str]:
+    origin = typing.get_origin(hint)
+    args = typing.get_args(hint)
+    if origin is typing.Union:
+        rest = [a for a in args if a is not type(None)]
+        return _kind(rest[0]) if len(rest) == 1 else _JSON
+    if origin is Literal:
+        return _STR
+    if origin in (list, List) and args == (str,):
+        return _STRS
+    if hint is bool:
+        return _BOOL
+    if hint is int:
+        return _INT
+    if hint is float:
+        return _FLOAT
+    if hint is str:
+        return _STR
+    if is_dataclass(hint):
+        return None  # flattened further
+    return _JSON
+
+
+def _dataclass_columns(cls: type, prefix: Tuple[str, ...]) -> List[Column]:
+    hints = typing.get_type_hints(cls)
+    cols: List[Column] = []
+    for f in fields(cls):
+        hint = hints[f.name]
+        path = prefix + (f.name,)
+        kind = _kind(hint)
+        if kind is None:
+            cols.extend(_dataclass_columns(hint, path))
+        else:
+            cols.append((".".join(path), path, kind))
+    return cols
+
+
+def _infer(value: Any) -> str:
+    if isinstance(value, bool):
+        return _BOOL
+    if isinstance(value, int):
+        return _INT
+    if isinstance(value, float):
+        return _FLOAT
+    if isinstance(value, str):
+        return _STR
+    if isinstance(value, list) and all(isinstance(v, str) for v in value):
+        return _STRS
+    return _JSON
+
+
+_SCALAR_KINDS = {bool: _BOOL, int: _INT, float: _FLOAT, str: _STR}
+
+
+def _widen(kind: Optional[str], values: List[Any]) -> str:
+    """
+    Narrowest kind holding `kind` (None: no constraint yet) and every value:
+    int widens to float, anything else mixed to JSON text. str columns keep
+    non-str values as JSON text, so they never widen.
+    """
+    found = set()
+    for t in {type(v) for v in values}:
+        if t is type(None):
+            continue
+        k = _SCALAR_KINDS.get(t)
+        if k is None:
+            k = _STRS if t is list and all(isinstance(x, str) for v in values if type(v) is list for x in v) else _JSON
+        found.add(k)
+    for k in sorted(found):
+        if kind is None or k == kind or kind == _STR:
+            kind = kind or k
+        elif {kind, k} == {_INT, _FLOAT}:
+            kind = _FLOAT
+        else:
+            return _JSON
+    return kind or _JSON
+
+
+def _typed_columns(stream: str) -> List[Column]:
+    cols = _TYPED.get(stream)
+    if cols is None:
+        cols = []
+        for k, cls in STREAM_TYPES.get(stream, {}).items():
+            cols.extend(_dataclass_columns(cls, (k,)))
+        _TYPED[stream] = cols
+    return cols
+
+
+def _batch_columns(
+    stream: str, records: List[Dict[str, Any]], kinds: Optional[Dict[str, str]] = None
+) -> Iterator[Tuple[Column, List[Any]]]:
+    """
+    Columns and their values for `records`. `kinds` (column name -> kind) is
+    the schema of earlier batches: its columns are kept even when this batch
+    lacks them, kinds start from it, and it is updated in place.
+    """
+    typed = STREAM_TYPES.get(stream, {})
+    kinds = {} if kinds is None else kinds
+    typed_cols = _typed_columns(stream)
+    typed_names = {name for name, _, _ in typed_cols}
+    extras = [k for k in kinds if k not in typed_names]
+    seen = set(extras)
+    extras += sorted({k for r in records for k in r if k not in typed and k not in seen})
+    for name, path, kind in [(k, (k,), None) for k in extras] + typed_cols:
+        values = [_get(r, path) for r in records]
+        kind = _widen(kinds.get(name, kind), values)
+        kinds[name] = kind
+        yield (name, path, kind), values
+
+
+def stream_columns(
+    stream: str, records: List[Dict[str, Any]], kinds: Optional[Dict[str, str]] = None
+) -> List[Column]:
+    """
+    Flattened columns for a batch of `stream` records: typed columns for its
+    dataclass payloads, plus one column per other top-level key (run_id,
+    rank, ts...). Kinds are checked against the whole batch and widened where
+    a value does not fit, so a batch never loses values to its first record;
+    see _batch_columns for `kinds`.
+    """
+    return [col for col, _ in _batch_columns(stream, records, kinds)]
+
+
+def _arrow_type(kind: str) -> Any:
+    return {
+        _INT: pa.int64(),
+        _FLOAT: pa.float64(),
+        _STR: pa.string(),
+        _BOOL: pa.bool_(),
+        _STRS: pa.list_(pa.string()),
+        _JSON: pa.string(),
+    }[kind]
+
+
+def _get(rec: Any, path: Tuple[str, ...]) -> Any:
+    for p in path:
+        if not isinstance(rec, dict):
+            return None
+        rec = rec.get(p)
+    return rec
+
+
+def _cell(v: Any, kind: str) -> Any:
+    if v is None:
+        return None
+    if kind == _JSON:
+        return dumps(v)
+    if kind == _INT:
+        return int(v) if not isinstance(v, float) or v.is_integer() else None
+    if kind == _FLOAT:
+        return float(v)
+    if kind == _STR:
+        return v if isinstance(v, str) else dumps(v)
+    if kind == _BOOL:
+        return bool(v)
+    if kind == _STRS:
+        return [str(x) for x in v] if isinstance(v, list) else None
+    return v
+
+
+def to_table(
+    stream: str, records: List[Dict[str, Any]], kinds: Optional[Dict[str, str]] = None
+) -> "pa.Table":
+    """Flatten jsonable `records` of `stream` into an Arrow table (schema as in _batch_columns)."""
+    _require_pyarrow()
+    names, arrays = [], []
+    for (name, _, kind), values in _batch_columns(stream, records, kinds):
+        names.append(name)
+        arrays.append(pa.array([_cell(v, kind) for v in values], type=_arrow_type(kind)))
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+class ParquetLogger:
+    """
+    JsonlLogger-compatible sink (write/flush/close, context manager) that
+    writes columnar part files instead of JSONL lines.
+
+    Records are buffered per stream and written as one file per stream and
+    day when `batch_size` records are pending, when a write happens more than
+    `flush_interval_s` after the last flush, and on flush()/close(). Part
+    files are complete when they appear, so readers never see a torn file.
+    A batch that cannot be written is moved to JSONL under
+    <stream>/_quarantine/ (counted in `quarantined`, error in `last_error`)
+    instead of being retried on every flush.
+
+    Column kinds are kept per stream across batches, so every part file of a
+    stream has the columns and types of the parts before it. They only ever
+    widen (int to float, anything to JSON text), and only when a batch holds
+    a value the earlier kind cannot.
+    """
+
+    def __init__(
+        self,
+        root: str = "storage/columnar",
+        fmt: Format = "parquet",
+        batch_size: int = 4096,
+        flush_interval_s: float = 300.0,
+        row_group_size: int = 65_536,
+        compression: str = "zstd",
+    ) -> None:
+        _require_pyarrow()
+        if fmt not in ("parquet", "arrow"):
+            raise ValueError(f"Unknown format: {fmt}")
+        self.root = Path(root)
+        self.fmt = fmt
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval_s = flush_interval_s
+        self.row_group_size = max(1, int(row_group_size))
+        self.compression = compression
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._kinds: Dict[str, Dict[str, str]] = {}  # per stream: column -> kind so far
+        self._pending_count = 0
+        self._last_flush = time.monotonic()
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.last_error: Optional[Exception] = None
+        self.quarantined = 0
+
+    def write(self, stream: str, record: Dict[str, Any]) -> None:
+        rec = to_jsonable(dict(record))
+        rec.setdefault("ts", int(time.time()))
+        with self._lock:
+            self._pending.setdefault(stream, []).append(rec)
+            self._pending_count += 1
+            if (
+                self._pending_count >= self.batch_size
+                or (time.monotonic() - self._last_flush) >= self.flush_interval_s
+            ):
+                self._flush_locked()
+
+    def write_many(self, stream: str, records: Iterable[Dict[str, Any]]) -> None:
+        """Append already-jsonable records (e.g. parsed JSONL) in bulk."""
+        with self._lock:
+            batch = self._pending.setdefault(stream, [])
+            for rec in records:
+                batch.append(rec)
+                self._pending_count += 1
+                if self._pending_count >= self.batch_size:
+                    self._flush_locked()
+                    batch = self._pending.setdefault(stream, [])
+
+    def _part_path(self, stream: str, day: str, first: Dict[str, Any]) -> Path:
+        d = self.root / stream / f"date={day}"
+        d.mkdir(parents=True, exist_ok=True)
+        self._seq += 1
+        run = str(first.get("run_id") or "run").replace(os.sep, "_")
+        ext = "parquet" if self.fmt == "parquet" else "arrow"
+        return d / f"part-{run}-{os.getpid()}-{self._seq:06d}.{ext}"
+
+    def _write_file(self, stream: str, day: str, records: List[Dict[str, Any]]) -> None:
+        table = to_table(stream, records, self._kinds.setdefault(stream, {}))
+        path = self._part_path(stream, day, records[0])
+        tmp = path.with_name("." + path.name + ".tmp")
+        if self.fmt == "parquet":
+            pq.write_table(table, tmp, row_group_size=self.row_group_size, compression=self.compression)
+        else:
+            feather.write_feather(table, tmp, compression=self.compression, chunksize=self.row_group_size)
+        tmp.replace(path)
+
+    def _quarantine(self, stream: str, day: str, rows: List[Dict[str, Any]], err: Exception) -> None:
+        """
+        Set aside a batch that could not be converted, as JSONL under
+        <stream>/_quarantine/, so it neither blocks later flushes nor is lost.
+        """
+        self.last_error = err
+        self.quarantined += len(rows)
+        d = self.root / stream / "_quarantine"
+        try:
+            d.mkdir(parents=True, exist_ok=True)
+            self._seq += 1
+            with (d / f"date={day}-{os.getpid()}-{self._seq:06d}.jsonl").open("w", encoding="utf-8") as f:
+                for r in rows:
+                    f.write(json.dumps(r, ensure_ascii=False, default=str) + "\n")
+        except OSError:
+            pass
+
+    def _flush_locked(self) -> None:
+        for stream, recs in self._pending.items():
+            by_day: Dict[str, List[Dict[str, Any]]] = {}
+            for r in recs:
+                ts = r.get("ts")
+                day = time.strftime("%Y-%m-%d", time.gmtime(ts if isinstance(ts, (int, float)) else time.time()))
+                by_day.setdefault(day, []).append(r)
+            for day, rows in by_day.items():
+                try:
+                    self._write_file(stream, day, rows)
+                except Exception as e:
+                    self._quarantine(stream, day, rows, e)
+        self._pending = {}
+        self._pending_count = 0
+        self._last_flush = time.monotonic()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "ParquetLogger":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue  # torn line
+
+
+def convert_jsonl(src: str, dst_root: str = "storage/columnar", fmt: Format = "parquet", batch_rows: int = 65_536) -> Dict[str, int]:
+    """
+    Convert <stream>.jsonl files (a file or a directory of them) into the
+    partitioned columnar layout, streaming `batch_rows` records at a time.
+    Returns rows written per stream.
+    """
+    p = Path(src)
+    files = sorted(p.glob("*.jsonl")) if p.is_dir() else [p]
+    sink = ParquetLogger(root=dst_root, fmt=fmt, batch_size=batch_rows, flush_interval_s=float("inf"))
+    counts: Dict[str, int] = {}
+    with sink:
+        for f in files:
+            n = [0]
+
+            def counted(it: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+                for rec in it:
+                    n[0] += 1
+                    yield rec
+
+            sink.write_many(f.stem, counted(_iter_jsonl(f)))
+            counts[f.stem] = n[0]
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("usage: python -m rot.core.columnar SRC.jsonl|SRC_DIR [DST_ROOT] [parquet|arrow]")
+        raise SystemExit(2)
+    dst = argv[1] if len(argv) > 1 else "storage/columnar"
+    fmt = argv[2] if len(argv) > 2 else "parquet"
+    for stream, n in convert_jsonl(argv[0], dst, fmt=fmt).items():  # type: ignore[arg-type]
+        print(f"{stream}: {n} rows -> {dst}/{stream}/")
+
+
+if __name__ == "__main__":
+    main()
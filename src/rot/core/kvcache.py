@@ -0,0 +1,285 @@
+"""
+Key/value caches with a per-key TTL, shared by the market data layers.
+
+KVCache keeps {key: {"ts", "expires", "data"}} in one JSON file, written
+atomically (temp file + os.replace) and only when something changed; other
+processes see either the old or the new file, never a torn one, but two
+writers can still drop each other's entries. SqliteKVCache is the same API
+on a SQLite database in WAL mode: every put_many() is one write-through
+transaction, readers never block writers, and any number of processes can
+share the file.
+
+Values must be JSON-serializable. Expired entries are never returned and are
+deleted by evict(), which put_many() runs every `evict_interval_s`.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+
+class KVCache:
+    """
+    JSON-file cache. The file is loaded once; entries written by other
+    processes after that are not seen. Legacy entries without "expires"
+    ({"ts", "data"}, as MarketEnricher used to write) live for `ttl_s`.
+    """
+
+    def __init__(self, path: str, ttl_s: float = 3600, evict_interval_s: float = 60.0) -> None:
+        self.path = Path(path)
+        self.ttl_s = ttl_s
+        self.evict_interval_s = evict_interval_s
+        self._data: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._last_evict = 0.0
+        self._loaded = False
+
+    def load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            return
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:
+            # a corrupt cache is an empty cache
+            return
+        for k, v in raw.items() if isinstance(raw, dict) else ():
+            if isinstance(v, dict) and isinstance(v.get("ts"), (int, float)) and "data" in v:
+                if not isinstance(v.get("expires"), (int, float)):
+                    v["expires"] = v["ts"] + self.ttl_s
+                self._data[k] = v
+
+    def __len__(self) -> int:
+        self.load()
+        return len(self._data)
+
+    def get_many(self, keys: Iterable[str], now: Optional[float] = None) -> Dict[str, Tuple[float, Any]]:
+        """{key: (expires, data)} for the keys with an unexpired entry."""
+        self.load()
+        now = time.time() if now is None else now
+        out: Dict[str, Tuple[float, Any]] = {}
+        with self._lock:
+            for k in keys:
+                v = self._data.get(k)
+                if v is not None and v["expires"] > now:
+                    out[k] = (v["expires"], v["data"])
+        return out
+
+    def dump(self) -> Dict[str, Any]:
+        """{key: data} for every entry, expired or not (e.g. to record a replay fixture)."""
+        self.load()
+        with self._lock:
+            return {k: v["data"] for k, v in self._data.items()}
+
+    def put_many(self, items: Mapping[str, Any], ttl_s: Optional[float] = None, now: Optional[float] = None) -> None:
+        """Store every item for `ttl_s` (default: the cache's) and write through."""
+        if not items:
+            return
+        self.load()
+        now = time.time() if now is None else now
+        expires = now + (self.ttl_s if ttl_s is None else ttl_s)
+        with self._lock:
+            for k, data in items.items():
+                self._data[k] = {"ts": now, "expires": expires, "data": data}
+            if now - self._last_evict >= self.evict_interval_s:
+                self._evict(now)
+            self._save()
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Delete expired entries; returns how many."""
+        self.load()
+        now = time.time() if now is None else now
+        with self._lock:
+            n = self._evict(now)
+            if n:
+                self._save()
+        return n
+
+    def _evict(self, now: float) -> int:
+        self._last_evict = now
+        old = [k for k, v in self._data.items() if v["expires"] <= now]
+        for k in old:
+            del self._data[k]
+        return len(old)
+
+    def _save(self) -> None:
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(json.dumps(self._data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            # cache failures should never break the pipeline
+            pass
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteKVCache(KVCache):
+    """
+    KVCache in a SQLite database (WAL mode), safe to share between processes.
+
+    Rows are (namespace, key, ts, expires, data JSON); several caches can
+    share one file under different namespaces. get_many() is one indexed
+    query per 500 keys, put_many() one upsert transaction taken with BEGIN
+    IMMEDIATE, so concurrent writers queue on the database lock (for up to
+    `busy_timeout_s`) instead of failing mid-transaction. evict() drops
+    expired rows and, with `max_entries`, the oldest rows over the cap.
+
+    On first use an existing KVCache JSON file (`import_json`) is imported.
+    """
+
+    _CHUNK = 500  # stay under SQLite's bound-parameter limit
+
+    def __init__(
+        self,
+        path: str,
+        ttl_s: float = 3600,
+        namespace: str = "default",
+        max_entries: Optional[int] = None,
+        evict_interval_s: float = 60.0,
+        busy_timeout_s: float = 10.0,
+        import_json: Optional[str] = None,
+    ) -> None:
+        super().__init__(path=path, ttl_s=ttl_s, evict_interval_s=evict_interval_s)
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.busy_timeout_s = busy_timeout_s
+        self.import_json = import_json
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            str(self.path), timeout=self.busy_timeout_s, check_same_thread=False, isolation_level=None
+        )
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_s * 1000)}")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            " ns TEXT NOT NULL, key TEXT NOT NULL, ts REAL NOT NULL, expires REAL NOT NULL,"
+            " data TEXT NOT NULL, PRIMARY KEY (ns, key)"
+            ") WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS kv_expires ON kv(ns, expires)")
+        self._conn = conn
+        if self.import_json and Path(self.import_json).exists():
+            if conn.execute("SELECT 1 FROM kv WHERE ns = ? LIMIT 1", (self.namespace,)).fetchone() is None:
+                legacy = KVCache(self.import_json, ttl_s=self.ttl_s)
+                legacy.load()
+                self._write((k, v["ts"], v["expires"], v["data"]) for k, v in legacy._data.items())
+
+    def __len__(self) -> int:
+        self.load()
+        assert self._conn is not None
+        with self._lock:
+            (n,) = self._conn.execute("SELECT COUNT(*) FROM kv WHERE ns = ?", (self.namespace,)).fetchone()
+        return n
+
+    def get_many(self, keys: Iterable[str], now: Optional[float] = None) -> Dict[str, Tuple[float, Any]]:
+        self.load()
+        assert self._conn is not None
+        now = time.time() if now is None else now
+        uniq: Sequence[str] = list(dict.fromkeys(keys))
+        out: Dict[str, Tuple[float, Any]] = {}
+        with self._lock:
+            for i in range(0, len(uniq), self._CHUNK):
+                chunk = uniq[i : i + self._CHUNK]
+                # +expires keeps the planner on the primary key, not kv_expires
+                q = "SELECT key, expires, data FROM kv WHERE ns = ? AND key IN (%s) AND +expires > ?" % (
+                    ",".join("?" * len(chunk))
+                )
+                for k, exp, data in self._conn.execute(q, (self.namespace, *chunk, now)):
+                    out[k] = (exp, json.loads(data))
+        return out
+
+    def dump(self) -> Dict[str, Any]:
+        self.load()
+        assert self._conn is not None
+        with self._lock:
+            rows = self._conn.execute("SELECT key, data FROM kv WHERE ns = ?", (self.namespace,)).fetchall()
+        return {k: json.loads(data) for k, data in rows}
+
+    def put_many(self, items: Mapping[str, Any], ttl_s: Optional[float] = None, now: Optional[float] = None) -> None:
+        if not items:
+            return
+        self.load()
+        now = time.time() if now is None else now
+        expires = now + (self.ttl_s if ttl_s is None else ttl_s)
+        self._write(((k, now, expires, v) for k, v in items.items()), evict_at=now)
+
+    def _write(self, rows: Iterable[Tuple[str, float, float, Any]], evict_at: Optional[float] = None) -> None:
+        assert self._conn is not None
+        encoded = [
+            (self.namespace, k, ts, exp, json.dumps(v, ensure_ascii=False, separators=(",", ":")))
+            for k, ts, exp, v in rows
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO kv(ns, key, ts, expires, data) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT(ns, key) DO UPDATE SET ts=excluded.ts, expires=excluded.expires, data=excluded.data",
+                    encoded,
+                )
+                if evict_at is not None and evict_at - self._last_evict >= self.evict_interval_s:
+                    self._evict(evict_at)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def evict(self, now: Optional[float] = None) -> int:
+        self.load()
+        assert self._conn is not None
+        now = time.time() if now is None else now
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                n = self._evict(now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return n
+
+    def _evict(self, now: float) -> int:
+        assert self._conn is not None
+        self._last_evict = now
+        n = self._conn.execute("DELETE FROM kv WHERE ns = ? AND expires <= ?", (self.namespace, now)).rowcount
+        if self.max_entries is not None:
+            (size,) = self._conn.execute("SELECT COUNT(*) FROM kv WHERE ns = ?", (self.namespace,)).fetchone()
+            if size > self.max_entries:
+                n += self._conn.execute(
+                    "DELETE FROM kv WHERE ns = ? AND key IN (SELECT key FROM kv WHERE ns = ? ORDER BY ts LIMIT ?)",
+                    (self.namespace, self.namespace, size - self.max_entries),
+                ).rowcount
+        return n
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+            self._loaded = False
+
+
+def open_kv_cache(path: str, ttl_s: float = 3600, namespace: str = "default", **kw: Any) -> KVCache:
+    """KVCache for `path`: SQLite for .sqlite/.sqlite3/.db files (importing a
+    sibling .json cache on first use), JSON otherwise."""
+    if Path(path).suffix in (".sqlite", ".sqlite3", ".db"):
+        kw.setdefault("import_json", str(Path(path).with_suffix(".json")))
+        return SqliteKVCache(path, ttl_s=ttl_s, namespace=namespace, **kw)
+    return KVCache(path, ttl_s=ttl_s, **kw)
@@ -1,30 +1,146 @@
 from __future__ import annotations
 
-import json
 import os
+import threading
 import time
-from dataclasses import asdict, is_dataclass
-from typing import Any, Dict
+from typing import IO, Any, Dict, List, Literal
 
+from rot.core.serialize import dumps, to_jsonable
 
-def _to_jsonable(obj: Any) -> Any:
-    if is_dataclass(obj):
-        return asdict(obj)
-    if isinstance(obj, (list, tuple)):
-        return [_to_jsonable(x) for x in obj]
-    if isinstance(obj, dict):
-        return {k: _to_jsonable(v) for k, v in obj.items()}
-    return obj
+# none  -> leave batches in the file object's buffer (OS decides when to write)
+# flush -> flush the file object after every batch
+# fsync -> flush + os.fsync after every batch
+Durability = Literal["none", "flush", "fsync"]
+
+
+# Kept for callers that want plain dicts; records are encoded with dumps().
+_to_jsonable = to_jsonable
 
 
 class JsonlLogger:
-    def __init__(self, root: str = "storage") -> None:
+    """
+    Append-only JSONL writer: one storage/<stream>.jsonl file per stream.
+
+    Default mode opens, appends and closes the file for every record.
+
+    buffered=True keeps one handle per stream open and batches encoded lines in
+    memory. Batches are written when `batch_size` records are pending, when a
+    write happens more than `flush_interval_s` after the last flush, and on
+    flush()/close(). Use it as a context manager (or call close()) so the tail
+    of the buffer reaches disk at shutdown.
+    """
+
+    def __init__(
+        self,
+        root: str = "storage",
+        buffered: bool = False,
+        batch_size: int = 256,
+        flush_interval_s: float = 2.0,
+        durability: Durability = "flush",
+    ) -> None:
+        if durability not in ("none", "flush", "fsync"):
+            raise ValueError(f"Unknown durability: {durability}")
         self.root = root
+        self.buffered = buffered
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval_s = flush_interval_s
+        self.durability = durability
         os.makedirs(root, exist_ok=True)
 
+        self._handles: Dict[str, IO[str]] = {}
+        self._pending: Dict[str, List[str]] = {}
+        self._pending_count = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _path(self, stream: str) -> str:
+        return os.path.join(self.root, f"{stream}.jsonl")
+
+    def write(self, stream: str, record: Dict[str, Any]) -> None:
+        record = dict(record)
+        record.setdefault("ts", int(time.time()))
+        line = dumps(record) + "\n"
+
+        if not self.buffered:
+            with open(self._path(stream), "a", encoding="utf-8") as f:
+                f.write(line)
+            return
+
+        with self._lock:
+            self._pending.setdefault(stream, []).append(line)
+            self._pending_count += 1
+            if (
+                self._pending_count >= self.batch_size
+                or (time.monotonic() - self._last_flush) >= self.flush_interval_s
+            ):
+                self._flush_locked()
+
+    def _handle(self, stream: str) -> IO[str]:
+        f = self._handles.get(stream)
+        if f is None:
+            f = open(self._path(stream), "a", encoding="utf-8")
+            self._handles[stream] = f
+        return f
+
+    def _flush_locked(self) -> None:
+        for stream, lines in self._pending.items():
+            if not lines:
+                continue
+            f = self._handle(stream)
+            f.write("".join(lines))
+            if self.durability != "none":
+                f.flush()
+                if self.durability == "fsync":
+                    os.fsync(f.fileno())
+        self._pending = {}
+        self._pending_count = 0
+        self._last_flush = time.monotonic()
+
+    def flush(self) -> None:
+        """Write all pending records (no-op in unbuffered mode)."""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """Flush pending records and close every open stream handle."""
+        with self._lock:
+            self._flush_locked()
+            for f in self._handles.values():
+                try:
+                    f.close()
+                except Exception:
+                    pass
+            self._handles = {}
+
+    def __enter__(self) -> "JsonlLogger":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class TeeLogger:
+    """Writes every record to several loggers, e.g. JSONL plus a ParquetLogger."""
+
+    def __init__(self, *loggers: Any) -> None:
+        self.loggers = loggers
+
     def write(self, stream: str, record: Dict[str, Any]) -> None:
-        path = os.path.join(self.root, f"{stream}.jsonl")
         record = dict(record)
         record.setdefault("ts", int(time.time()))
-        with open(path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(_to_jsonable(record), ensure_ascii=False) + "\n")
+        for lg in self.loggers:
+            lg.write(stream, record)
+
+    def flush(self) -> None:
+        for lg in self.loggers:
+            lg.flush()
+
+    def close(self) -> None:
+        for lg in self.loggers:
+            lg.close()
+
+    def __enter__(self) -> "TeeLogger":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
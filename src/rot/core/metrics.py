@@ -0,0 +1,265 @@
+"""
+Process-wide counters and latency histograms for the pipeline.
+
+Instrumented code calls the module functions directly:
+
+    with metrics.span("rot_stage_seconds", stage="enrich"):
+        ...
+    metrics.inc("rot_cache_lookups_total", hits, cache="market", result="hit")
+
+Nothing is recorded until enable() installs a Registry. While disabled,
+inc()/observe() return after one global lookup and span() hands back a shared
+no-op context manager, so the instrumentation can stay in the hot paths.
+
+An enabled registry can be scraped in the Prometheus text format (serve())
+and snapshotted as a dict, which PipelineRunner.end_run() appends to the
+`metrics` stream (storage/metrics.jsonl).
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Upper bounds in seconds: from cache lookups to slow network calls.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+HELP: Dict[str, str] = {
+    "rot_stage_seconds": "Time spent in one pipeline stage call.",
+    "rot_stage_errors_total": "Pipeline stage calls that raised.",
+    "rot_network_seconds": "Latency of remote calls (Reddit, market data, reasoner).",
+    "rot_network_errors_total": "Remote calls that raised.",
+    "rot_cache_lookups_total": "Cache lookups by cache and result (hit, miss, backoff).",
+    "rot_items_total": "Items produced by the pipeline, by kind.",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    esc = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")  # noqa: E731
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt_num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class Histogram:
+    """Fixed-bucket histogram (non-cumulative counts; rendered cumulative)."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, v: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, v)] += 1
+        self.sum += v
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (inf past the last bound)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.bounds[i] if i < len(self.bounds) else float("inf")
+        return float("inf")
+
+
+class Registry:
+    """Thread-safe store of labelled counters and histograms."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._hists: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1.0, labels: Optional[Dict[str, Any]] = None) -> None:
+        key = _key(labels or {})
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        key = _key(labels or {})
+        with self._lock:
+            series = self._hists.setdefault(name, {})
+            h = series.get(key)
+            if h is None:
+                h = series[key] = Histogram(self.buckets)
+            h.observe(value)
+
+    def counter(self, name: str, **labels: Any) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_key(labels), 0.0)
+
+    def histogram(self, name: str, **labels: Any) -> Optional[Histogram]:
+        with self._lock:
+            return self._hists.get(name, {}).get(_key(labels))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cumulative values as plain JSON: {"counters": {...}, "histograms": {...}}."""
+        with self._lock:
+            counters = {
+                f"{name}{_fmt_labels(key)}": v for name, series in self._counters.items() for key, v in series.items()
+            }
+            hists = {
+                f"{name}{_fmt_labels(key)}": {
+                    "count": h.count,
+                    "sum": round(h.sum, 6),
+                    "p50_le": h.quantile(0.5),
+                    "p99_le": h.quantile(0.99),
+                }
+                for name, series in self._hists.items()
+                for key, h in series.items()
+            }
+        return {"counters": counters, "histograms": hists}
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format 0.0.4."""
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._counters):
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, v in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_fmt_labels(key)} {_fmt_num(v)}")
+            for name in sorted(self._hists):
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in sorted(self._hists[name].items()):
+                    cum = 0
+                    for bound, n in zip(h.bounds + (float("inf"),), h.counts):
+                        cum += n
+                        lines.append(f"{name}_bucket{_fmt_labels(key, ('le', _fmt_num(bound)))} {cum}")
+                    lines.append(f"{name}_sum{_fmt_labels(key)} {_fmt_num(h.sum)}")
+                    lines.append(f"{name}_count{_fmt_labels(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+# -- module-level switch ---------------------------------------------------
+
+_registry: Optional[Registry] = None
+_NULL_SPAN = nullcontext()
+
+
+def enable(registry: Optional[Registry] = None) -> Registry:
+    global _registry
+    _registry = registry or _registry or Registry()
+    return _registry
+
+
+def disable() -> None:
+    global _registry
+    _registry = None
+
+
+def enabled() -> bool:
+    return _registry is not None
+
+
+def registry() -> Optional[Registry]:
+    return _registry
+
+
+def inc(name: str, value: float = 1.0, **labels: Any) -> None:
+    r = _registry
+    if r is None or not value:
+        return
+    r.inc(name, value, labels)
+
+
+def observe(name: str, value: float, **labels: Any) -> None:
+    r = _registry
+    if r is None:
+        return
+    r.observe(name, value, labels)
+
+
+class _Span:
+    __slots__ = ("registry", "name", "labels", "t0")
+
+    def __init__(self, registry: Registry, name: str, labels: Dict[str, Any]) -> None:
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> "_Span":
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.registry.observe(self.name, time.perf_counter() - self.t0, self.labels)
+        if exc_type is not None:
+            base = self.name[: -len("_seconds")] if self.name.endswith("_seconds") else self.name
+            self.registry.inc(f"{base}_errors_total", 1.0, self.labels)
+
+
+def span(name: str, **labels: Any) -> Any:
+    """Context manager timing its block into histogram `name` (a no-op while disabled)."""
+    r = _registry
+    if r is None:
+        return _NULL_SPAN
+    return _Span(r, name, labels)
+
+
+def snapshot() -> Optional[Dict[str, Any]]:
+    r = _registry
+    return r.snapshot() if r is not None else None
+
+
+# -- Prometheus endpoint ---------------------------------------------------
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        r = _registry
+        if self.path.split("?")[0] not in ("/metrics", "/") or r is None:
+            self.send_error(404)
+            return
+        body = r.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(port: int = 9108, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Enable metrics and serve GET /metrics from a daemon thread. Binds to
+    localhost by default; call shutdown() on the returned server to stop.
+    """
+    enable()
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="rot-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every caller of one remote API.
+
+    `rate` tokens are added per second, up to `burst` banked. acquire() reserves
+    its tokens immediately and sleeps (outside the lock) until they are due, so
+    concurrent callers are paced in arrival order. clock/sleep are injectable
+    for tests.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, n: float, **kw) -> "RateLimiter":
+        return cls(rate=n / 60.0, **kw)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until `tokens` are available; returns seconds waited."""
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+        if wait > 0:
+            self._sleep(wait)
+        return wait
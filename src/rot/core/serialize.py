@@ -0,0 +1,255 @@
+"""
+Fast JSON encoding for pipeline records.
+
+dataclasses.asdict deep-copies every nested value (a TrendCandidate drags its
+whole ThreadSnapshot/Post/Comment tree along) before json.dumps walks the copy
+again. Here each dataclass type gets a field encoder that is built once, cached
+per type, and streams JSON fragments straight from the attributes.
+
+When orjson is installed it is used instead. Both backends emit the same bytes:
+compact separators, orjson float formatting, non-finite floats as null. Values
+orjson refuses (e.g. ints wider than 64 bits) fall back to the Python encoder.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import fields, is_dataclass
+from json.encoder import encode_basestring
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:  # optional fast backend
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "python"
+
+_Encoder = Callable[[Any, List[str]], None]
+
+_FIELD_NAMES: Dict[type, Tuple[str, ...]] = {}
+_ENCODERS: Dict[type, _Encoder] = {}
+
+
+def _field_names(cls: type) -> Tuple[str, ...]:
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = tuple(f.name for f in fields(cls))
+        _FIELD_NAMES[cls] = names
+    return names
+
+
+def _float_str(x: float) -> str:
+    if not math.isfinite(x):
+        return "null"
+    r = float.__repr__(x)
+    if "e" not in r:
+        return r
+    mant, exp_s = r.split("e")
+    exp = int(exp_s)
+    if exp == -5:
+        # orjson prints 1e-05 style values positionally
+        digits = mant.replace(".", "").lstrip("-")
+        sign = "-" if mant.startswith("-") else ""
+        return f"{sign}0.0000{digits}"
+    return f"{mant}e{exp}"
+
+
+def _float32_str(v: Any) -> str:
+    """
+    A numpy float32 as orjson prints it: the shortest float32 digits (0.1,
+    not the widened 0.10000000149011612), positional for exponents -6..12.
+    """
+    x = float(str(v))
+    if not math.isfinite(x):
+        return "null"
+    sign = "-" if math.copysign(1.0, x) < 0 else ""
+    mant, _, exp_s = repr(abs(x)).partition("e")
+    whole, _, frac = mant.partition(".")
+    digits = (whole + frac).lstrip("0")
+    exp = int(exp_s or 0) + len(whole) - 1 - (len(whole + frac) - len(digits))
+    digits = digits.rstrip("0")
+    if not digits:
+        return f"{sign}0.0"
+    if exp < -6 or exp > 12:
+        return f"{sign}{digits[0]}{'.' + digits[1:] if len(digits) > 1 else ''}e{exp}"
+    if exp < 0:
+        return f"{sign}0.{'0' * (-exp - 1)}{digits}"
+    return f"{sign}{digits[: exp + 1].ljust(exp + 1, '0')}.{digits[exp + 1 :] or '0'}"
+
+
+def _key_str(k: Any) -> str:
+    if isinstance(k, str):
+        return encode_basestring(k)
+    if k is True:
+        return '"true"'
+    if k is False:
+        return '"false"'
+    if k is None:
+        return '"null"'
+    if isinstance(k, int):
+        return f'"{int.__repr__(k)}"'
+    if isinstance(k, float):
+        return f'"{_float_str(k)}"'
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(k).__name__}")
+
+
+def _enc_str(v: Any, out: List[str]) -> None:
+    out.append(encode_basestring(v))
+
+
+def _enc_int(v: Any, out: List[str]) -> None:
+    out.append(int.__repr__(v))
+
+
+def _enc_float(v: Any, out: List[str]) -> None:
+    out.append(_float_str(v))
+
+
+def _enc_bool(v: Any, out: List[str]) -> None:
+    out.append("true" if v else "false")
+
+
+def _enc_none(v: Any, out: List[str]) -> None:
+    out.append("null")
+
+
+def _enc_seq(v: Any, out: List[str]) -> None:
+    if not v:
+        out.append("[]")
+        return
+    sep = "["
+    for x in v:
+        out.append(sep)
+        _encode(x, out)
+        sep = ","
+    out.append("]")
+
+
+def _enc_dict(v: Any, out: List[str]) -> None:
+    if not v:
+        out.append("{}")
+        return
+    sep = "{"
+    for k, x in v.items():
+        out.append(sep)
+        out.append(_key_str(k))
+        out.append(":")
+        _encode(x, out)
+        sep = ","
+    out.append("}")
+
+
+def _enc_numpy(v: Any, out: List[str]) -> None:
+    # numpy scalars / arrays; float32 keeps its own digits (see _float32_str)
+    dt = v.dtype
+    if dt.kind == "f" and dt.itemsize == 4:
+        if v.ndim:
+            _enc_seq(list(v), out)  # rows / float32 scalars
+        else:
+            out.append(_float32_str(v))
+        return
+    _encode(v.tolist(), out)
+
+
+def _dataclass_encoder(cls: type) -> _Encoder:
+    names = _field_names(cls)
+    if not names:
+        return lambda obj, out: out.append("{}")
+    # Pre-rendered '{"name":' / ',"name":' prefixes, one per field.
+    parts = tuple((("{" if i == 0 else ",") + encode_basestring(n) + ":", n) for i, n in enumerate(names))
+
+    def enc(obj: Any, out: List[str]) -> None:
+        for prefix, name in parts:
+            out.append(prefix)
+            _encode(getattr(obj, name), out)
+        out.append("}")
+
+    return enc
+
+
+_ENCODERS.update(
+    {
+        str: _enc_str,
+        int: _enc_int,
+        float: _enc_float,
+        bool: _enc_bool,
+        type(None): _enc_none,
+        list: _enc_seq,
+        tuple: _enc_seq,
+        dict: _enc_dict,
+    }
+)
+
+
+def _encoder_for(cls: type) -> _Encoder:
+    if is_dataclass(cls):
+        enc = _dataclass_encoder(cls)
+    elif issubclass(cls, str):
+        enc = _enc_str
+    elif issubclass(cls, bool):
+        enc = _enc_bool
+    elif issubclass(cls, int):
+        enc = _enc_int
+    elif issubclass(cls, float):
+        enc = _enc_float
+    elif issubclass(cls, dict):
+        enc = _enc_dict
+    elif issubclass(cls, (list, tuple)):
+        enc = _enc_seq
+    elif hasattr(cls, "tolist"):
+        enc = _enc_numpy
+    else:
+        raise TypeError(f"Object of type {cls.__name__} is not JSON serializable")
+    _ENCODERS[cls] = enc
+    return enc
+
+
+def _encode(obj: Any, out: List[str]) -> None:
+    enc = _ENCODERS.get(type(obj))
+    if enc is None:
+        enc = _encoder_for(type(obj))
+    enc(obj, out)
+
+
+def dumps_python(obj: Any) -> str:
+    """Pure-Python backend (always available)."""
+    out: List[str] = []
+    _encode(obj, out)
+    return "".join(out)
+
+
+def dumps(obj: Any, backend: Optional[str] = None) -> str:
+    """
+    Encode `obj` (dataclasses from rot.core.types, dicts, lists, scalars) as a
+    single compact JSON document. backend: None (best available) | "orjson" | "python".
+    """
+    backend = backend or BACKEND
+    if backend == "orjson":
+        if orjson is None:
+            raise RuntimeError("orjson backend requested but orjson is not installed")
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+        except TypeError:
+            pass
+    return dumps_python(obj)
+
+
+def to_jsonable(obj: Any) -> Any:
+    """
+    Convert dataclasses (recursively) to plain dicts/lists without asdict's
+    deep copy. Scalars are shared, not copied.
+    """
+    cls = type(obj)
+    if cls in (str, int, float, bool) or obj is None:
+        return obj
+    if cls is dict:
+        return {k: to_jsonable(v) for k, v in obj.items()}
+    if cls is list or cls is tuple:
+        return [to_jsonable(x) for x in obj]
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {n: to_jsonable(getattr(obj, n)) for n in _field_names(cls)}
+    if isinstance(obj, dict):
+        return {k: to_jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_jsonable(x) for x in obj]
+    return obj
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Sequence, Set, Tuple
+
+
+@dataclass(frozen=True)
+class PostObservation:
+    post_id: str
+    author: str
+    subreddit: str
+    ts: int
+    symbols: Tuple[str, ...]
+    is_crosspost: bool = False
+
+
+@dataclass
+class Corroboration:
+    authors: Set[str]
+    subreddits: Set[str]
+
+
+class ReputationIndex:
+    """
+    Per-author and per-subreddit track record in a SQLite database (WAL).
+
+    update() folds in one run's posts: each post is counted once (by id),
+    its ticker mentions are kept for `window_s` for cross-post corroboration,
+    and every (post, symbol) with a reference price (the run's price when
+    the post was first seen) waits in `pending` until a price at least
+    `horizon_s` later resolves it. A resolved mention is a
+    hit when the price moved by `hit_move` or more either way: the post
+    pointed at something that moved. Hits and resolutions accumulate in the
+    authors/subreddits rows, so an update costs O(new posts + resolved
+    mentions), never a rescan of the history.
+
+    Lookups are batched per run (one query per table, chunked under the
+    bound-parameter limit). ":memory:" keeps the index in process only.
+    """
+
+    _CHUNK = 500
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        window_s: int = 24 * 3600,
+        horizon_s: int = 24 * 3600,
+        hit_move: float = 0.03,
+        pending_ttl_s: int = 7 * 24 * 3600,
+        retention_s: int = 30 * 24 * 3600,
+    ) -> None:
+        self.path = path
+        self.window_s = window_s
+        self.horizon_s = horizon_s
+        self.hit_move = hit_move
+        self.pending_ttl_s = pending_ttl_s
+        self.retention_s = retention_s
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS posts (
+                post_id TEXT PRIMARY KEY, author TEXT NOT NULL, subreddit TEXT NOT NULL, ts INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS posts_ts ON posts(ts);
+            CREATE TABLE IF NOT EXISTS authors (
+                author TEXT PRIMARY KEY, posts INTEGER NOT NULL, resolved INTEGER NOT NULL DEFAULT 0,
+                hits INTEGER NOT NULL DEFAULT 0, first_seen INTEGER NOT NULL, last_seen INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS subreddits (
+                subreddit TEXT PRIMARY KEY, posts INTEGER NOT NULL, resolved INTEGER NOT NULL DEFAULT 0,
+                hits INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS mentions (
+                symbol TEXT NOT NULL, post_id TEXT NOT NULL, author TEXT NOT NULL, subreddit TEXT NOT NULL,
+                ts INTEGER NOT NULL, crosspost INTEGER NOT NULL, PRIMARY KEY (symbol, post_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS mentions_ts ON mentions(ts);
+            CREATE TABLE IF NOT EXISTS pending (
+                symbol TEXT NOT NULL, post_id TEXT NOT NULL, author TEXT NOT NULL, subreddit TEXT NOT NULL,
+                ref_ts INTEGER NOT NULL, ref_price REAL NOT NULL, PRIMARY KEY (symbol, post_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS pending_ts ON pending(ref_ts);
+            """
+        )
+        self._conn = conn
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _select(self, sql: str, keys: Sequence[str], *args: object) -> List[tuple]:
+        """Run `sql` (with one `{}` for an IN list) over `keys` in chunks."""
+        rows: List[tuple] = []
+        for i in range(0, len(keys), self._CHUNK):
+            chunk = keys[i : i + self._CHUNK]
+            q = sql.format(",".join("?" * len(chunk)))
+            rows.extend(self._conn.execute(q, (*chunk, *args)).fetchall())
+        return rows
+
+    # -- writes --------------------------------------------------------
+
+    def update(self, posts: Iterable[PostObservation], prices: Mapping[str, float], now: int | None = None) -> int:
+        """
+        Fold in a run's posts and resolve pending mentions with `prices`
+        (symbol -> current price). Returns the number of new posts.
+        """
+        now = int(time.time()) if now is None else int(now)
+        batch = {p.post_id: p for p in posts}
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                known = {r[0] for r in self._select("SELECT post_id FROM posts WHERE post_id IN ({})", list(batch))}
+                new = [p for pid, p in batch.items() if pid not in known]
+                self._add_posts(new, prices, now)
+                self._resolve(prices, now)
+                self._conn.execute("DELETE FROM mentions WHERE ts < ?", (now - self.window_s,))
+                self._conn.execute("DELETE FROM pending WHERE ref_ts < ?", (now - self.pending_ttl_s,))
+                self._conn.execute("DELETE FROM posts WHERE ts < ?", (now - self.retention_s,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(new)
+
+    def _add_posts(self, new: Sequence[PostObservation], prices: Mapping[str, float], now: int) -> None:
+        c = self._conn
+        c.executemany("INSERT INTO posts VALUES (?, ?, ?, ?)", [(p.post_id, p.author, p.subreddit, p.ts) for p in new])
+        c.executemany(
+            "INSERT INTO authors(author, posts, first_seen, last_seen) VALUES (?, 1, ?, ?)"
+            " ON CONFLICT(author) DO UPDATE SET posts=posts+1,"
+            " first_seen=min(first_seen, excluded.first_seen), last_seen=max(last_seen, excluded.last_seen)",
+            [(p.author, p.ts, p.ts) for p in new if p.author],
+        )
+        c.executemany(
+            "INSERT INTO subreddits(subreddit, posts) VALUES (?, 1)"
+            " ON CONFLICT(subreddit) DO UPDATE SET posts=posts+1",
+            [(p.subreddit,) for p in new],
+        )
+        c.executemany(
+            "INSERT OR IGNORE INTO mentions VALUES (?, ?, ?, ?, ?, ?)",
+            [(s, p.post_id, p.author, p.subreddit, p.ts, int(p.is_crosspost)) for p in new for s in p.symbols],
+        )
+        c.executemany(
+            "INSERT OR IGNORE INTO pending VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (s, p.post_id, p.author, p.subreddit, now, prices[s])
+                for p in new
+                for s in p.symbols
+                if prices.get(s)
+            ],
+        )
+
+    def _resolve(self, prices: Mapping[str, float], now: int) -> None:
+        symbols = [s for s, px in prices.items() if px]
+        due = self._select(
+            "SELECT symbol, post_id, author, subreddit, ref_price FROM pending WHERE symbol IN ({}) AND ref_ts <= ?",
+            symbols,
+            now - self.horizon_s,
+        )
+        if not due:
+            return
+        authors: Dict[str, List[int]] = {}
+        subs: Dict[str, List[int]] = {}
+        for sym, _, author, sub, ref in due:
+            hit = int(abs(prices[sym] / ref - 1.0) >= self.hit_move)
+            for agg, key in ((authors, author), (subs, sub)):
+                if key:
+                    tally = agg.setdefault(key, [0, 0])
+                    tally[0] += 1
+                    tally[1] += hit
+        c = self._conn
+        c.executemany("UPDATE authors SET resolved=resolved+?, hits=hits+? WHERE author=?", [(n, h, a) for a, (n, h) in authors.items()])
+        c.executemany("UPDATE subreddits SET resolved=resolved+?, hits=hits+? WHERE subreddit=?", [(n, h, s) for s, (n, h) in subs.items()])
+        c.executemany("DELETE FROM pending WHERE symbol=? AND post_id=?", [(sym, pid) for sym, pid, *_ in due])
+
+    # -- reads ---------------------------------------------------------
+
+    def authors(self, names: Sequence[str]) -> Dict[str, Tuple[int, int, int, int]]:
+        """author -> (posts, resolved, hits, first_seen)"""
+        with self._lock:
+            rows = self._select(
+                "SELECT author, posts, resolved, hits, first_seen FROM authors WHERE author IN ({})", list(dict.fromkeys(names))
+            )
+        return {r[0]: r[1:] for r in rows}
+
+    def subreddits(self, names: Sequence[str]) -> Dict[str, Tuple[int, int, int]]:
+        """subreddit -> (posts, resolved, hits)"""
+        with self._lock:
+            rows = self._select(
+                "SELECT subreddit, posts, resolved, hits FROM subreddits WHERE subreddit IN ({})", list(dict.fromkeys(names))
+            )
+        return {r[0]: r[1:] for r in rows}
+
+    def corroboration(self, symbols: Sequence[str], now: int | None = None) -> Dict[str, Corroboration]:
+        """Distinct authors/subreddits mentioning each symbol within the window (cross-posts excluded)."""
+        now = int(time.time()) if now is None else int(now)
+        with self._lock:
+            rows = self._select(
+                "SELECT symbol, author, subreddit FROM mentions WHERE symbol IN ({}) AND ts >= ? AND crosspost = 0",
+                list(dict.fromkeys(symbols)),
+                now - self.window_s,
+            )
+        out: Dict[str, Corroboration] = {}
+        for sym, author, sub in rows:
+            c = out.setdefault(sym, Corroboration(set(), set()))
+            if author:
+                c.authors.add(author)
+            c.subreddits.add(sub)
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                t: self._conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                for t in ("posts", "authors", "subreddits", "mentions", "pending")
+            }
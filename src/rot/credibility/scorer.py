@@ -1,8 +1,134 @@
 from __future__ import annotations
 
+import time
+from dataclasses import replace
+from typing import Dict, List, Optional
+
+import numpy as np
+
 from rot.core.types import Event
+from rot.credibility.reputation import PostObservation, ReputationIndex
+
+_DELETED = {"", "[deleted]", "[removed]", "None"}
+
+# component -> weight; components are in [0, 1]
+WEIGHTS: Dict[str, float] = {
+    "author_hit_rate": 0.35,
+    "subreddit_hit_rate": 0.15,
+    "author_history": 0.15,
+    "account_age": 0.10,
+    "corroboration": 0.25,
+}
+
+
+def _observation(e: Event, now: int) -> Optional[PostObservation]:
+    if not e.evidence:
+        return None
+    ev = e.evidence[0]
+    post = e.meta.get("post") or {}
+    author = str(post.get("author") or "")
+    return PostObservation(
+        post_id=ev.post_id,
+        author="" if author in _DELETED else author,
+        subreddit=ev.subreddit,
+        ts=int(post.get("created_utc") or now),
+        symbols=tuple(e.entities),
+        is_crosspost=bool(post.get("is_crosspost", False)),
+    )
+
 
 class CredibilityScorer:
+    """
+    Scores events by the track record of who posted them and where, using a
+    ReputationIndex updated from every scored batch.
+
+    score_many() first folds the batch into the index (new posts, ticker
+    mentions, and the run's market prices to resolve older mentions), then
+    fetches author, subreddit and corroboration stats for the whole batch in
+    three queries and computes the score with array arithmetic:
+
+      author_hit_rate     author's hits/resolved, shrunk towards the
+                          subreddit's rate with `prior_weight` pseudo-counts
+      subreddit_hit_rate  subreddit's hits/resolved (Laplace-smoothed)
+      author_history      1 - exp(-posts / 10)
+      account_age         days since the author was first seen / 30, capped
+      corroboration       other authors and subreddits on the same ticker
+                          within the index window (cross-posts don't count),
+                          or in the event's near-duplicate cluster
+
+    The weighted sum goes to meta["credibility"], and confidence becomes the
+    mean of the event's confidence and that score. The index lives in memory
+    unless `path` names a database file.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        index: Optional[ReputationIndex] = None,
+        prior_weight: float = 5.0,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.index = index or ReputationIndex(path)
+        self.prior_weight = prior_weight
+        self.weights = dict(weights or WEIGHTS)
+
     def score(self, e: Event) -> Event:
-        # V1: passthrough. Add heuristics later.
-        return e
+        return self.score_many([e])[0]
+
+    def score_many(self, events: List[Event], now: Optional[int] = None) -> List[Event]:
+        if not events:
+            return []
+        now = int(time.time()) if now is None else int(now)
+        obs = [_observation(e, now) for e in events]
+        prices = {
+            sym: float(q["last_close"])
+            for e in events
+            for sym, q in (e.meta.get("market") or {}).items()
+            if isinstance(q, dict) and q.get("last_close")
+        }
+        self.index.update([o for o in obs if o is not None], prices, now)
+
+        authors = [o.author if o else "" for o in obs]
+        subs = [o.subreddit if o else "" for o in obs]
+        a_stats = self.index.authors([a for a in authors if a])
+        s_stats = self.index.subreddits([s for s in subs if s])
+        corr = self.index.corroboration([sym for e in events for sym in e.entities], now)
+
+        a = np.array([a_stats.get(x, (0, 0, 0, now)) for x in authors], dtype=np.float64).reshape(-1, 4)
+        s = np.array([s_stats.get(x, (0, 0, 0)) for x in subs], dtype=np.float64).reshape(-1, 3)
+        others = np.array([self._others(e, o, corr) for e, o in zip(events, obs)], dtype=np.float64)
+
+        sub_rate = (s[:, 2] + 1.0) / (s[:, 1] + 2.0)
+        components = {
+            "author_hit_rate": (a[:, 2] + self.prior_weight * sub_rate) / (a[:, 1] + self.prior_weight),
+            "subreddit_hit_rate": sub_rate,
+            "author_history": 1.0 - np.exp(-a[:, 0] / 10.0),
+            "account_age": np.clip((now - a[:, 3]) / (30 * 86400.0), 0.0, 1.0),
+            "corroboration": 1.0 - np.exp(-others / 3.0),
+        }
+        total = sum(self.weights.values()) or 1.0
+        score = sum(w * components[name] for name, w in self.weights.items()) / total
+
+        out = []
+        for i, e in enumerate(events):
+            cred = {name: round(float(v[i]), 3) for name, v in components.items()}
+            cred["score"] = round(float(score[i]), 3)
+            out.append(replace(e, confidence=round(0.5 * e.confidence + 0.5 * float(score[i]), 3), meta={**e.meta, "credibility": cred}))
+        return out
+
+    @staticmethod
+    def _others(e: Event, o: Optional[PostObservation], corr) -> float:
+        """Most independent corroboration across the event's tickers and its duplicate cluster."""
+        own_author, own_sub = (o.author, o.subreddit) if o else ("", "")
+        cluster = e.meta.get("cluster") or {}
+        best = len(set(cluster.get("authors", ())) - {own_author}) + len(set(cluster.get("subreddits", ())) - {own_sub})
+        for sym in e.entities:
+            c = corr.get(sym)
+            if c is None:
+                continue
+            n = len(c.authors - {own_author}) + len(c.subreddits - {own_sub})
+            best = max(best, n)
+        return float(best)
+
+    def close(self) -> None:
+        self.index.close()
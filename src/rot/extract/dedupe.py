@@ -0,0 +1,259 @@
+"""
+Near-duplicate clustering of trend candidates with MinHash + LSH.
+
+Each post's title plus the start of its body is reduced to 5-byte
+shingles and a `num_perm`-value MinHash signature, whose Jaccard agreement
+estimates the shingle-set overlap of two posts. The signatures are cut into
+`bands` bands and each band is a bucket key, so a new post only meets the
+posts it shares a bucket with (near-duplicates, with high probability),
+never the whole window.
+
+NearDuplicateIndex keeps the posts of the last `window_s` seconds and
+assigns each to a cluster. EventClusterer uses it to fold the events of one
+run's candidates into one Event per cluster, with every member as Evidence,
+and to drop reposts of stories already emitted in an earlier run.
+"""
+from __future__ import annotations
+
+import heapq
+import re
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from rot.core.types import Event, Evidence, TrendCandidate
+
+_URL = re.compile(r"https?://\S+")
+_SPACE = re.compile(r"[^a-z0-9$]+")
+_PRIME = np.uint64(4294967311)  # > 2**32
+_SHINGLE = 5
+
+
+def normalize(title: str, body: str = "", max_body: int = 500) -> str:
+    text = f"{title} {body[:max_body]}".lower()
+    return _SPACE.sub(" ", _URL.sub(" ", text)).strip()
+
+
+def shingles(text: str) -> np.ndarray:
+    """Distinct 5-byte shingles of `text`, as 32-bit hashes."""
+    b = np.frombuffer(text.encode("utf-8"), dtype=np.uint8).astype(np.uint64)
+    if len(b) < _SHINGLE:
+        b = np.pad(b, (0, _SHINGLE - len(b)))
+    x = np.zeros(len(b) - _SHINGLE + 1, dtype=np.uint64)
+    for j in range(_SHINGLE):
+        x = (x << np.uint64(8)) | b[j : len(b) - _SHINGLE + 1 + j]
+    # fold the 40-bit shingle to 32 bits (Fibonacci hashing)
+    x = (x * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(32)
+    return np.unique(x)
+
+
+@dataclass
+class _Entry:
+    post_id: str
+    cluster: str
+    ts: int
+    sig: np.ndarray
+    tickers: frozenset
+    evidence: Evidence
+    author: str
+
+
+@dataclass
+class _Cluster:
+    members: Dict[str, _Entry] = field(default_factory=dict)
+    emitted: Set[str] = field(default_factory=set)  # posts whose events it produced
+
+
+class NearDuplicateIndex:
+    """
+    Rolling window of MinHash signatures bucketed by LSH band.
+
+    With 64 permutations in 16 bands of 4 rows, posts with a Jaccard
+    similarity of 0.5 share a bucket with probability ~0.65, at 0.7 ~0.98,
+    at 0.3 ~0.12. Bucket hits are then checked on the full signature:
+    a post joins the best-matching cluster at `threshold` or above
+    (`threshold - ticker_bonus` when they share a ticker); posts whose
+    ticker sets are both non-empty and disjoint never merge.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.5,
+        ticker_bonus: float = 0.15,
+        window_s: int = 6 * 3600,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.ticker_bonus = ticker_bonus
+        self.window_s = window_s
+        rng = np.random.default_rng(seed)
+        # a < 2**31 and x < 2**32 keep a*x + b inside uint64
+        self._a = rng.integers(1, 2**31, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, 2**31, size=(num_perm, 1), dtype=np.uint64)
+        self._buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(bands)]
+        self._entries: Dict[str, _Entry] = {}
+        self._clusters: Dict[str, _Cluster] = {}
+        self._expiry: List[Tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, text: str) -> np.ndarray:
+        x = shingles(text)
+        return np.min((self._a * x[None, :] + self._b) % _PRIME, axis=1)
+
+    def _keys(self, sig: np.ndarray) -> List[bytes]:
+        return [sig[i * self.rows : (i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def similar(self, sig: np.ndarray, tickers: frozenset = frozenset()) -> Optional[Tuple[str, float]]:
+        """Best-matching cluster for a signature, with its estimated Jaccard similarity."""
+        seen: Set[str] = set()
+        for band, key in zip(self._buckets, self._keys(sig)):
+            seen |= band.get(key, set())
+        if not seen:
+            return None
+        cands = [self._entries[p] for p in seen]
+        sims = np.mean(np.stack([c.sig for c in cands]) == sig[None, :], axis=1)
+        best: Optional[Tuple[str, float]] = None
+        for c, j in zip(cands, sims):
+            if tickers and c.tickers and not (tickers & c.tickers):
+                continue
+            need = self.threshold - (self.ticker_bonus if tickers & c.tickers else 0.0)
+            if j >= need and (best is None or j > best[1]):
+                best = (c.cluster, float(j))
+        return best
+
+    def add(self, post_id: str, ts: int, text: str, tickers: Sequence[str], evidence: Evidence, author: str = "") -> str:
+        """Index a post (or refresh one already indexed) and return its cluster id."""
+        self.expire(ts - self.window_s)
+        old = self._entries.get(post_id)
+        if old is not None:
+            old.ts = max(old.ts, ts)
+            heapq.heappush(self._expiry, (old.ts, post_id))
+            return old.cluster
+        sig = self.signature(text)
+        tset = frozenset(tickers)
+        match = self.similar(sig, tset)
+        cluster = match[0] if match else post_id
+        entry = _Entry(post_id, cluster, ts, sig, tset, evidence, author)
+        self._entries[post_id] = entry
+        self._clusters.setdefault(cluster, _Cluster()).members[post_id] = entry
+        for band, key in zip(self._buckets, self._keys(sig)):
+            band.setdefault(key, set()).add(post_id)
+        heapq.heappush(self._expiry, (ts, post_id))
+        return cluster
+
+    def emitted(self, cluster: str) -> Set[str]:
+        """Posts of `cluster` that went into an event so far."""
+        c = self._clusters.get(cluster)
+        return c.emitted if c else set()
+
+    def mark_emitted(self, cluster: str, post_ids: Iterable[str]) -> None:
+        c = self._clusters.get(cluster)
+        if c is not None:
+            c.emitted.update(post_ids)
+
+    def members(self, cluster: str) -> List[_Entry]:
+        c = self._clusters.get(cluster)
+        return sorted(c.members.values(), key=lambda e: e.ts) if c else []
+
+    def expire(self, before_ts: int) -> int:
+        """Drop posts last seen before `before_ts`; returns how many."""
+        n = 0
+        while self._expiry and self._expiry[0][0] < before_ts:
+            ts, pid = heapq.heappop(self._expiry)
+            e = self._entries.get(pid)
+            if e is None or e.ts != ts:
+                continue  # refreshed since
+            del self._entries[pid]
+            for band, key in zip(self._buckets, self._keys(e.sig)):
+                bucket = band.get(key)
+                if bucket is not None:
+                    bucket.discard(pid)
+                    if not bucket:
+                        del band[key]
+            cl = self._clusters.get(e.cluster)
+            if cl is not None:
+                cl.members.pop(pid, None)
+                if not cl.members:
+                    del self._clusters[e.cluster]
+            n += 1
+        return n
+
+
+class EventClusterer:
+    """
+    Merges the events of near-duplicate candidates (same story cross-posted
+    or reposted) into one Event per cluster.
+
+    The merged event is the highest-trend_score member's, with the union of
+    the members' tickers and, as evidence, this run's members followed by
+    earlier members still in the index window (up to `max_evidence`).
+    meta["cluster"] records the cluster id, size, subreddits and authors.
+
+    Each cluster remembers which posts went into an event it produced. When
+    it has produced one before but none of this run's members were in it,
+    the story was already reasoned on and these are late reposts of it: the
+    cluster yields no event. A post that produced an event can again (it is
+    still trending), and a cluster that never produced one always can.
+    """
+
+    def __init__(self, index: Optional[NearDuplicateIndex] = None, max_evidence: int = 10, max_body: int = 500) -> None:
+        self.index = index or NearDuplicateIndex()
+        self.max_evidence = max_evidence
+        self.max_body = max_body
+
+    def cluster(self, pairs: Sequence[Tuple[TrendCandidate, Event]]) -> List[Event]:
+        order = sorted(range(len(pairs)), key=lambda i: -pairs[i][0].trend_score)
+        groups: Dict[str, List[int]] = {}
+        for i in order:
+            c, e = pairs[i]
+            post = c.snapshot.post
+            ev = e.evidence[0] if e.evidence else Evidence(post.id, post.permalink, post.subreddit, post.title[:200])
+            cid = self.index.add(
+                post.id, c.snapshot.snapshot_ts, normalize(post.title, post.selftext, self.max_body), e.entities, ev, post.author
+            )
+            groups.setdefault(cid, []).append(i)
+        out = []
+        for cid, idx in groups.items():
+            posts = [pairs[i][0].snapshot.post.id for i in idx]
+            emitted = self.index.emitted(cid)
+            if emitted and emitted.isdisjoint(posts):
+                continue
+            out.append(self._merge(cid, [pairs[i][1] for i in idx]))
+            self.index.mark_emitted(cid, posts)
+        return out
+
+    def _merge(self, cid: str, events: List[Event]) -> Event:
+        primary = events[0]
+        members = self.index.members(cid)
+        if len(events) == 1 and len(members) <= 1:
+            return primary
+        entities = list(dict.fromkeys(s for e in events for s in e.entities))
+        evidence = list({ev.post_id: ev for e in events for ev in e.evidence}.values())
+        seen = {ev.post_id for ev in evidence}
+        merged = len(seen)
+        evidence += [m.evidence for m in reversed(members) if m.post_id not in seen]
+        return replace(
+            primary,
+            entities=entities,
+            evidence=evidence[: self.max_evidence],
+            meta={
+                **primary.meta,
+                "cluster": {
+                    "id": cid,
+                    "size": len(members),
+                    "merged": merged,
+                    "subreddits": sorted({m.evidence.subreddit for m in members}),
+                    "authors": sorted({m.author for m in members if m.author}),
+                },
+            },
+        )
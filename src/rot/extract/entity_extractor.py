@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from rot.core.types import Post
+from rot.market.enricher import ALIAS_MAP, NON_EQUITY_TOKENS
+
+# One pass over the text: every \w+ run, with the '$' that may precede it.
+# A run that is entirely [A-Z]{1,5} is exactly what the old
+# (?:\$([A-Z]{1,5})\b|\b([A-Z]{1,5})\b) ticker regex matched.
+_TOKEN_RE = re.compile(r"(\$?)(\w+)")
+
+# Company / product names people write instead of the ticker.
+# Matched on whole words, case-insensitively, when the first word is capitalized.
+COMPANY_ALIASES: Dict[str, str] = {
+    "Apple": "AAPL",
+    "Microsoft": "MSFT",
+    "Nvidia": "NVDA",
+    "Amazon": "AMZN",
+    "Alphabet": "GOOGL",
+    "Google": "GOOGL",
+    "Meta Platforms": "META",
+    "Facebook": "META",
+    "Tesla": "TSLA",
+    "Netflix": "NFLX",
+    "Intel": "INTC",
+    "Advanced Micro Devices": "AMD",
+    "Broadcom": "AVGO",
+    "Taiwan Semiconductor": "TSM",
+    "Micron": "MU",
+    "Palantir": "PLTR",
+    "Berkshire Hathaway": "BRK-B",
+    "JPMorgan": "JPM",
+    "Goldman Sachs": "GS",
+    "Bank of America": "BAC",
+    "Exxon": "XOM",
+    "Chevron": "CVX",
+    "ConocoPhillips": "COP",
+    "Halliburton": "HAL",
+    "Boeing": "BA",
+    "Disney": "DIS",
+    "Walmart": "WMT",
+    "Costco": "COST",
+    "GameStop": "GME",
+    "AMC Entertainment": "AMC",
+    "Rocket Lab": "RKLB",
+    "AST SpaceMobile": "ASTS",
+    "Intuitive Machines": "LUNR",
+    "Rigetti": "RGTI",
+    "Coinbase": "COIN",
+    "MicroStrategy": "MSTR",
+    "Robinhood": "HOOD",
+    "Snowflake": "SNOW",
+    "Salesforce": "CRM",
+    "Oracle": "ORCL",
+    "Uber": "UBER",
+    "Nio": "NIO",
+}
+
+
+class _TokenAutomaton:
+    """
+    Aho-Corasick automaton over word tokens (not characters): every name is a
+    sequence of lowercased words, and one left-to-right pass over a post's
+    tokens reports all (possibly overlapping) name occurrences.
+    """
+
+    def __init__(self, phrases: Mapping[Tuple[str, ...], str]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str]]] = [[]]  # (phrase length, symbol)
+
+        for words, sym in phrases.items():
+            node = 0
+            for w in words:
+                nxt = self._goto[node].get(w)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][w] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append((len(words), sym))
+
+        # BFS for failure links
+        queue = list(self._goto[0].values())
+        while queue:
+            nxt_queue: List[int] = []
+            for node in queue:
+                for w, child in self._goto[node].items():
+                    f = self._fail[node]
+                    while f and w not in self._goto[f]:
+                        f = self._fail[f]
+                    target = self._goto[f].get(w, 0)
+                    self._fail[child] = target if target != child else 0
+                    self._out[child] = self._out[child] + self._out[self._fail[child]]
+                    nxt_queue.append(child)
+            queue = nxt_queue
+
+    @property
+    def first_words(self) -> frozenset:
+        return frozenset(self._goto[0])
+
+    def scan(self, words: Sequence[str], starts: Optional[Iterable[int]] = None) -> List[Tuple[int, str]]:
+        """
+        (start index, symbol) for every phrase occurrence in `words`.
+
+        `starts` (ascending) limits the walk to regions beginning at those
+        indices; the automaton is back at the root everywhere else anyway.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        hits: List[Tuple[int, str]] = []
+        n = len(words)
+        done = -1
+        for s in range(n) if starts is None else starts:
+            if s <= done:
+                continue
+            node = 0
+            i = s
+            while i < n:
+                w = words[i]
+                while node and w not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(w, 0)
+                if out[node]:
+                    for k, sym in out[node]:
+                        hits.append((i - k + 1, sym))
+                i += 1
+                if not node:
+                    break
+            done = i - 1
+        return hits
+
+
+class EntityExtractor:
+    """
+    Ticker extraction for posts.
+
+    The text is tokenized once. `$TSLA` mentions win if there are any;
+    otherwise bare 1-5 letter uppercase words plus company names from the
+    automaton are used. Aliases are mapped (SPXW -> ^GSPC), macro/non-equity
+    tokens and single letters dropped, and at most 5 sorted symbols returned.
+    Results are cached per (post_id, text hash) so repeated calls within and
+    across cycles are free.
+    """
+
+    def __init__(self, names: Optional[Mapping[str, str]] = None, cache_size: int = 50_000) -> None:
+        self.cache_size = max(0, int(cache_size))
+        self._cache: "OrderedDict[Tuple[str, int, int], List[str]]" = OrderedDict()
+        self._names: Dict[str, str] = dict(COMPANY_ALIASES if names is None else names)
+        self._build()
+
+    def _build(self) -> None:
+        phrases: Dict[Tuple[str, ...], str] = {}
+        for name, sym in self._names.items():
+            words = tuple(w.lower() for _, w in _TOKEN_RE.findall(name))
+            if words:
+                phrases[words] = sym
+        self._automaton = _TokenAutomaton(phrases)
+        self._first = self._automaton.first_words
+        self._cache.clear()
+
+    def add_names(self, names: Mapping[str, str]) -> None:
+        """Register more company names (e.g. from a listing file) and rebuild."""
+        self._names.update(names)
+        self._build()
+
+    def _extract(self, text: str) -> List[str]:
+        tokens = _TOKEN_RE.findall(text)
+
+        dollar: List[str] = []
+        bare: List[str] = []
+        for sign, word in tokens:
+            # == [A-Z]{1,5}, without a regex call per token
+            if len(word) <= 5 and word.isupper() and word.isalpha() and word.isascii():
+                (dollar if sign else bare).append(word)
+
+        if dollar:
+            raw = dollar
+        else:
+            raw = bare
+            words = [w for _, w in tokens]
+            # One lower() call for the whole post; \x00 cannot occur in \w runs.
+            lower = "\x00".join(words).lower().split("\x00")
+            if not self._first.isdisjoint(lower):
+                first = self._first
+                starts = [i for i, w in enumerate(lower) if w in first]
+                for start, sym in self._automaton.scan(lower, starts):
+                    if words[start][:1].isupper():
+                        raw.append(sym)
+
+        out = set()
+        for s in raw:
+            s = ALIAS_MAP.get(s, s)
+            if s in NON_EQUITY_TOKENS or len(s) == 1:
+                continue
+            out.add(s)
+        return sorted(out)[:5]
+
+    def extract(self, title: str, body: str, post_id: str = "") -> List[str]:
+        text = f"{title}\n{body}"
+        if not self.cache_size:
+            return self._extract(text)
+        key = (post_id, len(text), hash(text))
+        hit = self._cache.get(key)
+        if hit is not None:
+            self._cache.move_to_end(key)
+            return list(hit)
+        ents = self._extract(text)
+        self._cache[key] = ents
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return list(ents)
+
+    def extract_post(self, post: Post) -> List[str]:
+        return self.extract(post.title, post.selftext, post.id)
+
+    def extract_many(self, posts: Iterable[Post]) -> List[List[str]]:
+        """Entities for each post, in order."""
+        return [self.extract(p.title, p.selftext, p.id) for p in posts]
@@ -1,41 +1,27 @@
 from __future__ import annotations
 
-import re
-from typing import List
+from typing import Iterable, List, Optional, Sequence, Tuple
 
-from rot.core.types import Evidence, Event, TrendCandidate
-from rot.market.enricher import NON_EQUITY_TOKENS, ALIAS_MAP
-
-# Matches $TSLA or TSLA
-_TICKER_RE = re.compile(r"(?:\$([A-Z]{1,5})\b|\b([A-Z]{1,5})\b)")
+from rot.core.types import Evidence, Event, Post, TrendCandidate
+from rot.extract.dedupe import EventClusterer
+from rot.extract.entity_extractor import EntityExtractor
 
 
 class EventBuilder:
-    def extract_entities(self, title: str, body: str) -> List[str]:
-        text = f"{title}\n{body}"
-        matches = _TICKER_RE.findall(text)
-
-        # Prefer explicit $TICKER mentions
-        dollar = [a for (a, b) in matches if a]
-        bare = [b for (a, b) in matches if b]
-        raw = dollar if dollar else bare
-
-        out: List[str] = []
-        for s in raw:
-            s = ALIAS_MAP.get(s.upper(), s.upper())
+    def __init__(self, extractor: Optional[EntityExtractor] = None, clusterer: Optional[EventClusterer] = None) -> None:
+        self.extractor = extractor or EntityExtractor()
+        self.clusterer = clusterer
 
-            if s in NON_EQUITY_TOKENS:
-                continue
-            if len(s) == 1:
-                continue
+    def extract_entities(self, title: str, body: str, post_id: str = "") -> List[str]:
+        return self.extractor.extract(title, body, post_id)
 
-            out.append(s)
+    def extract_batch(self, posts: Iterable[Post]) -> List[List[str]]:
+        return self.extractor.extract_many(posts)
 
-        return sorted(set(out))[:5]
-
-    def from_candidate(self, c: TrendCandidate) -> List[Event]:
+    def from_candidate(self, c: TrendCandidate, tickers: Optional[List[str]] = None) -> List[Event]:
         post = c.snapshot.post
-        tickers = self.extract_entities(post.title, post.selftext)
+        if tickers is None:
+            tickers = self.extractor.extract_post(post)
 
         ev = Event(
             event_type="other",
@@ -54,7 +40,19 @@ class EventBuilder:
             meta={
                 "trend_score": c.trend_score,
                 "features": c.features,
+                # for the credibility scorer's reputation index
+                "post": {
+                    "author": post.author,
+                    "created_utc": post.created_utc,
+                    "is_crosspost": post.is_crosspost,
+                },
             },
         )
 
         return [ev]
+
+    def merge_duplicates(self, pairs: Sequence[Tuple[TrendCandidate, Event]]) -> List[Event]:
+        """One event per near-duplicate cluster (all events without a clusterer)."""
+        if self.clusterer is None:
+            return [e for _, e in pairs]
+        return self.clusterer.cluster(pairs)
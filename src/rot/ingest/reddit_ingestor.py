@@ -1,13 +1,35 @@
 from __future__ import annotations
 
+import math
 import os
+import threading
 import time
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import praw
 
+from rot.core import metrics
+from rot.core.ratelimit import RateLimiter
 from rot.core.types import Comment, Post, ThreadSnapshot
-from rot.ingest.seen_store import SeenStore
+from rot.ingest.scheduler import Source
+from rot.ingest.seen_store import open_seen_store
+
+
+def _env_reddit() -> praw.Reddit:
+    cid = os.getenv("ROT_REDDIT_CLIENT_ID")
+    csec = os.getenv("ROT_REDDIT_CLIENT_SECRET")
+    ua = os.getenv("ROT_REDDIT_USER_AGENT")
+    if not cid or not csec or not ua:
+        raise RuntimeError(
+            "Missing Reddit creds. Set ROT_REDDIT_CLIENT_ID, ROT_REDDIT_CLIENT_SECRET, ROT_REDDIT_USER_AGENT"
+        )
+
+    return praw.Reddit(
+        client_id=cid,
+        client_secret=csec,
+        user_agent=ua,
+    )
 
 
 class RedditIngestor:
@@ -19,6 +41,25 @@ class RedditIngestor:
       ROT_REDDIT_USER_AGENT
 
     listing: rising | hot | new | top
+
+    max_workers > 1 fetches subreddit listings and comment trees in parallel.
+    PRAW instances are not thread safe, so each worker thread gets its own
+    client from `reddit_factory` (defaults to the env-var client above; inject
+    a PRAW-like fake for offline runs). The worker pool lives as long as the
+    ingestor (until close()), so each worker authenticates once rather than
+    once per poll. `requests_per_min` caps the combined
+    request rate of all workers. Dedupe and SeenStore updates stay on the
+    calling thread, in subreddit/listing order, so the returned snapshots are
+    the same as a serial poll.
+
+    state_path picks the SeenStore backend: a .sqlite3/.db path uses the
+    incremental SQLite store, anything else the JSON file. Posts not seen for
+    `seen_horizon_s` are forgotten.
+
+    poll(sources) fetches only the given (subreddit, listing) pairs (all
+    subreddits with `listing` by default) and leaves per-source counts in
+    `last_poll` (listed, changed, requests), which rot.ingest.scheduler uses
+    to adapt each source's cadence.
     """
 
     def __init__(
@@ -29,101 +70,180 @@ class RedditIngestor:
         include_comments: bool = False,
         top_comments: int = 10,
         state_path: str = "storage/seen_posts.json",
+        max_workers: int = 1,
+        requests_per_min: Optional[float] = None,
+        reddit_factory: Optional[Callable[[], Any]] = None,
+        seen_horizon_s: Optional[int] = None,
     ) -> None:
         self.subreddits = subreddits
         self.listing = listing
         self.limit_per_sub = limit_per_sub
         self.include_comments = include_comments
         self.top_comments = top_comments
-        self.seen = SeenStore(path=state_path)
-
-        cid = os.getenv("ROT_REDDIT_CLIENT_ID")
-        csec = os.getenv("ROT_REDDIT_CLIENT_SECRET")
-        ua = os.getenv("ROT_REDDIT_USER_AGENT")
-        if not cid or not csec or not ua:
-            raise RuntimeError(
-                "Missing Reddit creds. Set ROT_REDDIT_CLIENT_ID, ROT_REDDIT_CLIENT_SECRET, ROT_REDDIT_USER_AGENT"
-            )
-
-        self.reddit = praw.Reddit(
-            client_id=cid,
-            client_secret=csec,
-            user_agent=ua,
-        )
-
-    def _iter_listing(self, sr: praw.models.Subreddit):
-        if self.listing == "rising":
+        self.seen = open_seen_store(state_path, horizon_s=seen_horizon_s)
+        self.max_workers = max(1, int(max_workers))
+        self.rate_limiter = RateLimiter.per_minute(requests_per_min) if requests_per_min else None
+
+        self._reddit_factory = reddit_factory or _env_reddit
+        self.reddit = self._reddit_factory()
+        self._local = threading.local()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.last_poll: Dict[Source, Dict[str, int]] = {}
+
+    def sources(self) -> List[Source]:
+        return [(name, self.listing) for name in self.subreddits]
+
+    def _client(self) -> Any:
+        if self.max_workers <= 1:
+            return self.reddit
+        r = getattr(self._local, "reddit", None)
+        if r is None:
+            r = self._reddit_factory()
+            self._local.reddit = r
+        return r
+
+    def _executor(self) -> Optional[ThreadPoolExecutor]:
+        if self.max_workers <= 1:
+            return None
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="reddit")
+        return self._pool
+
+    def _throttle(self, requests: int = 1) -> None:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(requests)
+
+    def _iter_listing(self, sr: praw.models.Subreddit, listing: str):
+        if listing == "rising":
             return sr.rising(limit=self.limit_per_sub)
-        if self.listing == "hot":
+        if listing == "hot":
             return sr.hot(limit=self.limit_per_sub)
-        if self.listing == "new":
+        if listing == "new":
             return sr.new(limit=self.limit_per_sub)
-        if self.listing == "top":
+        if listing == "top":
             return sr.top(limit=self.limit_per_sub)
-        raise ValueError(f"Unknown listing: {self.listing}")
+        raise ValueError(f"Unknown listing: {listing}")
+
+    def listing_requests(self) -> int:
+        # Reddit pages listings at 100 items per request
+        return max(1, math.ceil(self.limit_per_sub / 100))
+
+    def _fetch_listing(self, source: Source) -> List[Any]:
+        name, listing = source
+        self._throttle(self.listing_requests())
+        with metrics.span("rot_network_seconds", target="reddit_listing"):
+            sr = self._client().subreddit(name)
+            return list(self._iter_listing(sr, listing))
+
+    def _fetch_comments(self, sub: Any, now: int) -> List[Comment]:
+        self._throttle()
+        comments: List[Comment] = []
+        try:
+            if self.max_workers > 1:
+                # Re-bind to this worker's client instead of the listing's.
+                sub = self._client().submission(id=sub.id)
+            with metrics.span("rot_network_seconds", target="reddit_comments"):
+                sub.comments.replace_more(limit=0)
+            for c in sub.comments[: self.top_comments]:
+                cauthor = getattr(c, "author", None)
+                cauthor_name = cauthor.name if cauthor else "[deleted]"
+                comments.append(
+                    Comment(
+                        id=getattr(c, "id", ""),
+                        created_utc=int(getattr(c, "created_utc", now)),
+                        author=cauthor_name,
+                        body=getattr(c, "body", "") or "",
+                        score=int(getattr(c, "score", 0)),
+                    )
+                )
+        except Exception:
+            comments = []
+        return comments
+
+    def _to_post(self, sub: Any, name: str, now: int) -> Post:
+        upvote_ratio: Optional[float] = getattr(sub, "upvote_ratio", None)
+        author = getattr(sub, "author", None)
+        author_name = author.name if author else "[deleted]"
+
+        return Post(
+            id=sub.id,
+            created_utc=int(getattr(sub, "created_utc", now)),
+            subreddit=str(getattr(sub, "subreddit", name)),
+            title=sub.title or "",
+            selftext=getattr(sub, "selftext", "") or "",
+            url=getattr(sub, "url", "") or "",
+            score=int(getattr(sub, "score", 0)),
+            num_comments=int(getattr(sub, "num_comments", 0)),
+            upvote_ratio=upvote_ratio,
+            author=author_name,
+            permalink="https://www.reddit.com" + getattr(sub, "permalink", ""),
+            flair=getattr(sub, "link_flair_text", None),
+            is_crosspost=bool(getattr(sub, "crosspost_parent", None)),
+        )
 
-    def poll(self) -> List[ThreadSnapshot]:
+    def poll(self, sources: Optional[List[Source]] = None) -> List[ThreadSnapshot]:
         now = int(time.time())
-        snaps: List[ThreadSnapshot] = []
+        sources = list(sources) if sources is not None else self.sources()
+        stats = {src: {"listed": 0, "changed": 0, "requests": self.listing_requests()} for src in sources}
 
         # Ensure state is loaded
         self.seen.load()
 
-        for name in self.subreddits:
-            sr = self.reddit.subreddit(name)
-            for sub in self._iter_listing(sr):
-                post_id = sub.id
-                score = int(getattr(sub, "score", 0))
-                num_comments = int(getattr(sub, "num_comments", 0))
-
-                # Dedupe: only emit if new or changed score/comments
-                if not self.seen.is_changed(post_id, score, num_comments):
-                    continue
-
-                upvote_ratio: Optional[float] = getattr(sub, "upvote_ratio", None)
-                author = getattr(sub, "author", None)
-                author_name = author.name if author else "[deleted]"
-
-                p = Post(
-                    id=post_id,
-                    created_utc=int(getattr(sub, "created_utc", now)),
-                    subreddit=str(getattr(sub, "subreddit", name)),
-                    title=sub.title or "",
-                    selftext=getattr(sub, "selftext", "") or "",
-                    url=getattr(sub, "url", "") or "",
-                    score=score,
-                    num_comments=num_comments,
-                    upvote_ratio=upvote_ratio,
-                    author=author_name,
-                    permalink="https://www.reddit.com" + getattr(sub, "permalink", ""),
-                    flair=getattr(sub, "link_flair_text", None),
-                    is_crosspost=bool(getattr(sub, "crosspost_parent", None)),
-                )
-
-                comments: List[Comment] = []
-                if self.include_comments:
-                    try:
-                        sub.comments.replace_more(limit=0)
-                        for c in sub.comments[: self.top_comments]:
-                            cauthor = getattr(c, "author", None)
-                            cauthor_name = cauthor.name if cauthor else "[deleted]"
-                            comments.append(
-                                Comment(
-                                    id=getattr(c, "id", ""),
-                                    created_utc=int(getattr(c, "created_utc", now)),
-                                    author=cauthor_name,
-                                    body=getattr(c, "body", "") or "",
-                                    score=int(getattr(c, "score", 0)),
-                                )
-                            )
-                    except Exception:
-                        comments = []
-
-                snaps.append(ThreadSnapshot(snapshot_ts=now, post=p, top_comments=comments))
-
-                # Update state as soon as we accept the post
-                self.seen.update(post_id, score, num_comments, now)
+        pool = self._executor()
+        if pool is not None:
+            listings = list(pool.map(self._fetch_listing, sources))
+        else:
+            listings = [self._fetch_listing(src) for src in sources]
+
+        listed = [(src, sub) for src, subs in zip(sources, listings) for sub in subs]
+        keys = [
+            (sub.id, int(getattr(sub, "score", 0)), int(getattr(sub, "num_comments", 0)))
+            for _, sub in listed
+        ]
+        # One store lookup for the whole poll
+        changed = self.seen.is_changed_many(keys)
+
+        accepted: List[Tuple[Any, Post]] = []
+        this_poll: Dict[str, Tuple[int, int]] = {}
+        for (src, sub), (post_id, score, num_comments), is_new in zip(listed, keys, changed):
+            stats[src]["listed"] += 1
+            # Dedupe: only emit if new or changed score/comments
+            # (a post listed twice this poll compares against its first listing)
+            prev = this_poll.get(post_id)
+            if prev is not None:
+                is_new = prev != (score, num_comments)
+            if not is_new:
+                continue
+            this_poll[post_id] = (score, num_comments)
+            stats[src]["changed"] += 1
+            if self.include_comments:
+                stats[src]["requests"] += 1
+
+            accepted.append((sub, self._to_post(sub, src[0], now)))
+
+            # Update state as soon as we accept the post
+            self.seen.update(post_id, score, num_comments, now)
+
+        comments: List[List[Comment]] = [[] for _ in accepted]
+        if self.include_comments and accepted:
+            subs = [sub for sub, _ in accepted]
+            if pool is not None:
+                comments = list(pool.map(lambda s: self._fetch_comments(s, now), subs))
+            else:
+                comments = [self._fetch_comments(s, now) for s in subs]
+
+        snaps = [
+            ThreadSnapshot(snapshot_ts=now, post=p, top_comments=cs)
+            for (_, p), cs in zip(accepted, comments)
+        ]
 
         # Persist state once per poll
         self.seen.save()
+        self.last_poll = stats
         return snaps
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        self.seen.close()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from rot.core.types import Comment, Post, ThreadSnapshot
+
+
+def snapshot_from_dict(d: Dict[str, Any]) -> ThreadSnapshot:
+    return ThreadSnapshot(
+        snapshot_ts=int(d["snapshot_ts"]),
+        post=Post(**d["post"]),
+        top_comments=[Comment(**c) for c in d.get("top_comments") or []],
+    )
+
+
+def iter_snapshots(path: str) -> Iterator[ThreadSnapshot]:
+    """ThreadSnapshots from a JsonlLogger snapshots stream, one line at a time."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+                yield snapshot_from_dict(rec["snapshot"] if "snapshot" in rec else rec)
+            except (ValueError, KeyError, TypeError):
+                continue  # torn or foreign line
+
+
+def reorder(snaps: Iterable[ThreadSnapshot], window: int = 4096) -> Iterator[ThreadSnapshot]:
+    """
+    Timestamp order with bounded memory: a min-heap of `window` snapshots
+    fixes local disorder (e.g. concurrent writers). Ties keep file order.
+    """
+    heap: List[Any] = []
+    seq = itertools.count()
+    for s in snaps:
+        heapq.heappush(heap, (s.snapshot_ts, next(seq), s))
+        if len(heap) > window:
+            yield heapq.heappop(heap)[2]
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+
+class ReplayIngestor:
+    """
+    Drop-in for RedditIngestor that replays a recorded snapshots.jsonl.
+
+    Each poll() returns the next recorded poll (all snapshots sharing one
+    snapshot_ts), so trend state evolves exactly as it did live. `speed`
+    paces polls against the recorded timestamps: 1.0 is real time, 60.0 a
+    minute per second, None (or 0) as fast as possible. The file is streamed
+    lazily, so memory does not grow with the length of the history.
+    Recorded snapshots were already deduped when they were logged, so no
+    SeenStore is involved.
+    """
+
+    def __init__(
+        self,
+        path: str = "storage/snapshots.jsonl",
+        speed: Optional[float] = None,
+        reorder_window: int = 4096,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if not Path(path).exists():
+            raise FileNotFoundError(path)
+        self.path = path
+        self.speed = speed or None
+        self.clock = clock
+        self.sleep = sleep
+        self.polls = 0
+        self.snapshots = 0
+        self.exhausted = False
+        self._it = reorder(iter_snapshots(path), reorder_window)
+        self._next: Optional[ThreadSnapshot] = next(self._it, None)
+        self._start: Optional[tuple] = None  # (wall clock, recorded ts) of the first poll
+
+    def _pace(self, ts: int) -> None:
+        if self.speed is None:
+            return
+        if self._start is None:
+            self._start = (self.clock(), ts)
+            return
+        wall0, ts0 = self._start
+        delay = wall0 + (ts - ts0) / self.speed - self.clock()
+        if delay > 0:
+            self.sleep(delay)
+
+    def poll(self) -> List[ThreadSnapshot]:
+        first = self._next
+        if first is None:
+            self.exhausted = True
+            return []
+        self._pace(first.snapshot_ts)
+        batch = [first]
+        nxt = next(self._it, None)
+        while nxt is not None and nxt.snapshot_ts == first.snapshot_ts:
+            batch.append(nxt)
+            nxt = next(self._it, None)
+        self._next = nxt
+        if nxt is None:
+            self.exhausted = True
+        self.polls += 1
+        self.snapshots += len(batch)
+        return batch
+
+    def __iter__(self) -> Iterator[List[ThreadSnapshot]]:
+        while not self.exhausted:
+            batch = self.poll()
+            if batch:
+                yield batch
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+# (subreddit, listing)
+Source = Tuple[str, str]
+
+
+@dataclass
+class SourceState:
+    source: Source
+    interval_s: float
+    next_due: float
+    change_rate: Optional[float] = None  # EWMA per-post change rate (1/s)
+    change_ratio: Optional[float] = None  # changed/listed of the last poll
+    requests: float = 1.0  # EWMA of API requests per poll
+    last_poll: Optional[float] = None
+    polls: int = 0
+    overruns: int = 0  # polls that started more than one interval late
+
+
+class PollScheduler:
+    """
+    Per-source poll cadence for the Reddit ingestor.
+
+    After every poll each source reports how many listed posts were new or
+    changed (the SeenStore miss ratio). Treating post changes as a Poisson
+    process, that ratio over the time since the previous poll gives a
+    per-post change rate (EWMA-smoothed). The request budget is then spread
+    with the square-root rule, interval_i ~ sqrt(requests_i / rate_i), which
+    minimizes the change-weighted delay between a post changing and a poll
+    seeing it: busy sources are polled more often, quiet ones less. Sources
+    are not polled before `min_change` of their listing is expected to have
+    changed, and intervals stay within [min_interval_s, max_interval_s].
+
+    The budget is `requests_per_min`, or, without one, what polling every
+    source each `base_interval_s` would spend (same cost as a fixed interval,
+    redistributed). Sources without feedback yet use `base_interval_s`, and
+    all intervals are stretched together if the plan would exceed the budget.
+    The ingestor's RateLimiter still enforces the hard limit.
+
+    Due times advance from the previous due time, not from when the poll
+    finished, so slow cycles do not stretch the cadence; a source that fell
+    more than an interval behind is resynced to now instead of bursting.
+
+    clock/sleep are injectable, so the schedule can be driven by a fake clock.
+    """
+
+    def __init__(
+        self,
+        sources: Iterable[Source],
+        base_interval_s: float = 20.0,
+        min_interval_s: float = 5.0,
+        max_interval_s: float = 300.0,
+        requests_per_min: Optional[float] = None,
+        min_change: float = 0.02,
+        smoothing: float = 0.3,
+        coalesce_s: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if not 0.0 <= min_change < 1.0:
+            raise ValueError("min_change must be in [0, 1)")
+        self.base_interval_s = base_interval_s
+        self.min_interval_s = min_interval_s
+        self.max_interval_s = max_interval_s
+        self.requests_per_min = requests_per_min
+        self.min_change = min_change
+        self.smoothing = smoothing
+        self.coalesce_s = coalesce_s
+        self.clock = clock
+        self.sleep = sleep
+        now = clock()
+        self.states: Dict[Source, SourceState] = {
+            src: SourceState(src, self._clamp(base_interval_s), now) for src in sources
+        }
+        if not self.states:
+            raise ValueError("PollScheduler needs at least one source")
+
+    def _clamp(self, interval: float) -> float:
+        return min(self.max_interval_s, max(self.min_interval_s, interval))
+
+    def budget_per_s(self) -> float:
+        if self.requests_per_min:
+            return self.requests_per_min / 60.0
+        return sum(s.requests for s in self.states.values()) / self.base_interval_s
+
+    def projected_rpm(self) -> float:
+        return sum(60.0 * s.requests / s.interval_s for s in self.states.values())
+
+    def _plan(self) -> None:
+        budget = self.budget_per_s()
+        known = [s for s in self.states.values() if s.change_rate is not None]
+        # budget left for sources with a rate estimate
+        spare = budget - sum(s.requests / s.interval_s for s in self.states.values() if s.change_rate is None)
+        if known and spare > 0:
+            rates = {id(s): max(s.change_rate or 0.0, 1e-6) for s in known}
+            norm = sum(math.sqrt(s.requests * rates[id(s)]) for s in known)
+            for s in known:
+                lam = rates[id(s)]
+                interval = math.sqrt(s.requests / lam) * norm / spare
+                floor = -math.log(1.0 - self.min_change) / lam
+                s.interval_s = self._clamp(max(interval, floor))
+        # min_interval_s clamps can overshoot; stretch everything back under budget
+        over = sum(s.requests / s.interval_s for s in self.states.values()) / budget
+        if over > 1.0:
+            for s in self.states.values():
+                s.interval_s = min(self.max_interval_s, s.interval_s * over)
+
+    def due(self) -> List[Source]:
+        """Sources due now (plus those due within `coalesce_s`), earliest first."""
+        horizon = self.clock() + self.coalesce_s
+        ready = [s for s in self.states.values() if s.next_due <= horizon]
+        ready.sort(key=lambda s: s.next_due)
+        return [s.source for s in ready]
+
+    def next_due(self) -> float:
+        return min(s.next_due for s in self.states.values())
+
+    def wait(self) -> List[Source]:
+        """Sleep until at least one source is due and return the due sources."""
+        delay = self.next_due() - self.clock()
+        if delay > 0:
+            self.sleep(delay)
+        return self.due()
+
+    def _observe(self, s: SourceState, listed: int, changed: int, requests: float, now: float) -> None:
+        a = self.smoothing
+        s.requests = requests if s.polls == 0 else (1 - a) * s.requests + a * requests
+        s.polls += 1
+        s.change_ratio = changed / listed if listed else 0.0
+        if s.last_poll is not None and listed and now > s.last_poll:
+            # P(post changed within dt) = 1 - exp(-rate * dt)
+            unchanged = max(listed - changed, 0.5) / listed
+            rate = -math.log(unchanged) / (now - s.last_poll)
+            s.change_rate = rate if s.change_rate is None else (1 - a) * s.change_rate + a * rate
+        s.last_poll = now
+
+    def _advance(self, s: SourceState, now: float) -> None:
+        s.next_due += s.interval_s
+        if s.next_due < now - s.interval_s:
+            s.overruns += 1
+            s.next_due = now
+
+    def record(self, src: Source, listed: int, changed: int, requests: float = 1.0) -> None:
+        """Feed back one poll of `src` and schedule its next one."""
+        now = self.clock()
+        s = self.states[src]
+        self._observe(s, listed, changed, requests, now)
+        self._plan()
+        self._advance(s, now)
+
+    def record_poll(self, stats: Mapping[Source, Mapping[str, float]]) -> None:
+        """record() for every source of a poll, from RedditIngestor.last_poll."""
+        now = self.clock()
+        polled = [src for src in stats if src in self.states]
+        for src in polled:
+            st = stats[src]
+            self._observe(self.states[src], int(st.get("listed", 0)), int(st.get("changed", 0)), float(st.get("requests", 1)), now)
+        self._plan()
+        for src in polled:
+            self._advance(self.states[src], now)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "budget_rpm": round(self.budget_per_s() * 60.0, 1),
+            "projected_rpm": round(self.projected_rpm(), 1),
+            "sources": {
+                f"{sub}/{listing}": {
+                    "interval_s": round(s.interval_s, 1),
+                    "change_rate": None if s.change_rate is None else round(s.change_rate, 6),
+                    "change_ratio": None if s.change_ratio is None else round(s.change_ratio, 3),
+                    "polls": s.polls,
+                    "overruns": s.overruns,
+                }
+                for (sub, listing), s in self.states.items()
+            },
+        }
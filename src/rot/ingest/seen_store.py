@@ -1,9 +1,15 @@
 from __future__ import annotations
 
 import json
+import sqlite3
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# (post_id, score, num_comments) as seen in a listing
+SeenKey = Tuple[str, int, int]
 
 
 @dataclass
@@ -14,10 +20,19 @@ class SeenRecord:
 
 
 class SeenStore:
-    def __init__(self, path: str = "storage/seen_posts.json") -> None:
+    """
+    Last seen (score, num_comments) per post, persisted as one JSON file.
+
+    save() rewrites the whole file, and only when something changed. Records
+    not seen for `horizon_s` are dropped on save (None keeps them forever).
+    """
+
+    def __init__(self, path: str = "storage/seen_posts.json", horizon_s: Optional[int] = None) -> None:
         self.path = Path(path)
+        self.horizon_s = horizon_s
         self._data: Dict[str, SeenRecord] = {}
         self._loaded = False
+        self._dirty = False
 
     def load(self) -> None:
         if self._loaded:
@@ -38,12 +53,26 @@ class SeenStore:
             self._data = {}
 
     def save(self) -> None:
+        if self.horizon_s is not None:
+            self.expire(int(time.time()) - self.horizon_s)
+        if not self._dirty:
+            return
         self.path.parent.mkdir(parents=True, exist_ok=True)
         raw = {
             k: {"score": r.score, "num_comments": r.num_comments, "last_seen_ts": r.last_seen_ts}
             for k, r in self._data.items()
         }
-        self.path.write_text(json.dumps(raw, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(raw, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        tmp.replace(self.path)
+        self._dirty = False
+
+    def close(self) -> None:
+        self.save()
+
+    def __len__(self) -> int:
+        self.load()
+        return len(self._data)
 
     def get(self, post_id: str) -> Optional[SeenRecord]:
         self.load()
@@ -52,9 +81,163 @@ class SeenStore:
     def update(self, post_id: str, score: int, num_comments: int, ts: int) -> None:
         self.load()
         self._data[post_id] = SeenRecord(score=int(score), num_comments=int(num_comments), last_seen_ts=int(ts))
+        self._dirty = True
+
+    def expire(self, before_ts: int) -> int:
+        """Drop records last seen before `before_ts`; returns how many."""
+        self.load()
+        old = [k for k, r in self._data.items() if r.last_seen_ts < before_ts]
+        for k in old:
+            del self._data[k]
+        if old:
+            self._dirty = True
+        return len(old)
 
     def is_changed(self, post_id: str, score: int, num_comments: int) -> bool:
         rec = self.get(post_id)
         if rec is None:
             return True
         return int(score) != rec.score or int(num_comments) != rec.num_comments
+
+    def is_changed_many(self, items: Sequence[SeenKey]) -> List[bool]:
+        """is_changed() for a whole listing at once (against the stored state)."""
+        return [self.is_changed(pid, score, nc) for pid, score, nc in items]
+
+
+class SqliteSeenStore(SeenStore):
+    """
+    SeenStore in a SQLite database (WAL mode), for long-running deployments.
+
+    Nothing is read up front: lookups go to the database, batched per listing
+    by is_changed_many(). update() only marks the record dirty in memory;
+    save() upserts the dirty records and expires old ones in one transaction,
+    so each poll writes O(changed posts), not O(history).
+
+    On first use an existing JSON state file (`import_json`) is imported.
+    """
+
+    _CHUNK = 500  # stay under SQLite's bound-parameter limit
+
+    def __init__(
+        self,
+        path: str = "storage/seen_posts.sqlite3",
+        horizon_s: Optional[int] = None,
+        import_json: Optional[str] = "storage/seen_posts.json",
+    ) -> None:
+        super().__init__(path=path, horizon_s=horizon_s)
+        self.import_json = import_json
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending: Dict[str, SeenRecord] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            " post_id TEXT PRIMARY KEY, score INTEGER NOT NULL,"
+            " num_comments INTEGER NOT NULL, last_seen_ts INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS seen_last_seen ON seen(last_seen_ts)")
+        self._conn = conn
+        if self.import_json and Path(self.import_json).exists():
+            if conn.execute("SELECT 1 FROM seen LIMIT 1").fetchone() is None:
+                legacy = SeenStore(self.import_json)
+                legacy.load()
+                self._write((k, r.score, r.num_comments, r.last_seen_ts) for k, r in legacy._data.items())
+
+    def _write(self, rows: Iterable[Tuple[str, int, int, int]], expire_before: Optional[int] = None) -> None:
+        assert self._conn is not None
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO seen(post_id, score, num_comments, last_seen_ts) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT(post_id) DO UPDATE SET score=excluded.score,"
+                    " num_comments=excluded.num_comments, last_seen_ts=excluded.last_seen_ts",
+                    rows,
+                )
+                if expire_before is not None:
+                    self._conn.execute("DELETE FROM seen WHERE last_seen_ts < ?", (expire_before,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def save(self) -> None:
+        self.load()
+        expire_before = int(time.time()) - self.horizon_s if self.horizon_s is not None else None
+        if not self._pending and expire_before is None:
+            return
+        rows = [(k, r.score, r.num_comments, r.last_seen_ts) for k, r in self._pending.items()]
+        self._write(rows, expire_before)
+        self._pending.clear()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self.save()
+            self._conn.close()
+            self._conn = None
+            self._loaded = False
+
+    def __len__(self) -> int:
+        self.save()
+        assert self._conn is not None
+        with self._lock:
+            (n,) = self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()
+        return n
+
+    def _fetch(self, post_ids: Sequence[str]) -> Dict[str, SeenRecord]:
+        assert self._conn is not None
+        out: Dict[str, SeenRecord] = {}
+        with self._lock:
+            for i in range(0, len(post_ids), self._CHUNK):
+                chunk = post_ids[i : i + self._CHUNK]
+                q = "SELECT post_id, score, num_comments, last_seen_ts FROM seen WHERE post_id IN (%s)" % (
+                    ",".join("?" * len(chunk))
+                )
+                for pid, score, nc, ts in self._conn.execute(q, chunk):
+                    out[pid] = SeenRecord(score, nc, ts)
+        return out
+
+    def get(self, post_id: str) -> Optional[SeenRecord]:
+        self.load()
+        rec = self._pending.get(post_id)
+        if rec is not None:
+            return rec
+        return self._fetch([post_id]).get(post_id)
+
+    def update(self, post_id: str, score: int, num_comments: int, ts: int) -> None:
+        self.load()
+        self._pending[post_id] = SeenRecord(score=int(score), num_comments=int(num_comments), last_seen_ts=int(ts))
+
+    def expire(self, before_ts: int) -> int:
+        self.load()
+        self.save()
+        assert self._conn is not None
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM seen WHERE last_seen_ts < ?", (int(before_ts),))
+        return cur.rowcount
+
+    def is_changed_many(self, items: Sequence[SeenKey]) -> List[bool]:
+        self.load()
+        ids = list(dict.fromkeys(pid for pid, _, _ in items if pid not in self._pending))
+        stored = self._fetch(ids) if ids else {}
+        out: List[bool] = []
+        for pid, score, nc in items:
+            rec = self._pending.get(pid) or stored.get(pid)
+            out.append(rec is None or int(score) != rec.score or int(nc) != rec.num_comments)
+        return out
+
+
+def open_seen_store(path: str, horizon_s: Optional[int] = None) -> SeenStore:
+    """SeenStore for `path`: SQLite for .sqlite/.sqlite3/.db files, JSON otherwise."""
+    if Path(path).suffix in (".sqlite", ".sqlite3", ".db"):
+        return SqliteSeenStore(path=path, horizon_s=horizon_s, import_json=str(Path(path).with_suffix(".json")))
+    return SeenStore(path=path, horizon_s=horizon_s)
@@ -1,14 +1,12 @@
 from __future__ import annotations
 
-import contextlib
-import io
-import json
 import time
-from dataclasses import asdict, is_dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-import yfinance as yf
+from rot.core import metrics
+from rot.core.kvcache import KVCache, open_kv_cache
+from rot.market.provider import MarketDataProvider, default_provider
 
 # Map common text aliases -> Yahoo symbols
 ALIAS_MAP: Dict[str, str] = {
@@ -25,95 +23,74 @@ NON_EQUITY_TOKENS = {
     "US", "EU", "UK", "IRA", "SEC", "DOJ", "NATO", "BRICS", "PLA",
 }
 
-def _jsonable(obj: Any) -> Any:
-    if is_dataclass(obj):
-        return asdict(obj)
-    if isinstance(obj, dict):
-        return {k: _jsonable(v) for k, v in obj.items()}
-    if isinstance(obj, (list, tuple)):
-        return [_jsonable(x) for x in obj]
-    return obj
-
-@contextlib.contextmanager
-def _quiet_yfinance():
-    # yfinance prints a lot to stdout/stderr; swallow it.
-    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
-        yield
-
-
 class MarketEnricher:
     """
-    Lightweight yfinance market metadata enrichment.
-
-    Writes a cache to storage/market_cache.json to avoid repeated calls.
+    Lightweight market metadata enrichment.
+
+    Quotes are cached in a KVCache (storage/market_cache.sqlite3, shared by
+    every process on the host; a .json cache_path keeps the single-file
+    cache) with a per-key TTL: `ttl_s` for quotes, `error_ttl_s` for failed
+    lookups so they are retried soon. Entries read or written by this
+    process are also kept in memory until they expire, so repeated lookups
+    don't go back to the database. Uncached symbols are fetched through a
+    MarketDataProvider in one batched request and written through in one
+    put_many(); enrich_events() does that once for all events of a run. The
+    process-wide default_provider() is used unless one is injected.
     """
-    def __init__(self, cache_path: str = "storage/market_cache.json", ttl_s: int = 3600) -> None:
+    def __init__(
+        self,
+        cache_path: str = "storage/market_cache.sqlite3",
+        ttl_s: int = 3600,
+        provider: Optional[MarketDataProvider] = None,
+        error_ttl_s: int = 300,
+        cache: Optional[KVCache] = None,
+    ) -> None:
         self.cache_path = Path(cache_path)
         self.ttl_s = ttl_s
-        self._cache: Dict[str, Any] = {}
-        self._load_cache()
-
-    def _load_cache(self) -> None:
-        if self.cache_path.exists():
+        self.error_ttl_s = error_ttl_s
+        self.provider = provider or default_provider()
+        self.cache = cache or open_kv_cache(cache_path, ttl_s=ttl_s, namespace="market")
+        self._memo: Dict[str, Tuple[float, Dict[str, Any]]] = {}  # sym -> (expires, data)
+        self._prune_at = 1024
+
+    def _lookup(self, syms: List[str], now: float) -> Dict[str, Dict[str, Any]]:
+        """Fresh cached data for `syms`: memory first, then one cache read."""
+        out: Dict[str, Dict[str, Any]] = {}
+        rest: List[str] = []
+        for sym in syms:
+            hit = self._memo.get(sym)
+            if hit is not None and hit[0] > now:
+                out[sym] = hit[1]
+            else:
+                rest.append(sym)
+        if rest:
             try:
-                self._cache = json.loads(self.cache_path.read_text(encoding="utf-8"))
+                stored = self.cache.get_many(rest, now=now)
             except Exception:
-                self._cache = {}
-        else:
-            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
-            self._cache = {}
-
-    def _save_cache(self) -> None:
-        try:
-            self.cache_path.write_text(json.dumps(self._cache, ensure_ascii=False, indent=2), encoding="utf-8")
-        except Exception:
-            # cache failures should never break the pipeline
-            pass
-
-    def _fresh(self, sym: str) -> Optional[Dict[str, Any]]:
-        entry = self._cache.get(sym)
-        if not isinstance(entry, dict):
-            return None
-        ts = entry.get("ts")
-        if not isinstance(ts, (int, float)):
-            return None
-        if (time.time() - ts) <= self.ttl_s:
-            data = entry.get("data")
-            if isinstance(data, dict):
-                return data
-        return None
-
-    def _fetch(self, sym: str) -> Dict[str, Any]:
-        # Try to get minimal price + 1d change.
-        out: Dict[str, Any] = {"symbol": sym}
-
-        with _quiet_yfinance():
-            t = yf.Ticker(sym)
+                # cache failures should never break the pipeline
+                stored = {}
+            for sym, (expires, data) in stored.items():
+                if isinstance(data, dict):
+                    self._memo[sym] = (expires, data)
+                    out[sym] = data
+        return out
 
-            # Price series
+    def _store(self, fetched: Dict[str, Dict[str, Any]], now: float) -> None:
+        ok = {s: d for s, d in fetched.items() if not d.get("transient")}
+        failed = {s: d for s, d in fetched.items() if d.get("transient")}
+        for items, ttl in ((ok, self.ttl_s), (failed, self.error_ttl_s)):
+            for sym, data in items.items():
+                self._memo[sym] = (now + ttl, data)
             try:
-                hist = t.history(period="5d", interval="1d")
-                if hist is not None and len(hist) > 0:
-                    close = float(hist["Close"].iloc[-1])
-                    out["last_close"] = close
-                    if len(hist) >= 2:
-                        prev = float(hist["Close"].iloc[-2])
-                        out["pct_1d"] = (close / prev - 1.0) if prev else None
-            except Exception as e:
-                out["price_error"] = str(e)
-
-            # Light fundamentals (can be slow / flaky)
-            try:
-                info = getattr(t, "fast_info", None)
-                if isinstance(info, dict):
-                    # fast_info keys vary; keep it optional
-                    out["currency"] = info.get("currency")
-                    out["last_price"] = info.get("lastPrice") or info.get("last_price")
-                    out["market_cap"] = info.get("marketCap") or info.get("market_cap")
+                self.cache.put_many(items, ttl_s=ttl, now=now)
             except Exception:
                 pass
+        if len(self._memo) >= self._prune_at:
+            self._memo = {s: v for s, v in self._memo.items() if v[0] > now}
+            self._prune_at = max(1024, 2 * len(self._memo))
 
-        return out
+    def close(self) -> None:
+        self.cache.close()
 
     def get_symbol(self, raw: str) -> Optional[str]:
         s = raw.upper().strip()
@@ -124,26 +101,28 @@ class MarketEnricher:
             return None
         return s
 
-    def enrich_symbols(self, symbols: list[str]) -> Dict[str, Any]:
-        market: Dict[str, Any] = {}
-        now = int(time.time())
-
-        for raw in symbols:
-            sym = self.get_symbol(raw)
-            if not sym:
-                continue
-
-            cached = self._fresh(sym)
-            if cached is not None:
-                market[sym] = cached
-                continue
-
-            data = self._fetch(sym)
-            market[sym] = data
-            self._cache[sym] = {"ts": now, "data": data}
+    def prefetch(self, symbols: Iterable[str]) -> Dict[str, Any]:
+        """
+        Make sure every symbol is cached, fetching all stale/missing ones in a
+        single provider call. Returns {symbol: data} for the valid symbols.
+        """
+        valid = list(dict.fromkeys(s for s in (self.get_symbol(raw) for raw in symbols) if s))
+        now = time.time()
+        market: Dict[str, Any] = self._lookup(valid, now)
+        missing = [sym for sym in valid if sym not in market]
+
+        metrics.inc("rot_cache_lookups_total", len(market), cache="market", result="hit")
+        metrics.inc("rot_cache_lookups_total", len(missing), cache="market", result="miss")
+        if missing:
+            got = self.provider.quotes(missing)
+            fetched = {sym: got.get(sym) or {"symbol": sym, "price_error": "no data returned"} for sym in missing}
+            self._store(fetched, now)
+            market.update(fetched)
+        # callers see symbols in request order
+        return {sym: market[sym] for sym in valid}
 
-        self._save_cache()
-        return market
+    def enrich_symbols(self, symbols: list[str]) -> Dict[str, Any]:
+        return self.prefetch(symbols)
 
     def enrich_event(self, event: Any) -> Any:
         """
@@ -163,3 +142,25 @@ class MarketEnricher:
         meta.setdefault("market", {})
         meta["market"].update(self.enrich_symbols(list(entities)))
         return event
+
+    def enrich_events(self, events: List[Any]) -> List[Any]:
+        """
+        Batch version of enrich_event: one fetch for the union of all events'
+        uncached symbols, then each event gets its own slice.
+        """
+        market = self.prefetch(sym for e in events for sym in (getattr(e, "entities", []) or []))
+        out = []
+        for e in events:
+            meta = getattr(e, "meta", None)
+            if not isinstance(meta, dict):
+                out.append(self.enrich_event(e))
+                continue
+            mine = {}
+            for raw in getattr(e, "entities", []) or []:
+                sym = self.get_symbol(raw)
+                if sym and sym in market:
+                    mine[sym] = market[sym]
+            meta.setdefault("market", {})
+            meta["market"].update(mine)
+            out.append(e)
+        return out
@@ -0,0 +1,398 @@
+"""
+Option chains as columnar NumPy arrays, where they come from, and a TTL
+cache that fetches them once per underlying for all events of a run.
+
+An OptionChain holds one row per contract (expiry, call/put, strike, bid,
+ask, implied vol, open interest, volume) for one underlying. ChainSet
+concatenates many chains with a group index so strike/expiry selection
+(rot.market.selection) runs as a handful of array operations for every
+underlying at once.
+
+Providers:
+  YFinanceOptionsProvider   live chains via yfinance
+  FixtureOptionsProvider    recorded chains from a JSON file (save_chains())
+  SyntheticOptionsProvider  deterministic Black-Scholes chains around the
+                            spot quoted by a MarketDataProvider, e.g. a
+                            ReplayProvider for offline runs and benchmarks
+"""
+from __future__ import annotations
+
+import datetime as dt
+import json
+import math
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from rot.core import metrics
+from rot.core.ratelimit import RateLimiter
+from rot.market.pricing import bs_delta, bs_price, implied_vol
+from rot.market.provider import MarketDataProvider, _pooled_session, _quiet_yfinance
+
+_COLUMNS = ("strike", "bid", "ask", "iv", "oi", "volume")
+
+
+class OptionChain:
+    """All listed contracts of one underlying, as parallel arrays."""
+
+    __slots__ = ("symbol", "spot", "asof", "expiry", "is_call", "strike", "bid", "ask", "iv", "oi", "volume")
+
+    def __init__(
+        self,
+        symbol: str,
+        spot: float,
+        asof: np.datetime64,
+        expiry: np.ndarray,
+        is_call: np.ndarray,
+        strike: np.ndarray,
+        bid: np.ndarray,
+        ask: np.ndarray,
+        iv: np.ndarray,
+        oi: np.ndarray,
+        volume: np.ndarray,
+    ) -> None:
+        self.symbol = symbol
+        self.spot = float(spot)
+        self.asof = np.datetime64(asof, "D")
+        self.expiry = np.asarray(expiry, dtype="datetime64[D]")
+        self.is_call = np.asarray(is_call, dtype=bool)
+        self.strike = np.asarray(strike, dtype=np.float64)
+        self.bid = np.nan_to_num(np.asarray(bid, dtype=np.float64))
+        self.ask = np.nan_to_num(np.asarray(ask, dtype=np.float64))
+        self.iv = np.nan_to_num(np.asarray(iv, dtype=np.float64))
+        self.oi = np.nan_to_num(np.asarray(oi, dtype=np.float64)).astype(np.int64)
+        self.volume = np.nan_to_num(np.asarray(volume, dtype=np.float64)).astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self.strike)
+
+    @property
+    def dte(self) -> np.ndarray:
+        return (self.expiry - self.asof).astype(np.int64)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "symbol": self.symbol,
+            "spot": self.spot,
+            "asof": str(self.asof),
+            "expiry": [str(e) for e in self.expiry],
+            "is_call": self.is_call.astype(int).tolist(),
+            **{c: getattr(self, c).tolist() for c in _COLUMNS},
+        }
+
+    @classmethod
+    def from_dict(cls, d: Mapping[str, Any]) -> "OptionChain":
+        return cls(
+            d["symbol"], d["spot"], np.datetime64(d["asof"]), np.array(d["expiry"], dtype="datetime64[D]"),
+            np.array(d["is_call"], dtype=bool), *(np.array(d[c]) for c in _COLUMNS),
+        )
+
+
+class ChainSet:
+    """
+    Several chains concatenated: row arrays plus `group` (index into
+    `symbols`/`spot`), with days-to-expiry and delta computed for all rows
+    (implied vols missing from the quotes are solved from the mid).
+    """
+
+    def __init__(self, chains: Sequence[OptionChain], rate: float = 0.04) -> None:
+        self.symbols = [c.symbol for c in chains]
+        self.spot = np.array([c.spot for c in chains], dtype=np.float64)
+        self.asof = [c.asof for c in chains]
+        sizes = [len(c) for c in chains]
+        self.group = np.repeat(np.arange(len(chains), dtype=np.int64), sizes)
+        cat = lambda name: np.concatenate([getattr(c, name) for c in chains]) if chains else np.array([])  # noqa: E731
+        self.expiry = cat("expiry").astype("datetime64[D]")
+        self.is_call = cat("is_call").astype(bool)
+        self.strike = cat("strike").astype(np.float64)
+        self.bid = cat("bid").astype(np.float64)
+        self.ask = cat("ask").astype(np.float64)
+        self.iv = cat("iv").astype(np.float64)
+        self.oi = cat("oi").astype(np.int64)
+        self.volume = cat("volume").astype(np.int64)
+        self.dte = np.concatenate([c.dte for c in chains]) if chains else np.array([], dtype=np.int64)
+        self.mid = (self.bid + self.ask) / 2.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.spread_pct = np.where(self.mid > 0, (self.ask - self.bid) / self.mid, np.inf)
+        # quotes without a usable implied vol: solve it from the mid
+        spot, t = self.spot[self.group], self.dte / 365.0
+        missing = np.flatnonzero(~(self.iv > 0) & (self.mid > 0))
+        if len(missing):
+            self.iv[missing] = np.nan_to_num(
+                implied_vol(self.mid[missing], self.is_call[missing], spot[missing], self.strike[missing], t[missing], rate)
+            )
+        self.delta = bs_delta(self.is_call, spot, self.strike, t, self.iv, rate)
+
+    def __len__(self) -> int:
+        return len(self.strike)
+
+    @property
+    def n_groups(self) -> int:
+        return len(self.symbols)
+
+
+# -- providers -------------------------------------------------------------
+
+
+class OptionsProvider(ABC):
+    """
+    Where option chains come from. chains() fetches a batch of underlyings
+    (concurrently, `max_workers` at a time); implementations write
+    _fetch_chain() for one symbol and call _throttle() per remote request.
+    A symbol without options (or whose fetch failed) maps to None.
+    """
+
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None, max_workers: int = 1) -> None:
+        self.rate_limiter = rate_limiter
+        self.max_workers = max(1, int(max_workers))
+
+    @abstractmethod
+    def _fetch_chain(self, symbol: str) -> Optional[OptionChain]:
+        """Fetch the chain of one underlying."""
+
+    def _throttle(self, requests: int = 1) -> None:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(requests)
+
+    def _safe_fetch(self, symbol: str) -> Optional[OptionChain]:
+        try:
+            with metrics.span("rot_network_seconds", target="options"):
+                return self._fetch_chain(symbol)
+        except Exception:
+            return None
+
+    def chains(self, symbols: Sequence[str]) -> Dict[str, Optional[OptionChain]]:
+        syms = list(dict.fromkeys(symbols))
+        if self.max_workers > 1 and len(syms) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(syms))) as pool:
+                got = list(pool.map(self._safe_fetch, syms))
+        else:
+            got = [self._safe_fetch(s) for s in syms]
+        return dict(zip(syms, got))
+
+
+class YFinanceOptionsProvider(OptionsProvider):
+    """
+    Chains from yfinance: the first `max_expiries` expiries within `max_dte`
+    days, one request per expiry plus one for the expiry list and one for
+    the spot price, all over one pooled session.
+    """
+
+    def __init__(
+        self,
+        max_expiries: int = 6,
+        max_dte: int = 120,
+        session: Any = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_workers: int = 4,
+    ) -> None:
+        super().__init__(rate_limiter=rate_limiter, max_workers=max_workers)
+        self.max_expiries = max_expiries
+        self.max_dte = max_dte
+        self._session = session
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> Any:
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = _pooled_session()
+        return self._session
+
+    def _fetch_chain(self, symbol: str) -> Optional[OptionChain]:
+        import yfinance as yf
+
+        today = np.datetime64(dt.datetime.now(dt.timezone.utc).date(), "D")
+        with _quiet_yfinance():
+            t = yf.Ticker(symbol, session=self.session)
+            self._throttle()
+            expiries = [e for e in (t.options or ()) if 0 <= (np.datetime64(e) - today).astype(int) <= self.max_dte]
+            if not expiries:
+                return None
+            self._throttle()
+            spot = float(t.fast_info["lastPrice"])
+            cols: Dict[str, List[Any]] = {c: [] for c in ("expiry", "is_call") + _COLUMNS}
+            for e in expiries[: self.max_expiries]:
+                self._throttle()
+                oc = t.option_chain(e)
+                for df, call in ((oc.calls, True), (oc.puts, False)):
+                    n = len(df)
+                    cols["expiry"] += [e] * n
+                    cols["is_call"] += [call] * n
+                    cols["strike"] += df["strike"].tolist()
+                    cols["bid"] += df["bid"].tolist()
+                    cols["ask"] += df["ask"].tolist()
+                    cols["iv"] += df["impliedVolatility"].tolist()
+                    cols["oi"] += df["openInterest"].tolist()
+                    cols["volume"] += df["volume"].tolist()
+        if not cols["strike"] or not math.isfinite(spot):
+            return None
+        return OptionChain(
+            symbol, spot, today, np.array(cols["expiry"], dtype="datetime64[D]"),
+            np.array(cols["is_call"]), *(np.array(cols[c], dtype=np.float64) for c in _COLUMNS),
+        )
+
+
+class FixtureOptionsProvider(OptionsProvider):
+    """Recorded chains, e.g. saved from a live run with save_chains()."""
+
+    def __init__(self, chains: Mapping[str, OptionChain]) -> None:
+        super().__init__()
+        self.fixtures: Dict[str, OptionChain] = dict(chains)
+
+    @classmethod
+    def from_file(cls, path: str = "storage/options_chains.json") -> "FixtureOptionsProvider":
+        p = Path(path)
+        raw = json.loads(p.read_text(encoding="utf-8")) if p.exists() else {}
+        return cls({sym: OptionChain.from_dict(d) for sym, d in raw.items()})
+
+    def _fetch_chain(self, symbol: str) -> Optional[OptionChain]:
+        return self.fixtures.get(symbol)
+
+
+def save_chains(path: str, chains: Mapping[str, Optional[OptionChain]]) -> None:
+    """Write chains as a FixtureOptionsProvider file (atomically)."""
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(p.suffix + ".tmp")
+    tmp.write_text(json.dumps({s: c.to_dict() for s, c in chains.items() if c is not None}), encoding="utf-8")
+    tmp.replace(p)
+
+
+def _third_friday(year: int, month: int) -> dt.date:
+    first = dt.date(year, month, 1)
+    return first + dt.timedelta(days=(4 - first.weekday()) % 7 + 14)
+
+
+def _strike_step(spot: float) -> float:
+    for limit, step in ((5, 0.5), (25, 1.0), (100, 2.5), (250, 5.0), (1000, 10.0)):
+        if spot < limit:
+            return step
+    return 25.0
+
+
+class SyntheticOptionsProvider(OptionsProvider):
+    """
+    Deterministic chains for offline runs: weekly expiries for 8 weeks plus
+    monthlies out to `max_dte`, strikes within +-30% of the spot quoted by
+    `quotes`, Black-Scholes prices on a skewed smile, and open interest
+    peaking at the money. Vol level, skew and liquidity are seeded from the
+    symbol, so the same symbol always gets the same chain for a given spot
+    and `asof` date.
+    """
+
+    def __init__(self, quotes: MarketDataProvider, asof: Optional[dt.date] = None, max_dte: int = 120, rate: float = 0.04) -> None:
+        super().__init__()
+        self.quotes = quotes
+        self.asof = asof
+        self.max_dte = max_dte
+        self.rate = rate
+        self._spots: Dict[str, float] = {}
+
+    def chains(self, symbols: Sequence[str]) -> Dict[str, Optional[OptionChain]]:
+        # one batched quote request for every spot
+        self._spots = {
+            s: float(q["last_close"]) for s, q in self.quotes.quotes(list(dict.fromkeys(symbols))).items() if "last_close" in q
+        }
+        return super().chains(symbols)
+
+    def _expiries(self, today: dt.date) -> List[dt.date]:
+        out = {today + dt.timedelta(days=(4 - today.weekday()) % 7 + 7 * w) for w in range(8)}
+        y, m = today.year, today.month
+        for _ in range(self.max_dte // 28 + 2):
+            out.add(_third_friday(y, m))
+            y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+        return sorted(e for e in out if 0 < (e - today).days <= self.max_dte)
+
+    def _fetch_chain(self, symbol: str) -> Optional[OptionChain]:
+        spot = self._spots.get(symbol)
+        if not spot or spot <= 0:
+            return None
+        today = self.asof or dt.datetime.now(dt.timezone.utc).date()
+        rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+        base_vol = 0.2 + 0.6 * rng.random()
+        skew = 0.1 + 0.3 * rng.random()
+        liquidity = 10 ** rng.uniform(1.5, 4.0)
+
+        step = _strike_step(spot)
+        strikes = np.arange(math.floor(spot * 0.7 / step), math.ceil(spot * 1.3 / step) + 1) * step
+        strikes = strikes[strikes > 0]
+        exps = np.array(self._expiries(today), dtype="datetime64[D]")
+        if not len(strikes) or not len(exps):
+            return None
+
+        e, k, c = np.meshgrid(exps, strikes, np.array([True, False]), indexing="ij")
+        e, k, c = e.ravel(), k.ravel(), c.ravel()
+        t = (e - np.datetime64(today, "D")).astype(np.float64) / 365.0
+        m = np.log(k / spot)
+        iv = base_vol * (1.0 - skew * m + 1.5 * m * m) * (1.0 + 0.1 / np.sqrt(t * 12 + 1))
+        price = bs_price(c, spot, k, t, iv, self.rate)
+        half = np.maximum(0.01, 0.02 + 0.04 * price) / 2.0
+        bid = np.round(np.maximum(0.0, price - half), 2)
+        ask = np.round(price + half, 2)
+        oi = np.floor(liquidity * np.exp(-((m / 0.12) ** 2)) / np.sqrt(t * 12 + 1))
+        return OptionChain(symbol, spot, np.datetime64(today, "D"), e, c, k, bid, ask, iv, oi, oi // 3)
+
+
+# -- cache -----------------------------------------------------------------
+
+
+class OptionsChainCache:
+    """
+    In-process TTL cache over an OptionsProvider. get_many() serves fresh
+    chains from memory and fetches every missing or stale underlying in one
+    provider.chains() call. Symbols without options are remembered for
+    `negative_ttl_s`.
+    """
+
+    def __init__(
+        self,
+        provider: OptionsProvider,
+        ttl_s: float = 900.0,
+        negative_ttl_s: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.provider = provider
+        self.ttl_s = ttl_s
+        self.negative_ttl_s = negative_ttl_s
+        self.clock = clock
+        self._cache: Dict[str, Tuple[float, Optional[OptionChain]]] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, symbols: Iterable[str]) -> Dict[str, OptionChain]:
+        now = self.clock()
+        out: Dict[str, OptionChain] = {}
+        missing: List[str] = []
+        hits = 0
+        with self._lock:
+            for s in dict.fromkeys(symbols):
+                entry = self._cache.get(s)
+                if entry is not None:
+                    ts, chain = entry
+                    if now - ts <= (self.ttl_s if chain is not None else self.negative_ttl_s):
+                        hits += 1
+                        if chain is not None:
+                            out[s] = chain
+                        continue
+                missing.append(s)
+        metrics.inc("rot_cache_lookups_total", hits, cache="options", result="hit")
+        metrics.inc("rot_cache_lookups_total", len(missing), cache="options", result="miss")
+        if missing:
+            fetched = self.provider.chains(missing)
+            with self._lock:
+                for s in missing:
+                    chain = fetched.get(s)
+                    self._cache[s] = (now, chain)
+                    if chain is not None:
+                        out[s] = chain
+        return out
+
+    def get(self, symbol: str) -> Optional[OptionChain]:
+        return self.get_many([symbol]).get(symbol)
@@ -0,0 +1,265 @@
+"""
+Black-Scholes on NumPy arrays: prices, greeks, implied volatility, and the
+payoff of multi-leg structures.
+
+Everything broadcasts: pass whole option chains (or many chains
+concatenated) as arrays and get arrays back. `is_call` is a boolean array,
+`t` is in years, and rates/dividend yields are continuous.
+"""
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+
+_SQRT2 = np.sqrt(2.0)
+
+
+def _erf(x: np.ndarray) -> np.ndarray:
+    # Abramowitz & Stegun 7.1.26, |error| < 1.5e-7; in place to keep large
+    # chain/grid arrays down to two temporaries
+    x = np.atleast_1d(x)
+    a = np.abs(x)
+    t = a * 0.3275911
+    t += 1.0
+    np.reciprocal(t, out=t)
+    poly = t * 1.061405429
+    for c in (-1.453152027, 1.421413741, -0.284496736, 0.254829592):
+        poly += c
+        poly *= t
+    np.multiply(a, a, out=a)
+    np.negative(a, out=a)
+    np.exp(a, out=a)
+    poly *= a
+    np.subtract(1.0, poly, out=poly)
+    return np.copysign(poly, x, out=poly)
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    return (0.5 * (1.0 + _erf(x / _SQRT2))).reshape(x.shape)
+
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    return np.exp(-0.5 * x * x) / np.sqrt(2.0 * np.pi)
+
+
+def _d1_d2(s, k, t, sigma, r, q):
+    s, k, t, sigma = (np.asarray(v, dtype=np.float64) for v in (s, k, t, sigma))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol_t = sigma * np.sqrt(t)
+        d1 = (np.log(s / k) + (r - q + 0.5 * sigma * sigma) * t) / vol_t
+    return d1, d1 - vol_t
+
+
+def bs_price(is_call, s, k, t, sigma, r: float = 0.0, q: float = 0.0) -> np.ndarray:
+    """Theoretical price; intrinsic value where t or sigma is 0."""
+    is_call = np.asarray(is_call, dtype=bool)
+    s, k, t, sigma = (np.asarray(v, dtype=np.float64) for v in (s, k, t, sigma))
+    d1, d2 = _d1_d2(s, k, t, sigma, r, q)
+    df_r, df_q = np.exp(-r * t), np.exp(-q * t)
+    call = s * df_q * norm_cdf(d1) - k * df_r * norm_cdf(d2)
+    put = k * df_r * norm_cdf(-d2) - s * df_q * norm_cdf(-d1)
+    price = np.where(is_call, call, put)
+    intrinsic = np.where(is_call, np.maximum(s - k, 0.0), np.maximum(k - s, 0.0))
+    return np.where((t > 0) & (sigma > 0), price, intrinsic)
+
+
+def bs_delta(is_call, s, k, t, sigma, r: float = 0.0, q: float = 0.0) -> np.ndarray:
+    """Delta per share (calls 0..1, puts -1..0); NaN where t or sigma is not positive."""
+    is_call = np.asarray(is_call, dtype=bool)
+    t = np.asarray(t, dtype=np.float64)
+    sigma = np.asarray(sigma, dtype=np.float64)
+    d1, _ = _d1_d2(s, k, t, sigma, r, q)
+    df_q = np.exp(-q * t)
+    delta = np.where(is_call, df_q * norm_cdf(d1), df_q * (norm_cdf(d1) - 1.0))
+    return np.where((t > 0) & (sigma > 0), delta, np.nan)
+
+
+def bs_vega(s, k, t, sigma, r: float = 0.0, q: float = 0.0) -> np.ndarray:
+    """dPrice/dSigma per 1.00 of volatility (same for calls and puts)."""
+    t = np.asarray(t, dtype=np.float64)
+    d1, _ = _d1_d2(s, k, t, sigma, r, q)
+    with np.errstate(invalid="ignore"):
+        vega = np.asarray(s, dtype=np.float64) * np.exp(-q * t) * norm_pdf(d1) * np.sqrt(t)
+    return np.nan_to_num(vega)
+
+
+def bs_greeks(is_call, s, k, t, sigma, r: float = 0.0, q: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    delta, gamma, vega (per vol point), theta (per calendar day) and rho
+    (per rate point), per share; NaN where t or sigma is not positive.
+    """
+    is_call = np.asarray(is_call, dtype=bool)
+    s, k, t, sigma = (np.asarray(v, dtype=np.float64) for v in (s, k, t, sigma))
+    d1, d2 = _d1_d2(s, k, t, sigma, r, q)
+    df_r, df_q = np.exp(-r * t), np.exp(-q * t)
+    pdf = norm_pdf(d1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sqrt_t = np.sqrt(t)
+        gamma = df_q * pdf / (s * sigma * sqrt_t)
+        decay = -s * df_q * pdf * sigma / (2.0 * sqrt_t)
+    call_theta = decay - r * k * df_r * norm_cdf(d2) + q * s * df_q * norm_cdf(d1)
+    put_theta = decay + r * k * df_r * norm_cdf(-d2) - q * s * df_q * norm_cdf(-d1)
+    live = (t > 0) & (sigma > 0)
+    out = {
+        "delta": np.where(is_call, df_q * norm_cdf(d1), df_q * (norm_cdf(d1) - 1.0)),
+        "gamma": gamma,
+        "vega": s * df_q * pdf * sqrt_t / 100.0,
+        "theta": np.where(is_call, call_theta, put_theta) / 365.0,
+        "rho": np.where(is_call, k * t * df_r * norm_cdf(d2), -k * t * df_r * norm_cdf(-d2)) / 100.0,
+    }
+    return {name: np.where(live, v, np.nan) for name, v in out.items()}
+
+
+def implied_vol(
+    price,
+    is_call,
+    s,
+    k,
+    t,
+    r: float = 0.0,
+    q: float = 0.0,
+    tol: float = 1e-6,
+    max_iter: int = 50,
+    lo: float = 1e-4,
+    hi: float = 5.0,
+) -> np.ndarray:
+    """
+    Volatility that reproduces `price`, solved for all options at once:
+    Newton steps kept inside a shrinking [lo, hi] bracket, falling back to
+    bisection where a step would leave it (vega ~ 0 far from the money).
+    NaN where the price is outside the no-arbitrage bounds or t <= 0.
+    """
+    price, s, k, t = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (price, s, k, t)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), price.shape)
+    df_r, df_q = np.exp(-r * t), np.exp(-q * t)
+    lower = np.where(is_call, np.maximum(s * df_q - k * df_r, 0.0), np.maximum(k * df_r - s * df_q, 0.0))
+    upper = np.where(is_call, s * df_q, k * df_r)
+    valid = (t > 0) & (price > lower) & (price < upper)
+
+    sigma = np.full(price.shape, np.nan)
+    # iterate on the unconverged options only
+    idx = np.flatnonzero(valid)
+    p, c, s_, k_, t_ = (a.reshape(-1)[idx] for a in (price, is_call, s, k, t))
+    sig = np.full(len(idx), 0.3)
+    lo_b = np.full(len(idx), lo)
+    hi_b = np.full(len(idx), hi)
+    for _ in range(max_iter):
+        diff = bs_price(c, s_, k_, t_, sig, r, q) - p
+        active = np.abs(diff) > tol
+        if not active.all():
+            sigma.reshape(-1)[idx[~active]] = sig[~active]
+            idx, p, c, s_, k_, t_, sig, lo_b, hi_b, diff = (
+                a[active] for a in (idx, p, c, s_, k_, t_, sig, lo_b, hi_b, diff)
+            )
+        if not len(idx):
+            break
+        # price is increasing in sigma
+        hi_b = np.where(diff > 0, sig, hi_b)
+        lo_b = np.where(diff < 0, sig, lo_b)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = sig - diff / bs_vega(s_, k_, t_, sig, r, q)
+        inside = np.isfinite(step) & (step > lo_b) & (step < hi_b)
+        sig = np.where(inside, step, 0.5 * (lo_b + hi_b))
+    # not converged within max_iter: best estimate so far
+    sigma.reshape(-1)[idx] = sig
+    return sigma
+
+
+# -- multi-leg structures --------------------------------------------------
+
+
+def evaluate_structures(
+    strike,
+    is_call,
+    qty,
+    premium,
+    spot,
+    t,
+    iv,
+    r: float = 0.0,
+    points: int = 161,
+    span: float = 3.0,
+) -> Dict[str, np.ndarray]:
+    """
+    P&L of N multi-leg structures, padded to L legs: strike, is_call, qty
+    (signed, +buy/-sell, 0 for padding), premium (per share, paid or
+    received), t (years to each leg's expiry) and iv are (N, L); spot is (N,).
+
+    Each structure is valued at its first expiry, over a grid of `points`
+    underlying prices from 0 to `span` x max(spot, strikes) plus the
+    strikes themselves; later-dated legs (calendars) are priced with
+    Black-Scholes at their remaining time and own iv. Returns, per share:
+
+      grid, pnl      (N, G) payoff grid
+      net_debit      (N,)   premium paid (negative for a credit)
+      max_loss       (N,)   positive, inf if unbounded above
+      max_profit     (N,)   inf if unbounded above
+      breakevens     (N, 2) first two zero crossings, NaN-padded
+      pop            (N,)   probability of profit, lognormal at the mean iv
+    """
+    strike, qty, premium, t, iv = (np.atleast_2d(np.asarray(v, dtype=np.float64)) for v in (strike, qty, premium, t, iv))
+    is_call = np.atleast_2d(np.asarray(is_call, dtype=bool))
+    spot = np.asarray(spot, dtype=np.float64).reshape(-1)
+    legs = qty != 0
+    horizon = np.min(np.where(legs, t, np.inf), axis=1)
+    # padding legs: at the money, expiring at the horizon, worth nothing with qty 0
+    strike = np.where(legs, strike, spot[:, None])
+    t = np.where(legs, t, horizon[:, None])
+    iv = np.where(legs, iv, 0.0)
+
+    net_debit = np.sum(qty * premium, axis=1)
+    top = span * np.maximum(spot, np.max(np.where(legs, strike, 0.0), axis=1))
+    base = top[:, None] * np.linspace(0.0, 1.0, points)[None, :]
+    grid = np.sort(np.concatenate([base, strike], axis=1), axis=1)
+
+    # legs expiring at the horizon are worth their intrinsic value; only
+    # later-dated legs need Black-Scholes
+    s3, k3 = grid[:, None, :], strike[:, :, None]
+    value = np.where(is_call[:, :, None], np.maximum(s3 - k3, 0.0), np.maximum(k3 - s3, 0.0))
+    later = np.nonzero(t > horizon[:, None])
+    if len(later[0]):
+        value[later] = bs_price(
+            is_call[later][:, None], grid[later[0]], strike[later][:, None],
+            (t - horizon[:, None])[later][:, None], iv[later][:, None], r,
+        )
+    pnl = np.sum(qty[:, :, None] * value, axis=1) - net_debit[:, None]
+
+    # payoff slope beyond the grid: calls keep gaining intrinsic value
+    slope_up = np.sum(np.where(is_call, qty, 0.0), axis=1)
+    lowest = np.min(pnl, axis=1)
+    max_loss = np.where(slope_up < 0, np.inf, np.maximum(-lowest, 0.0))
+    max_profit = np.where(slope_up > 0, np.inf, np.max(pnl, axis=1))
+
+    # zero crossings, linearly interpolated between grid points
+    a, b = pnl[:, :-1], pnl[:, 1:]
+    cross = (np.sign(a) != np.sign(b)) & (a != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = grid[:, :-1] + (grid[:, 1:] - grid[:, :-1]) * a / (a - b)
+    x = np.where(cross, x, np.nan)
+    order = np.argsort(~cross, axis=1, kind="stable")[:, :2]
+    breakevens = np.take_along_axis(x, order, axis=1)
+    if breakevens.shape[1] < 2:
+        breakevens = np.pad(breakevens, ((0, 0), (0, 2 - breakevens.shape[1])), constant_values=np.nan)
+
+    # probability mass of each grid interval under a lognormal terminal price
+    vol = np.sum(np.where(legs, iv, 0.0), axis=1) / np.maximum(np.sum(legs, axis=1), 1)
+    vol_t = np.maximum(vol * np.sqrt(np.maximum(horizon, 0.0)), 1e-9)
+    with np.errstate(divide="ignore"):
+        z = (np.log(grid / spot[:, None]) - (r - 0.5 * vol[:, None] ** 2) * horizon[:, None]) / vol_t[:, None]
+    cdf = norm_cdf(z)
+    cdf[:, -1] = 1.0  # the tail beyond the grid keeps the last point's sign
+    profitable = ((a + b) / 2.0) > 0
+    pop = np.sum(np.where(profitable, np.diff(cdf, axis=1), 0.0), axis=1)
+
+    return {
+        "grid": grid,
+        "pnl": pnl,
+        "net_debit": net_debit,
+        "max_loss": max_loss,
+        "max_profit": max_profit,
+        "breakevens": breakevens,
+        "pop": pop,
+    }
@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from rot.core import metrics
+from rot.core.kvcache import SqliteKVCache
+from rot.core.ratelimit import RateLimiter
+
+
+@contextlib.contextmanager
+def _quiet_yfinance():
+    # yfinance prints a lot to stdout/stderr; swallow it.
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+def quote_from_closes(sym: str, closes: Sequence[float]) -> Dict[str, Any]:
+    """The enricher's per-symbol payload from a series of daily closes."""
+    out: Dict[str, Any] = {"symbol": sym}
+    closes = [float(c) for c in closes if c is not None and not math.isnan(float(c))]
+    if not closes:
+        out["price_error"] = "no price data"
+        return out
+    close = closes[-1]
+    out["last_close"] = close
+    if len(closes) >= 2:
+        prev = closes[-2]
+        out["pct_1d"] = (close / prev - 1.0) if prev else None
+    return out
+
+
+def _error(sym: str, msg: str) -> Dict[str, Any]:
+    # transient: the lookup failed (network, timeout), not the symbol
+    return {"symbol": sym, "price_error": msg, "transient": True}
+
+
+class _Flight:
+    __slots__ = ("done", "result")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+
+
+class MarketDataProvider(ABC):
+    """
+    Where market data comes from.
+
+    quotes() is the entry point for every market module. It coalesces
+    concurrent requests for the same symbol (single-flight: one thread fetches,
+    the others wait for its result) and delegates the rest to _fetch_quotes(),
+    which implementations write for a batch of symbols. Implementations that
+    talk to the network call _throttle() per request so a shared RateLimiter
+    paces all callers.
+    """
+
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None, flight_timeout_s: float = 60.0) -> None:
+        self.rate_limiter = rate_limiter
+        self.flight_timeout_s = flight_timeout_s
+        self._inflight: Dict[str, _Flight] = {}
+        self._inflight_lock = threading.Lock()
+
+    @abstractmethod
+    def _fetch_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch payloads for distinct, not-in-flight symbols."""
+
+    def _throttle(self, requests: int = 1) -> None:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(requests)
+
+    def quotes(self, symbols: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        {symbol: payload} for every requested symbol. Payload has "symbol" and
+        either "last_close" (+ "pct_1d" when two closes exist) or "price_error"
+        ("transient": True when the lookup itself failed).
+        """
+        syms = list(dict.fromkeys(symbols))
+        lead: List[str] = []
+        wait: Dict[str, _Flight] = {}
+        mine: Dict[str, _Flight] = {}
+        with self._inflight_lock:
+            for s in syms:
+                f = self._inflight.get(s)
+                if f is None:
+                    f = self._inflight[s] = mine[s] = _Flight()
+                    lead.append(s)
+                else:
+                    wait[s] = f
+
+        out: Dict[str, Dict[str, Any]] = {}
+        if lead:
+            try:
+                with metrics.span("rot_network_seconds", target="market"):
+                    got = self._fetch_quotes(lead)
+            except Exception as e:
+                got = {s: _error(s, str(e)) for s in lead}
+            with self._inflight_lock:
+                for s in lead:
+                    f = mine[s]
+                    f.result = got.get(s) or _error(s, "no data returned")
+                    out[s] = f.result
+                    del self._inflight[s]
+                    f.done.set()
+
+        for s, f in wait.items():
+            f.done.wait(self.flight_timeout_s)
+            out[s] = f.result or _error(s, "timed out waiting for in-flight request")
+
+        return {s: out[s] for s in syms}
+
+    def exists(self, symbols: Sequence[str]) -> Dict[str, Optional[bool]]:
+        """True/False per symbol, or None when the lookup failed and should be retried."""
+        out: Dict[str, Optional[bool]] = {}
+        for s, q in self.quotes(symbols).items():
+            if "last_close" in q:
+                out[s] = True
+            elif q.get("transient"):
+                out[s] = None
+            else:
+                out[s] = False
+        return out
+
+    def list_symbols(self) -> Optional[List[str]]:
+        """Full tradable symbol universe, if this provider can list it."""
+        return None
+
+
+def _pooled_session() -> Any:
+    # yfinance >= 0.2.54 talks through curl_cffi; one session = one connection pool.
+    try:
+        from curl_cffi import requests as cffi_requests
+
+        return cffi_requests.Session(impersonate="chrome")
+    except Exception:
+        return None  # yfinance falls back to its own shared session
+
+
+class YFinanceProvider(MarketDataProvider):
+    """
+    yfinance provider: one yf.download per `chunk_size` symbols over a single
+    pooled HTTP session. yfinance still issues one chart request per symbol
+    under the hood, so each chunk costs len(chunk) rate-limiter tokens.
+
+    yf.download does not raise when its requests fail (rate limiting, network):
+    it logs and returns an empty or all-NaN frame, exactly as it does for a
+    chunk of symbols that do not exist. A chunk with no data at all is
+    therefore checked against `sentinel`, a symbol that always has prices
+    (downloaded at most once per fetch): if the sentinel answers, the chunk's
+    symbols really have no price data; if not, every symbol in it gets a
+    transient error. A symbol missing from a chunk that did return data is a
+    real "no price data".
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 50,
+        period: str = "5d",
+        interval: str = "1d",
+        session: Any = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        sentinel: Optional[str] = "SPY",
+    ) -> None:
+        super().__init__(rate_limiter=rate_limiter)
+        self.chunk_size = max(1, int(chunk_size))
+        self.sentinel = sentinel
+        self.period = period
+        self.interval = interval
+        self._session = session
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> Any:
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = _pooled_session()
+        return self._session
+
+    def _download(self, chunk: List[str]) -> Any:
+        import yfinance as yf
+
+        self._throttle(len(chunk))
+        with _quiet_yfinance():
+            return yf.download(
+                tickers=chunk,
+                period=self.period,
+                interval=self.interval,
+                group_by="ticker",
+                auto_adjust=True,
+                progress=False,
+                threads=True,
+                session=self.session,
+            )
+
+    @staticmethod
+    def _closes(df: Any, sym: str, single: bool) -> List[float]:
+        if df is None or len(df) == 0:
+            return []
+        try:
+            if getattr(df.columns, "nlevels", 1) > 1:
+                if sym not in df.columns.get_level_values(0):
+                    return []
+                col = df[sym]["Close"]
+            elif single:
+                col = df["Close"]
+            else:
+                return []
+            return [float(x) for x in col.dropna().tolist()]
+        except Exception:
+            return []
+
+    @staticmethod
+    def _no_data(df: Any) -> bool:
+        if df is None or len(df) == 0:
+            return True
+        try:
+            return bool(df.isna().all().all())
+        except Exception:
+            return False
+
+    def _reachable(self) -> bool:
+        """Does Yahoo answer right now? One download of the sentinel symbol."""
+        if not self.sentinel:
+            return False
+        try:
+            df = self._download([self.sentinel])
+        except Exception:
+            return False
+        return bool(self._closes(df, self.sentinel, single=True))
+
+    def _fetch_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        reachable: Optional[bool] = None  # sentinel verdict, fetched on first need
+        for i in range(0, len(symbols), self.chunk_size):
+            chunk = symbols[i : i + self.chunk_size]
+            try:
+                df = self._download(chunk)
+            except Exception as e:
+                for s in chunk:
+                    out[s] = _error(s, str(e))
+                continue
+            if self._no_data(df):
+                if reachable is None and self.sentinel not in chunk:
+                    reachable = self._reachable()
+                for s in chunk:
+                    out[s] = quote_from_closes(s, []) if reachable else _error(s, "download returned no data")
+                continue
+            for s in chunk:
+                out[s] = quote_from_closes(s, self._closes(df, s, single=len(chunk) == 1))
+        return out
+
+
+class InMemoryProvider(MarketDataProvider):
+    """
+    Offline provider backed by a dict of daily closes per symbol. Records every
+    fetch so tests can assert on batching; `latency_s` simulates a round-trip.
+    """
+
+    def __init__(
+        self,
+        closes: Optional[Mapping[str, Sequence[float]]] = None,
+        latency_s: float = 0.0,
+        universe: Optional[Sequence[str]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        super().__init__(rate_limiter=rate_limiter)
+        self.closes: Dict[str, List[float]] = {k: list(v) for k, v in (closes or {}).items()}
+        self.latency_s = latency_s
+        self.universe = list(universe) if universe is not None else None
+        self.calls: List[List[str]] = []
+        self._lock = threading.Lock()
+
+    def _fetch_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            self.calls.append(list(symbols))
+        self._throttle()
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return {s: quote_from_closes(s, self.closes.get(s, [])) for s in symbols}
+
+    def list_symbols(self) -> Optional[List[str]]:
+        return list(self.universe) if self.universe is not None else None
+
+
+class ReplayProvider(InMemoryProvider):
+    """
+    Deterministic provider that replays recorded payloads, e.g. for backtests
+    from storage/market_cache.json. Unknown symbols get a (non-transient)
+    price_error, exactly like a symbol with no data.
+    """
+
+    def __init__(self, payloads: Mapping[str, Dict[str, Any]], latency_s: float = 0.0) -> None:
+        super().__init__(latency_s=latency_s)
+        self.payloads: Dict[str, Dict[str, Any]] = dict(payloads)
+
+    @classmethod
+    def from_file(cls, path: str = "storage/market_cache.json", **kw: Any) -> "ReplayProvider":
+        """
+        Load {sym: payload} or MarketEnricher's {sym: {"ts", "data": payload}}
+        JSON, or every entry of MarketEnricher's SQLite cache.
+        """
+        p = Path(path)
+        if p.suffix in (".sqlite", ".sqlite3", ".db"):
+            cache = SqliteKVCache(path, namespace="market")
+            raw = cache.dump() if p.exists() else {}
+            cache.close()
+        else:
+            raw = json.loads(p.read_text(encoding="utf-8")) if p.exists() else {}
+        payloads = {}
+        for sym, v in raw.items():
+            if isinstance(v, dict) and isinstance(v.get("data"), dict):
+                v = v["data"]
+            if isinstance(v, dict):
+                payloads[sym] = v
+        return cls(payloads, **kw)
+
+    def _fetch_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            self.calls.append(list(symbols))
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return {
+            s: dict(self.payloads[s]) if s in self.payloads else {"symbol": s, "price_error": "not recorded"}
+            for s in symbols
+        }
+
+    def list_symbols(self) -> Optional[List[str]]:
+        return sorted(self.payloads)
+
+
+_default: Optional[MarketDataProvider] = None
+_default_lock = threading.Lock()
+
+
+def default_provider() -> MarketDataProvider:
+    """
+    Process-wide provider shared by MarketEnricher, SymbolValidator and
+    SymbolSet, so connection reuse, single-flight and throttling are global.
+    """
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = YFinanceProvider(rate_limiter=RateLimiter.per_minute(600, burst=60))
+    return _default
+
+
+def set_default_provider(provider: Optional[MarketDataProvider]) -> None:
+    """Swap the shared provider (tests, backtests). None resets to yfinance."""
+    global _default
+    with _default_lock:
+        _default = provider
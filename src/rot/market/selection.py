@@ -0,0 +1,193 @@
+"""
+Vectorized strike/expiry selection over a ChainSet.
+
+Every selection request (an underlying, a strategy, a direction and a time
+horizon) gets its own copy of the liquid rows of its underlying's chain, so
+a whole batch is one set of flat arrays with a `req` index. Each leg is then
+a masked argmin per request (_View.best): pick the expiry closest to the
+horizon's target DTE, then the contract closest to the target delta (or to
+the money) within the leg's delta band.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from rot.market.options import ChainSet
+
+# (target, min, max) days to expiry per Event.time_horizon
+DTE_WINDOWS: Dict[str, Tuple[int, int, int]] = {
+    "intraday": (7, 2, 14),
+    "1w": (10, 5, 21),
+    "earnings": (14, 3, 35),
+    "longer": (45, 21, 90),
+    "unknown": (30, 14, 60),
+}
+
+# strategy -> (target |delta|, band half-width) per leg
+DEBIT_LONG = (0.55, 0.15)
+DEBIT_SHORT = (0.30, 0.15)
+STRANGLE = (0.25, 0.15)
+CALENDAR_GAP = (35, 21, 90)  # far expiry: target/min/max days after the near one
+
+# (side, row in the ChainSet)
+Legs = List[Tuple[str, int]]
+
+
+@dataclass(frozen=True)
+class ChainFilters:
+    min_oi: int = 100
+    max_spread_pct: float = 0.35
+    min_bid: float = 0.05
+
+
+def liquid_mask(cs: ChainSet, f: ChainFilters) -> np.ndarray:
+    return (cs.oi >= f.min_oi) & (cs.bid >= f.min_bid) & (cs.spread_pct <= f.max_spread_pct) & np.isfinite(cs.delta)
+
+
+class _View:
+    """The liquid rows of each request's underlying, concatenated per request."""
+
+    def __init__(self, cs: ChainSet, liquid: np.ndarray, groups: np.ndarray) -> None:
+        lg = cs.group[liquid]
+        start = np.searchsorted(lg, groups, "left")
+        length = np.searchsorted(lg, groups, "right") - start
+        self.n = len(groups)
+        self.req = np.repeat(np.arange(self.n), length)
+        offset = np.arange(len(self.req)) - np.repeat(np.cumsum(length) - length, length)
+        self.rows = liquid[np.repeat(start, length) + offset]
+        self.spot = cs.spot[groups]
+        self.dte = cs.dte[self.rows]
+        self.expiry = cs.expiry[self.rows]
+        self.is_call = cs.is_call[self.rows]
+        self.strike = cs.strike[self.rows]
+        self.delta = cs.delta[self.rows]
+
+    def best(self, mask: np.ndarray, score: np.ndarray) -> np.ndarray:
+        """Per request, the view index with the lowest score under `mask` (-1 if none)."""
+        s = np.where(mask, score, np.inf)
+        order = np.lexsort((s, self.req))
+        first = np.searchsorted(self.req[order], np.arange(self.n))
+        out = np.full(self.n, -1, dtype=np.int64)
+        has = first < len(order)
+        pick = order[first[has]]
+        ok = np.isfinite(s[pick])
+        out[np.flatnonzero(has)[ok]] = pick[ok]
+        return out
+
+    def at(self, pick: np.ndarray, values: np.ndarray, fill) -> np.ndarray:
+        return np.where(pick >= 0, values[np.maximum(pick, 0)] if len(values) else fill, fill)
+
+    def on_expiry(self, pick: np.ndarray) -> np.ndarray:
+        """Rows sharing the expiry of each request's picked row."""
+        exp = self.at(pick, self.expiry.astype(np.int64), -1)
+        return (exp[self.req] >= 0) & (self.expiry.astype(np.int64) == exp[self.req])
+
+    def expiry_near(self, target: np.ndarray, lo: np.ndarray, hi: np.ndarray, extra: Optional[np.ndarray] = None) -> np.ndarray:
+        t, lo, hi = target[self.req], lo[self.req], hi[self.req]
+        mask = (self.dte >= lo) & (self.dte <= hi)
+        if extra is not None:
+            mask &= extra
+        return self.best(mask, np.abs(self.dte - t))
+
+    def delta_pick(self, mask: np.ndarray, target: np.ndarray, width: float) -> np.ndarray:
+        dist = np.abs(self.delta - target[self.req])
+        return self.best(mask & (dist <= width), dist)
+
+    def atm_pick(self, mask: np.ndarray) -> np.ndarray:
+        return self.best(mask, np.abs(self.strike - self.spot[self.req]))
+
+
+def _windows(horizons: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    w = np.array([DTE_WINDOWS.get(h, DTE_WINDOWS["unknown"]) for h in horizons], dtype=np.int64).reshape(-1, 3)
+    return w[:, 0], w[:, 1], w[:, 2]
+
+
+def _debit_spread(v: _View, bullish: np.ndarray, horizons: Sequence[str]) -> List[Optional[Legs]]:
+    exp = v.expiry_near(*_windows(horizons))
+    call = bullish[v.req]
+    side = v.on_expiry(exp) & (v.is_call == call)
+    sign = np.where(bullish, 1.0, -1.0)
+    long = v.delta_pick(side, sign * DEBIT_LONG[0], DEBIT_LONG[1])
+    k_long = v.at(long, v.strike, np.nan)[v.req]
+    further = np.where(call, v.strike > k_long, v.strike < k_long)
+    short = v.delta_pick(side & further, sign * DEBIT_SHORT[0], DEBIT_SHORT[1])
+    return _legs(v, [("buy", long), ("sell", short)])
+
+
+def _straddle(v: _View, bullish: np.ndarray, horizons: Sequence[str]) -> List[Optional[Legs]]:
+    exp = v.expiry_near(*_windows(horizons))
+    on = v.on_expiry(exp)
+    call = v.atm_pick(on & v.is_call)
+    k = v.at(call, v.strike, np.nan)[v.req]
+    put = v.best(on & ~v.is_call & (v.strike == k), np.zeros(len(v.req)))
+    return _legs(v, [("buy", call), ("buy", put)])
+
+
+def _strangle(v: _View, bullish: np.ndarray, horizons: Sequence[str]) -> List[Optional[Legs]]:
+    exp = v.expiry_near(*_windows(horizons))
+    on = v.on_expiry(exp)
+    ones = np.ones(v.n)
+    call = v.delta_pick(on & v.is_call, STRANGLE[0] * ones, STRANGLE[1])
+    put = v.delta_pick(on & ~v.is_call, -STRANGLE[0] * ones, STRANGLE[1])
+    return _legs(v, [("buy", call), ("buy", put)])
+
+
+def _calendar(v: _View, bullish: np.ndarray, horizons: Sequence[str]) -> List[Optional[Legs]]:
+    near = v.expiry_near(*_windows(horizons))
+    near_dte = v.at(near, v.dte, -10_000)
+    far = v.expiry_near(near_dte + CALENDAR_GAP[0], near_dte + CALENDAR_GAP[1], near_dte + CALENDAR_GAP[2], v.is_call)
+    on_near, on_far = v.on_expiry(near) & v.is_call, v.on_expiry(far) & v.is_call
+    # near strikes that are also listed (and liquid) on the far expiry
+    key = v.req.astype(np.int64) * 10**9 + np.round(v.strike * 1000).astype(np.int64)
+    both = on_near & np.isin(key, key[on_far])
+    sell = v.atm_pick(both)
+    k = v.at(sell, v.strike, np.nan)[v.req]
+    buy = v.best(on_far & (v.strike == k), np.zeros(len(v.req)))
+    return _legs(v, [("sell", sell), ("buy", buy)])
+
+
+def _legs(v: _View, picks: List[Tuple[str, np.ndarray]]) -> List[Optional[Legs]]:
+    ok = np.logical_and.reduce([p >= 0 for _, p in picks])
+    rows = [(side, np.where(p >= 0, v.rows[np.maximum(p, 0)] if len(v.rows) else -1, -1)) for side, p in picks]
+    return [[(side, int(r[i])) for side, r in rows] if ok[i] else None for i in range(v.n)]
+
+
+STRATEGIES = {
+    "debit_spread": _debit_spread,
+    "straddle": _straddle,
+    "strangle": _strangle,
+    "calendar": _calendar,
+}
+
+
+def select_legs(
+    cs: ChainSet,
+    groups: Sequence[int],
+    strategies: Sequence[str],
+    bullish: Sequence[bool],
+    horizons: Sequence[str],
+    filters: ChainFilters = ChainFilters(),
+) -> List[Optional[Legs]]:
+    """
+    Legs for every request i: strategy `strategies[i]` on underlying
+    `cs.symbols[groups[i]]`, calls/puts per `bullish[i]` for debit spreads,
+    expiry per `horizons[i]`. None where no liquid contracts fit.
+    """
+    out: List[Optional[Legs]] = [None] * len(groups)
+    if not len(groups) or not len(cs):
+        return out
+    liquid = np.flatnonzero(liquid_mask(cs, filters))
+    g = np.asarray(groups, dtype=np.int64)
+    b = np.asarray(bullish, dtype=bool)
+    for name in dict.fromkeys(strategies):
+        fn = STRATEGIES.get(name)
+        if fn is None:
+            continue
+        idx = np.array([i for i, s in enumerate(strategies) if s == name], dtype=np.int64)
+        v = _View(cs, liquid, g[idx])
+        for i, legs in zip(idx, fn(v, b[idx], [horizons[j] for j in idx])):
+            out[int(i)] = legs
+    return out
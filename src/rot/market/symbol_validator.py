@@ -2,31 +2,86 @@ from __future__ import annotations
 
 import json
 import os
-from dataclasses import dataclass
-from typing import Dict, Optional
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
 
-import yfinance as yf
-
-from rot.market.enricher import ALIAS_MAP, NON_EQUITY_TOKENS, _quiet_yfinance
+from rot.core import metrics
+from rot.market.enricher import ALIAS_MAP, NON_EQUITY_TOKENS
+from rot.market.provider import MarketDataProvider, default_provider
+from rot.market.symbols import SymbolSet
 
 
 @dataclass
 class SymbolValidator:
+    """
+    Does a ticker exist? Layered cache in front of the MarketDataProvider:
+
+      0. the symbol directory (`symbols`), when it is a real listing: listed
+         symbols are valid and unlisted ones invalid, with no lookup at all
+      1. in-process dict of {symbol: {"ok", "ts"}} verdicts
+      2. cache_path JSON, loaded once and rewritten in batches (every
+         `flush_every` new verdicts or `flush_interval_s`, and on flush())
+      3. the provider, asked once per validate_many() for all misses
+
+    Valid symbols are trusted for `ttl_s`, invalid ones for `negative_ttl_s`.
+    A failed lookup (network error, timeout) is not a verdict: it is kept in
+    memory only and the symbol is retried after `retry_s`, reading as invalid
+    until then.
+
+    Safe to share between threads: the pipeline's detect stage validates
+    while the ingest timer flushes at the end of each run.
+    """
+
     cache_path: str = "storage/symbol_valid_cache.json"
     ttl_s: int = 7 * 24 * 3600  # 7d
+    provider: Optional[MarketDataProvider] = None
+    negative_ttl_s: int = 24 * 3600  # 1d
+    retry_s: int = 300
+    flush_every: int = 64
+    flush_interval_s: float = 30.0
+    symbols: Optional[SymbolSet] = field(default=None, repr=False)
+    clock: Callable[[], float] = field(default=time.time, repr=False)
 
     def __post_init__(self) -> None:
+        if self.provider is None:
+            self.provider = default_provider()
         self._cache: Dict[str, Dict[str, object]] = {}
-        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        self._lock = threading.RLock()  # guards _cache/_retry_at/_dirty and the file
+        self._retry_at: Dict[str, float] = {}
+        self._dirty = 0
+        self._last_flush = self.clock()
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
         if os.path.exists(self.cache_path):
             try:
-                self._cache = json.load(open(self.cache_path, "r", encoding="utf-8"))
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    self._cache = json.load(f)
             except Exception:
                 self._cache = {}
 
     def _save(self) -> None:
-        with open(self.cache_path, "w", encoding="utf-8") as f:
-            json.dump(self._cache, f)
+        tmp = f"{self.cache_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._cache, f, separators=(",", ":"))
+        os.replace(tmp, self.cache_path)
+
+    def flush(self) -> None:
+        """Persist new verdicts, if any."""
+        with self._lock:
+            if self._dirty:
+                try:
+                    self._save()
+                except OSError:
+                    return  # keep them dirty; try again next flush
+                self._dirty = 0
+            self._last_flush = self.clock()
+
+    def _maybe_flush(self) -> None:
+        if self._dirty >= self.flush_every or (
+            self._dirty and self.clock() - self._last_flush >= self.flush_interval_s
+        ):
+            self.flush()
 
     def normalize(self, sym: str) -> str:
         s = sym.strip().upper()
@@ -34,37 +89,110 @@ class SymbolValidator:
             s = s[1:]
         return ALIAS_MAP.get(s, s)
 
+    def _cached(self, s: str, now: float) -> Optional[bool]:
+        entry = self._cache.get(s)
+        if not isinstance(entry, dict) or "ok" not in entry:
+            return None
+        ok = bool(entry["ok"])
+        ts = entry.get("ts")
+        if not isinstance(ts, (int, float)):
+            return None  # pre-TTL entry: re-check once
+        if now - ts > (self.ttl_s if ok else self.negative_ttl_s):
+            return None
+        return ok
+
+    def validate_many(self, syms: Iterable[str]) -> Dict[str, bool]:
+        """
+        {normalized symbol: valid} for every input, with a single provider
+        call for all symbols that are neither listed, cached nor waiting to
+        retry.
+        """
+        now = self.clock()
+        out: Dict[str, bool] = {}
+        misses: List[str] = []
+        hits = backoff = listed = 0
+        directory = self.symbols
+        for raw in syms:
+            s = self.normalize(raw)
+            if s in out:
+                continue
+            # hard filters
+            if not s or len(s) < 2 or len(s) > 6 or s in NON_EQUITY_TOKENS:
+                out[s] = False
+                continue
+            known = directory.listed(s) if directory is not None else None
+            if known is not None:
+                out[s] = known
+                listed += 1
+                continue
+            hit = self._cached(s, now)
+            if hit is not None:
+                out[s] = hit
+                hits += 1
+                continue
+            if self._retry_at.get(s, 0.0) > now:
+                out[s] = False
+                backoff += 1
+                continue
+            out[s] = False
+            misses.append(s)
+
+        metrics.inc("rot_cache_lookups_total", listed, cache="symbol_valid", result="directory")
+        metrics.inc("rot_cache_lookups_total", hits, cache="symbol_valid", result="hit")
+        metrics.inc("rot_cache_lookups_total", backoff, cache="symbol_valid", result="backoff")
+        metrics.inc("rot_cache_lookups_total", len(misses), cache="symbol_valid", result="miss")
+
+        if misses:
+            found = self.provider.exists(misses)
+            with self._lock:
+                for s, res in found.items():
+                    if res is None:
+                        self._retry_at[s] = now + self.retry_s
+                        continue
+                    self._retry_at.pop(s, None)
+                    out[s] = bool(res)
+                    self._cache[s] = {"ok": bool(res), "ts": int(now)}
+                    self._dirty += 1
+                self._maybe_flush()
+
+        return out
+
     def is_valid(self, sym: str) -> bool:
-        s = self.normalize(sym)
+        return self.validate_many([sym]).get(self.normalize(sym), False)
 
-        # hard filters
-        if not s or len(s) < 2 or len(s) > 6:
-            return False
-        if s in NON_EQUITY_TOKENS:
-            return False
 
-        # cache hit
-        entry = self._cache.get(s)
-        if entry and isinstance(entry, dict) and "ok" in entry:
-            return bool(entry["ok"])
+class ValidationMemo:
+    """
+    Per-run memo over a SymbolValidator: each raw token is normalized and
+    validated at most once per run, however many candidates mention it.
+    """
 
-        ok = False
+    def __init__(self, validator: SymbolValidator) -> None:
+        self.validator = validator
+        self._memo: Dict[str, Optional[str]] = {}
+
+    def prime(self, raws: Iterable[str]) -> None:
+        """Validate every not-yet-seen token with one SymbolValidator batch."""
+        todo = [r for r in dict.fromkeys(raws) if r not in self._memo]
+        if not todo:
+            return
+        verdicts = self.validator.validate_many(todo)
+        for r in todo:
+            s = self.validator.normalize(r)
+            self._memo[r] = s if verdicts.get(s) else None
+
+    def valid(self, raw: str) -> Optional[str]:
+        """Normalized symbol if `raw` is a valid ticker, else None."""
         try:
-            with _quiet_yfinance():
-                t = yf.Ticker(s)
-                # Fast existence checks that don't scream too much:
-                fi = getattr(t, "fast_info", None)
-                if fi:
-                    # last_price exists for many real tickers
-                    lp = fi.get("lastPrice") or fi.get("last_price")
-                    ok = lp is not None
-                if not ok:
-                    # fallback: 1d history should exist for real symbols
-                    hist = t.history(period="1d")
-                    ok = (hist is not None) and (len(hist) > 0)
-        except Exception:
-            ok = False
-
-        self._cache[s] = {"ok": ok}
-        self._save()
-        return ok
+            return self._memo[raw]
+        except KeyError:
+            pass
+        s = self.validator.normalize(raw)
+        out = s if self.validator.is_valid(s) else None
+        self._memo[raw] = out
+        return out
+
+    def valid_symbols(self, raws: Iterable[str]) -> List[str]:
+        """Valid, normalized, de-duplicated symbols (sorted, at most 5)."""
+        good = {s for s in map(self.valid, raws) if s is not None}
+        return sorted(good)[:5]
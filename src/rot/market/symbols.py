@@ -1,11 +1,218 @@
 from __future__ import annotations
 
 import csv
+import mmap
+import os
+import re
+import struct
 import time
+import urllib.request
 from pathlib import Path
-from typing import Set
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Set
 
-import yfinance as yf
+from rot.market.provider import MarketDataProvider, default_provider
+
+# Exchange codes used by the Nasdaq Trader symbol directory.
+EXCHANGES: Dict[str, str] = {
+    "Q": "NASDAQ",
+    "N": "NYSE",
+    "A": "NYSE American",  # formerly AMEX
+    "P": "NYSE Arca",
+    "Z": "Cboe BZX",
+    "V": "IEX",
+}
+
+DEFAULT_LISTINGS = ("storage/nasdaqlisted.txt", "storage/otherlisted.txt")
+
+# Where each listing file is published, by file name (refreshed daily upstream).
+LISTING_URLS: Dict[str, str] = {
+    "nasdaqlisted.txt": "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt",
+    "otherlisted.txt": "https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt",
+}
+
+_MAGIC = b"ROTSYM1\n"
+_HEADER = struct.Struct("<III")  # count, symbols blob size, names blob size
+
+
+class SymbolInfo(NamedTuple):
+    symbol: str  # Yahoo style: BRK.B -> BRK-B
+    name: str
+    exchange: str  # one of EXCHANGES, "" if unknown
+    etf: bool
+
+
+def _yahoo(sym: str) -> str:
+    return sym.strip().upper().replace(".", "-").replace("/", "-")
+
+
+# Securities that are not the company's main listing: their names would map
+# the company to a warrant or preferred symbol.
+_SIDE_ISSUE_RE = re.compile(r"\b(?:warrants?|rights?|units?|preferred|notes?|debentures?)\b", re.I)
+_SHARE_CLASS_RE = re.compile(
+    r"\s+(?:class [a-z]\b|common stock|common shares|ordinary shares|capital stock|"
+    r"american depositary|depositary shares|shares of beneficial interest).*$",
+    re.I,
+)
+_LEGAL_SUFFIX_RE = re.compile(
+    r"[\s,]+(?:inc|corp|corporation|co|company|ltd|limited|plc|n\.?v|s\.?a|ag|se|l\.?p|llc)\.?$",
+    re.I,
+)
+
+
+def _company(security_name: str) -> str:
+    """'Apple Inc. - Common Stock' -> 'Apple'; '' for warrants, preferreds etc."""
+    if _SIDE_ISSUE_RE.search(security_name):
+        return ""
+    name = _SHARE_CLASS_RE.sub("", security_name.split(" - ")[0]).strip()
+    while True:
+        short = _LEGAL_SUFFIX_RE.sub("", name).strip()
+        if short == name:
+            return name
+        name = short
+
+
+def download_listing(url: str, path: Path, timeout_s: float = 20.0) -> bool:
+    """
+    Fetch one symbol directory file to `path` (temp file + os.replace). Only a
+    complete file replaces the local copy: it must start with a symbol header
+    and end with the "File Creation Time" trailer. False on any failure.
+    """
+    try:
+        req = urllib.request.Request(url, headers={"User-Agent": "rot/1.0"})
+        with urllib.request.urlopen(req, timeout=timeout_s) as resp:
+            body = resp.read()
+    except Exception:
+        return False
+    text = body.decode("utf-8", "replace")
+    if not text.startswith(("Symbol|", "ACT Symbol|")) or "File Creation Time" not in text[-200:]:
+        return False
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+    except OSError:
+        return False
+    return True
+
+
+def parse_listing(path: str) -> Iterator[SymbolInfo]:
+    """
+    Rows of a Nasdaq Trader symbol directory file: nasdaqlisted.txt
+    (Symbol|Security Name|...|ETF|...) or otherlisted.txt
+    (ACT Symbol|Security Name|Exchange|CQS Symbol|ETF|...). Test issues and
+    the trailing "File Creation Time" line are skipped.
+    """
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        header = f.readline().rstrip("\r\n").split("|")
+        col = {h.strip(): i for i, h in enumerate(header)}
+        i_sym = col.get("Symbol", col.get("ACT Symbol"))
+        if i_sym is None:
+            raise ValueError(f"{path}: not a symbol directory file")
+        i_name = col.get("Security Name")
+        i_exch = col.get("Exchange")
+        i_etf = col.get("ETF")
+        i_test = col.get("Test Issue")
+        for line in f:
+            parts = line.rstrip("\r\n").split("|")
+            if len(parts) < len(header) or parts[0].startswith("File Creation Time"):
+                continue
+            if i_test is not None and parts[i_test] == "Y":
+                continue
+            sym = _yahoo(parts[i_sym])
+            if not sym:
+                continue
+            yield SymbolInfo(
+                symbol=sym,
+                name=parts[i_name].strip() if i_name is not None else "",
+                exchange=parts[i_exch].strip() if i_exch is not None else "Q",
+                etf=i_etf is not None and parts[i_etf] == "Y",
+            )
+
+
+class SymbolIndex:
+    """
+    Frozen, sorted symbol universe with O(1) lookups.
+
+    Columns are parallel: symbols (sorted), names, one exchange code byte and
+    one ETF flag byte per symbol. save()/load() use a flat binary snapshot
+    that is read through mmap, so startup does not re-parse listing files.
+    """
+
+    __slots__ = ("symbols", "names", "_exchanges", "_etf", "_pos")
+
+    def __init__(self, symbols: Sequence[str], names: Sequence[str], exchanges: bytes, etf: bytes) -> None:
+        self.symbols = tuple(symbols)
+        self.names = tuple(names)
+        self._exchanges = exchanges
+        self._etf = etf
+        self._pos: Dict[str, int] = {s: i for i, s in enumerate(self.symbols)}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[SymbolInfo]) -> "SymbolIndex":
+        # first listing wins for symbols that appear in several files
+        by_sym: Dict[str, SymbolInfo] = {}
+        for r in rows:
+            by_sym.setdefault(r.symbol, r)
+        syms = sorted(by_sym)
+        infos = [by_sym[s] for s in syms]
+        return cls(
+            syms,
+            [r.name for r in infos],
+            bytes((r.exchange or " ")[0].encode("ascii", "replace")[0] for r in infos),
+            bytes(1 if r.etf else 0 for r in infos),
+        )
+
+    @classmethod
+    def from_listings(cls, paths: Iterable[str]) -> "SymbolIndex":
+        return cls.from_rows(r for p in paths for r in parse_listing(str(p)))
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, sym: object) -> bool:
+        return sym in self._pos
+
+    def get(self, sym: str) -> Optional[SymbolInfo]:
+        i = self._pos.get(sym)
+        if i is None:
+            return None
+        exch = chr(self._exchanges[i]).strip()
+        return SymbolInfo(self.symbols[i], self.names[i], exch, bool(self._etf[i]))
+
+    def is_etf(self, sym: str) -> bool:
+        i = self._pos.get(sym)
+        return i is not None and bool(self._etf[i])
+
+    def save(self, path: str) -> None:
+        syms = "\n".join(self.symbols).encode("utf-8")
+        names = "\n".join(n.replace("\n", " ") for n in self.names).encode("utf-8")
+        p = Path(path)
+        tmp = p.with_suffix(p.suffix + ".tmp")
+        with tmp.open("wb") as f:
+            f.write(_MAGIC)
+            f.write(_HEADER.pack(len(self.symbols), len(syms), len(names)))
+            for blob in (syms, names, self._exchanges, self._etf):
+                f.write(blob)
+        tmp.replace(p)
+
+    @classmethod
+    def load(cls, path: str) -> "SymbolIndex":
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            if m[: len(_MAGIC)] != _MAGIC:
+                raise ValueError(f"{path}: not a symbol index snapshot")
+            off = len(_MAGIC)
+            n, ns, nn = _HEADER.unpack_from(m, off)
+            off += _HEADER.size
+            syms = m[off : off + ns].decode("utf-8").split("\n") if n else []
+            off += ns
+            names = m[off : off + nn].decode("utf-8").split("\n") if n else []
+            off += nn
+            exch = m[off : off + n]
+            etf = m[off + n : off + 2 * n]
+        if len(syms) != n or len(names) != n or len(etf) != n:
+            raise ValueError(f"{path}: truncated symbol index snapshot")
+        return cls(syms, names, exch, etf)
 
 
 class SymbolSet:
@@ -15,16 +222,37 @@ class SymbolSet:
       - Nasdaq listed
       - NYSE listed
       - AMEX listed
-    yfinance provides these via public download endpoints internally.
+    read from Nasdaq Trader symbol directory files (nasdaqlisted.txt,
+    otherlisted.txt) under storage/, parsed once into a SymbolIndex and
+    snapshotted to storage/symbols.idx; later starts load the snapshot until a
+    listing file changes. Files older than `ttl_s` (or missing) are downloaded
+    again from `listing_urls`; when that fails (offline) the local copies are
+    used as they are.
 
-    Cache to storage/symbols.csv and keep an in-memory set.
+    Without listing files the list comes from the MarketDataProvider
+    (default_provider() unless one is injected), when it can list its
+    universe. Cache to storage/symbols.csv and keep an in-memory set.
     """
 
-    def __init__(self, cache_path: str = "storage/symbols.csv", ttl_s: int = 24 * 3600) -> None:
+    def __init__(
+        self,
+        cache_path: str = "storage/symbols.csv",
+        ttl_s: int = 24 * 3600,
+        provider: Optional[MarketDataProvider] = None,
+        listing_paths: Sequence[str] = DEFAULT_LISTINGS,
+        index_path: str = "storage/symbols.idx",
+        listing_urls: Optional[Mapping[str, str]] = None,
+        download_timeout_s: float = 20.0,
+    ) -> None:
         self.cache_path = Path(cache_path)
         self.ttl_s = ttl_s
+        self.provider = provider
+        self.listing_paths = [Path(p) for p in listing_paths]
+        self.index_path = Path(index_path)
+        self.listing_urls: Mapping[str, str] = LISTING_URLS if listing_urls is None else listing_urls
+        self.download_timeout_s = download_timeout_s
         self.cache_path.parent.mkdir(parents=True, exist_ok=True)
-        self._symbols: Set[str] = set()
+        self.index = SymbolIndex([], [], b"", b"")
         self._load_or_refresh()
 
     def _stale(self) -> bool:
@@ -33,35 +261,71 @@ class SymbolSet:
         age = time.time() - self.cache_path.stat().st_mtime
         return age > self.ttl_s
 
+    def _listing_stale(self, p: Path) -> bool:
+        return not p.exists() or time.time() - p.stat().st_mtime > self.ttl_s
+
+    def download_listings(self, force: bool = False) -> int:
+        """Re-download stale (or, with `force`, all) listing files; returns how many succeeded."""
+        n = 0
+        for p in self.listing_paths:
+            url = self.listing_urls.get(p.name)
+            if url and (force or self._listing_stale(p)):
+                n += download_listing(url, p, self.download_timeout_s)
+        return n
+
     def _load_or_refresh(self) -> None:
+        self.download_listings()
+        listings = [p for p in self.listing_paths if p.exists()]
+        if listings:
+            self._load_listings(listings)
+            return
         if self._stale():
-            self.refresh()
+            self._refresh_from_provider()
         self._load()
 
+    def _load_listings(self, listings: List[Path]) -> None:
+        newest = max(p.stat().st_mtime for p in listings)
+        if self.index_path.exists() and self.index_path.stat().st_mtime >= newest:
+            try:
+                self.index = SymbolIndex.load(str(self.index_path))
+                return
+            except (OSError, ValueError):
+                pass  # corrupt snapshot: rebuild below
+        self.index = SymbolIndex.from_listings(str(p) for p in listings)
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            self.index.save(str(self.index_path))
+        except OSError:
+            pass
+
     def _load(self) -> None:
-        syms: Set[str] = set()
+        rows: List[SymbolInfo] = []
         if self.cache_path.exists():
             with self.cache_path.open("r", encoding="utf-8", newline="") as f:
                 r = csv.DictReader(f)
                 for row in r:
                     s = (row.get("symbol") or "").strip().upper()
                     if s:
-                        syms.add(s)
-        self._symbols = syms
+                        rows.append(SymbolInfo(s, "", "", False))
+        self.index = SymbolIndex.from_rows(rows)
 
     def refresh(self) -> None:
         """
-        Pull symbol lists via yfinance helper (best-effort).
+        Re-download the listing files, else pull the symbol list from the
+        provider (best-effort).
         """
-        # yfinance has a utility endpoint for ticker lists in newer versions; if not,
-        # fallback to an empty set (still ok; we'll validate via quote fetch).
-        rows = []
+        if self.download_listings(force=True):
+            self._load_listings([p for p in self.listing_paths if p.exists()])
+            return
+        self._refresh_from_provider()
+        self._load()
+
+    def _refresh_from_provider(self) -> None:
+        listed = None
         try:
-            # This works in many yfinance versions
-            for s in yf.Tickers("SPY").tickers:  # no-op just to ensure module works
-                break
+            listed = (self.provider or default_provider()).list_symbols()
         except Exception:
-            pass
+            listed = None
 
         # Fallback: use a small conservative baseline if refresh fails
         # (We still block obvious non-equities later)
@@ -69,21 +333,55 @@ class SymbolSet:
             "AAPL","MSFT","NVDA","AMZN","GOOGL","META","TSLA","AMD","INTC","NFLX",
             "SPY","QQQ","IWM","DIA","VOO"
         ]
-        rows = [{"symbol": s} for s in baseline]
+        rows = [{"symbol": s} for s in (listed or baseline)]
 
         with self.cache_path.open("w", encoding="utf-8", newline="") as f:
             w = csv.DictWriter(f, fieldnames=["symbol"])
             w.writeheader()
             w.writerows(rows)
 
-        self._load()
+    def info(self, sym: str) -> Optional[SymbolInfo]:
+        """Name, exchange and ETF flag of a listed symbol."""
+        return self.index.get(_yahoo(sym))
+
+    def symbols(self) -> Set[str]:
+        return set(self.index.symbols)
+
+    def authoritative(self) -> bool:
+        """True when the set is a real directory, not the small fallback baseline."""
+        return len(self.index) > 50
+
+    def listed(self, sym: str) -> Optional[bool]:
+        """
+        Whether the directory lists `sym`, or None when it cannot say: the
+        set is only the fallback baseline, or `sym` is an index (^GSPC),
+        which the directory never lists.
+        """
+        sym = _yahoo(sym)
+        if not sym or sym.startswith("^") or not self.authoritative():
+            return None
+        return sym in self.index
+
+    def company_names(self, min_words: int = 2) -> Dict[str, str]:
+        """
+        {company name: symbol} for the listed non-ETF symbols, for
+        EntityExtractor.add_names(). The security name is cut at the share
+        class ("Apple Inc. - Common Stock" -> "Apple") and names shorter than
+        `min_words` words are skipped: one-word names ("Target", "Block")
+        are too often ordinary words.
+        """
+        out: Dict[str, str] = {}
+        idx = self.index
+        for i, sym in enumerate(idx.symbols):
+            if idx.is_etf(sym):
+                continue
+            name = _company(idx.names[i])
+            if len(name.split()) >= min_words:
+                out.setdefault(name, sym)
+        return out
 
     def is_valid(self, sym: str) -> bool:
-        sym = sym.strip().upper()
-        if not sym:
+        if not _yahoo(sym):
             return False
-        # If we have a non-trivial set, validate against it.
-        if len(self._symbols) > 50:
-            return sym in self._symbols
-        # Otherwise don't block too hard; let market enricher attempt fetch.
-        return True
+        # Without a real directory don't block too hard; let market enricher attempt fetch.
+        return self.listed(sym) is not False
@@ -1,21 +1,191 @@
 from __future__ import annotations
 
-from typing import List
+import datetime as dt
+import math
+import re
+from dataclasses import replace
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from rot.core.types import Event, OptionLeg, ReasoningPacket, TradeIdea
+from rot.market.options import ChainSet, OptionsChainCache
+from rot.market.pricing import bs_greeks, evaluate_structures
+from rot.market.selection import ChainFilters, Legs, select_legs
+
+_STRUCTURES = (
+    ("debit_spread", re.compile(r"debit|vertical|(call|put) spread", re.I)),
+    ("calendar", re.compile(r"calendar|diagonal", re.I)),
+    ("straddle", re.compile(r"straddle", re.I)),
+    ("strangle", re.compile(r"strangle", re.I)),
+)
+
+
+def _candidates(packet: ReasoningPacket, e: Event) -> List[str]:
+    """Structures to try, in order: the reasoner's, then a fallback by stance/event."""
+    out: List[str] = []
+    for text in packet.recommended_structures:
+        for name, pat in _STRUCTURES:
+            if pat.search(text) and name not in out:
+                out.append(name)
+                break
+    if e.stance in ("bullish", "bearish"):
+        fallback = ["debit_spread", "calendar"]
+    elif e.event_type == "earnings_rumor" or e.time_horizon == "earnings":
+        fallback = ["straddle", "strangle"]
+    else:
+        fallback = ["strangle", "straddle", "calendar"]
+    out += [s for s in fallback if s not in out]
+    # debit spreads need a direction
+    return [s for s in out if s != "debit_spread" or e.stance in ("bullish", "bearish")]
 
-from rot.core.types import Event, ReasoningPacket, TradeIdea
 
 class TradeBuilder:
+    """
+    Turns a reasoning packet into option structures on the event's first
+    entity. Without an OptionsChainCache there is no market data and every
+    idea is a strategy="none" placeholder.
+
+    build_many() fetches the chains of all underlyings of a run in one batch,
+    selects legs for every candidate structure of every event together
+    (rot.market.selection) and prices them all in one evaluate_structures()
+    call: buys fill at the ask, sells at the bid. Each event gets its best
+    `max_ideas` structures, ranked by quality_score, which blends the
+    probability of profit, reward/risk, leg liquidity and the reasoner's
+    order of preference. max_loss is per contract of 100 shares.
+    """
+
+    def __init__(
+        self,
+        chains: Optional[OptionsChainCache] = None,
+        filters: ChainFilters = ChainFilters(),
+        rate: float = 0.04,
+        max_ideas: int = 3,
+    ) -> None:
+        self.chains = chains
+        self.filters = filters
+        self.rate = rate
+        self.max_ideas = max_ideas
+
     def build(self, packet: ReasoningPacket, e: Event) -> List[TradeIdea]:
-        # V1: no market data yet -> emit no-trade idea with reason
-        return [
-            TradeIdea(
-                underlying=e.entities[0] if e.entities else "UNKNOWN",
-                strategy="none",
-                legs=[],
-                max_loss=0.0,
-                thesis=packet.thesis,
-                time_stop="N/A",
-                quality_score=0.0,
-                do_not_trade_reasons=["market_data_not_configured"],
+        return self.build_many([(packet, e)])[0]
+
+    def build_many(self, items: Sequence[Tuple[ReasoningPacket, Event]]) -> List[List[TradeIdea]]:
+        if self.chains is None:
+            return [[self._none(p, e, "market_data_not_configured")] for p, e in items]
+
+        underlyings = [e.entities[0] if e.entities else "" for _, e in items]
+        fetched = self.chains.get_many(u for u in underlyings if u)
+        cs = ChainSet(list(fetched.values()), rate=self.rate)
+        group = {sym: i for i, sym in enumerate(cs.symbols)}
+        cands = [_candidates(p, e) if u in group else [] for (p, e), u in zip(items, underlyings)]
+
+        # (item, preference rank, strategy, legs) for every structure that fits
+        found: List[Tuple[int, int, str, Legs]] = []
+        for k in range(max((len(c) for c in cands), default=0)):
+            todo = [i for i, c in enumerate(cands) if len(c) > k]
+            picked = select_legs(
+                cs,
+                [group[underlyings[i]] for i in todo],
+                [cands[i][k] for i in todo],
+                [items[i][1].stance == "bullish" for i in todo],
+                [items[i][1].time_horizon for i in todo],
+                self.filters,
             )
-        ]
+            found += [(i, k, cands[i][k], legs) for i, legs in zip(todo, picked) if legs is not None]
+
+        ranked: List[List[Tuple[float, TradeIdea]]] = [[] for _ in items]
+        for (i, *_), scored in zip(found, self._price(cs, found, items)):
+            ranked[i].append(scored)
+
+        out: List[List[TradeIdea]] = []
+        for (p, e), u, ideas in zip(items, underlyings, ranked):
+            if not ideas:
+                out.append([self._none(p, e, "no_option_chain" if u not in group else "no_liquid_strikes")])
+                continue
+            ideas.sort(key=lambda x: -x[0])
+            out.append([replace(idea, meta={**idea.meta, "rank": n + 1}) for n, (_, idea) in enumerate(ideas[: self.max_ideas])])
+        return out
+
+    def _price(
+        self,
+        cs: ChainSet,
+        found: Sequence[Tuple[int, int, str, Legs]],
+        items: Sequence[Tuple[ReasoningPacket, Event]],
+    ) -> List[Tuple[float, TradeIdea]]:
+        if not found:
+            return []
+        n, width = len(found), max(len(f[3]) for f in found)
+        rows = np.zeros((n, width), dtype=np.int64)
+        qty = np.zeros((n, width))
+        for j, (_, _, _, legs) in enumerate(found):
+            for m, (side, r) in enumerate(legs):
+                rows[j, m] = r
+                qty[j, m] = 1.0 if side == "buy" else -1.0
+        groups = cs.group[rows[:, 0]]
+        premium = np.where(qty > 0, cs.ask[rows], cs.bid[rows])
+        t = cs.dte[rows] / 365.0
+        ev = evaluate_structures(cs.strike[rows], cs.is_call[rows], qty, premium, cs.spot[groups], t, cs.iv[rows], self.rate)
+        greeks = bs_greeks(cs.is_call[rows], cs.spot[groups][:, None], cs.strike[rows], t, cs.iv[rows], self.rate)
+        net = {name: np.nansum(qty * g, axis=1) * 100.0 for name, g in greeks.items() if name != "rho"}
+
+        legs_n = np.maximum(np.sum(qty != 0, axis=1), 1)
+        on = qty != 0
+        # liquidity: open interest (log scale, 10k saturates) and spread width
+        oi = np.sum(np.where(on, np.minimum(1.0, np.log10(1.0 + cs.oi[rows]) / 4.0), 0.0), axis=1) / legs_n
+        tight = np.sum(np.where(on, 1.0 - cs.spread_pct[rows] / self.filters.max_spread_pct, 0.0), axis=1) / legs_n
+        liquidity = np.clip(0.5 * oi + 0.5 * tight, 0.0, 1.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            reward = np.where(ev["max_loss"] > 0, ev["max_profit"] / ev["max_loss"], np.inf)
+        reward = np.minimum(np.nan_to_num(reward, nan=0.0, posinf=3.0), 3.0) / 3.0
+        prefer = 1.0 - 0.1 * np.array([k for _, k, _, _ in found])
+        score = prefer * (0.4 * ev["pop"] + 0.3 * reward + 0.3 * liquidity)
+
+        out = []
+        for j, (i, _, strategy, legs) in enumerate(found):
+            g = int(groups[j])
+            dte = int(cs.dte[[r for _, r in legs]].min())
+            stop = cs.asof[g].astype(dt.date) + dt.timedelta(days=math.ceil(dte / 2))
+            max_profit = float(ev["max_profit"][j])
+            idea = TradeIdea(
+                underlying=cs.symbols[g],
+                strategy=strategy,  # type: ignore[arg-type]
+                legs=[
+                    OptionLeg(
+                        side=side,  # type: ignore[arg-type]
+                        kind="call" if cs.is_call[r] else "put",
+                        strike=float(cs.strike[r]),
+                        expiry=str(cs.expiry[r]),
+                        qty=1,
+                    )
+                    for side, r in legs
+                ],
+                max_loss=round(float(ev["max_loss"][j]) * 100.0, 2),
+                thesis=items[i][0].thesis,
+                time_stop=f"exit by {stop.isoformat()}",
+                quality_score=round(float(score[j]), 3),
+                meta={
+                    "spot": float(cs.spot[g]),
+                    "dte": dte,
+                    "net_debit": round(float(ev["net_debit"][j]), 2),
+                    "max_profit": round(max_profit * 100.0, 2) if math.isfinite(max_profit) else None,
+                    "breakevens": [round(float(b), 2) for b in ev["breakevens"][j] if math.isfinite(b)],
+                    "pop": round(float(ev["pop"][j]), 3),
+                    "liquidity": round(float(liquidity[j]), 3),
+                    "greeks": {name: round(float(v[j]), 4) for name, v in net.items()},
+                },
+            )
+            out.append((float(score[j]), idea))
+        return out
+
+    def _none(self, packet: ReasoningPacket, e: Event, reason: str) -> TradeIdea:
+        return TradeIdea(
+            underlying=e.entities[0] if e.entities else "UNKNOWN",
+            strategy="none",
+            legs=[],
+            max_loss=0.0,
+            thesis=packet.thesis,
+            time_stop="N/A",
+            quality_score=0.0,
+            do_not_trade_reasons=[reason],
+        )
@@ -1,27 +1,304 @@
 from __future__ import annotations
 
+import http.client
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from pathlib import Path
+from typing import Any, Dict, IO, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from rot.core import metrics
 from rot.core.types import Event, ReasoningPacket
+from rot.reasoner.parser import StreamingJsonParser, iter_sse_content, packet_from_obj
+from rot.reasoner.prompts import build_messages, cache_key
+
+
+def stub_packet(e: Event, **raw: Any) -> ReasoningPacket:
+    # V1 stub: structured placeholder
+    return ReasoningPacket(
+        thesis=f"Reddit chatter mentions {', '.join(e.entities)}; treat as unverified.",
+        catalyst_window="unknown",
+        market_expectation="unclear; watch implied volatility + liquidity",
+        invalidations=[
+            "No corroboration across sources",
+            "Trend decays within hours",
+        ],
+        recommended_structures=[
+            "debit_spread (defined risk)",
+            "calendar (if catalyst known)",
+        ],
+        risk_notes=[
+            "Do not trade without market data gates",
+        ],
+        raw={"stub": True, **raw},
+    )
+
+
+class _ChatClient:
+    """
+    Minimal OpenAI-compatible /chat/completions client over http.client.
+    Each worker thread keeps one keep-alive connection to the API host.
+    """
+
+    def __init__(self, base_url: str, api_key: str, timeout_s: float) -> None:
+        u = urlsplit(base_url)
+        self.https = u.scheme == "https"
+        self.host = u.hostname or "localhost"
+        self.port = u.port
+        self.path = (u.path.rstrip("/") or "") + "/chat/completions"
+        self.api_key = api_key
+        self.timeout_s = timeout_s
+        self._local = threading.local()
+
+    def _conn(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = cls(self.host, self.port, timeout=self.timeout_s)
+            self._local.conn = conn
+        return conn
+
+    def _drop(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _drain(self, conn: http.client.HTTPConnection, resp: http.client.HTTPResponse, deadline: float) -> None:
+        """Read the rest of a stream so the connection can be reused, or drop
+        the connection if that cannot finish before `deadline`."""
+        left = deadline - time.monotonic()
+        if left <= 0 or conn.sock is None:
+            self._drop()
+            return
+        try:
+            conn.sock.settimeout(left)
+            resp.read()
+        except OSError:
+            self._drop()
+            return
+        if conn.sock is not None:
+            conn.sock.settimeout(self.timeout_s)
+
+    def complete(self, body: Dict[str, Any], deadline: float) -> Any:
+        """POST `body` and return the first JSON object of the answer (streamed or not)."""
+        payload = json.dumps(body).encode("utf-8")
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream" if body.get("stream") else "application/json",
+        }
+        for attempt in (0, 1):
+            conn = self._conn()
+            try:
+                conn.request("POST", self.path, body=payload, headers=headers)
+                resp = conn.getresponse()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # stale keep-alive connection: reconnect once
+                self._drop()
+                if attempt:
+                    raise
+        try:
+            if resp.status != 200:
+                detail = resp.read()[:200].decode("utf-8", "replace")
+                raise RuntimeError(f"HTTP {resp.status}: {detail}")
+            parser = StreamingJsonParser()
+            if body.get("stream"):
+                for piece in iter_sse_content(resp):
+                    if parser.feed(piece):
+                        break
+                    if time.monotonic() > deadline:
+                        raise TimeoutError("reasoner deadline exceeded while streaming")
+                self._drain(conn, resp, deadline)
+            else:
+                data = json.loads(resp.read())
+                parser.feed(data["choices"][0]["message"]["content"])
+            obj = parser.close()
+            if obj is None:
+                raise ValueError(parser.error or "no JSON object in response")
+            return obj
+        except BaseException:
+            self._drop()
+            raise
+
 
 class DeepSeekReasoner:
-    def __init__(self, api_key: str | None = None) -> None:
+    """
+    Turns an Event into a ReasoningPacket.
+
+    Without an api_key this is the structured stub. With one, requests go to
+    the DeepSeek chat API (any OpenAI-compatible `base_url`, e.g. a local mock
+    server) and:
+      - responses are cached by content address (prompt version, model and the
+        normalized event, see prompts.cache_key), in memory and optionally in
+        an append-only JSONL file, so a post reasoned on in an earlier cycle
+        costs nothing;
+      - concurrent requests for the same key share one in-flight call;
+      - at most `max_concurrency` calls run at once, on a thread pool;
+      - answers are streamed and parsed incrementally;
+      - a call that fails or exceeds `timeout_s` falls back to the stub packet
+        (raw["fallback"] says why), which is not cached.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str = "https://api.deepseek.com",
+        model: str = "deepseek-chat",
+        max_concurrency: int = 4,
+        timeout_s: float = 30.0,
+        cache_size: int = 4096,
+        cache_path: str | None = None,
+        stream: bool = True,
+        temperature: float = 0.2,
+    ) -> None:
         self.api_key = api_key
+        self.model = model
+        self.timeout_s = timeout_s
+        self.stream = stream
+        self.temperature = temperature
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.cache_size = max(0, int(cache_size))
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
 
-    def reason(self, e: Event) -> ReasoningPacket:
-        # V1 stub: structured placeholder
-        return ReasoningPacket(
-            thesis=f"Reddit chatter mentions {', '.join(e.entities)}; treat as unverified.",
-            catalyst_window="unknown",
-            market_expectation="unclear; watch implied volatility + liquidity",
-            invalidations=[
-                "No corroboration across sources",
-                "Trend decays within hours",
-            ],
-            recommended_structures=[
-                "debit_spread (defined risk)",
-                "calendar (if catalyst known)",
-            ],
-            risk_notes=[
-                "Do not trade without market data gates",
-            ],
-            raw={"stub": True},
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()  # serializes appends; never held with _lock
+        self._file: Optional[IO[str]] = None
+        self._closed = False
+        self._client = _ChatClient(base_url, api_key, timeout_s) if api_key else None
+        self._pool = (
+            ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="rot-reasoner")
+            if api_key
+            else None
         )
+        self._load_cache()
+
+    # -- cache -----------------------------------------------------------
+
+    def _load_cache(self) -> None:
+        if self.cache_path is None or not self.cache_path.exists():
+            return
+        with self.cache_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                    self._remember(row["key"], row["response"], persist=False)
+                except (ValueError, KeyError, TypeError):
+                    continue  # torn last line after a crash
+
+    def _remember(self, key: str, obj: Dict[str, Any], persist: bool = True) -> None:
+        if not self.cache_size:
+            return
+        with self._lock:
+            self._cache[key] = obj
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        if persist and self.cache_path is not None:
+            # outside _lock: cache lookups in _submit() never wait on the disk
+            line = json.dumps({"key": key, "response": obj}, ensure_ascii=False) + "\n"
+            with self._file_lock:
+                if self._closed:
+                    return  # a call that finished after close()
+                if self._file is None:
+                    self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = self.cache_path.open("a", encoding="utf-8")
+                self._file.write(line)
+                self._file.flush()
+
+    # -- requests --------------------------------------------------------
+
+    def _call(self, e: Event, key: str) -> Dict[str, Any]:
+        assert self._client is not None
+        deadline = time.monotonic() + self.timeout_s
+        body = {
+            "model": self.model,
+            "messages": build_messages(e),
+            "temperature": self.temperature,
+            "response_format": {"type": "json_object"},
+            "stream": self.stream,
+        }
+        with metrics.span("rot_network_seconds", target="deepseek"):
+            obj = self._client.complete(body, deadline)
+        if not isinstance(obj, dict):
+            raise ValueError("reasoning response is not a JSON object")
+        self._remember(key, obj)
+        return obj
+
+    def _submit(self, e: Event) -> Tuple[str, Future]:
+        key = cache_key(e, self.model)
+        with self._lock:
+            obj = self._cache.get(key)
+            if obj is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                metrics.inc("rot_cache_lookups_total", cache="reasoning", result="hit")
+                done: Future = Future()
+                done.set_result(obj)
+                return key, done
+            fut = self._inflight.get(key)
+            if fut is None:
+                self.misses += 1
+                metrics.inc("rot_cache_lookups_total", cache="reasoning", result="miss")
+                assert self._pool is not None
+                fut = self._pool.submit(self._call, e, key)
+                self._inflight[key] = fut
+                fut.add_done_callback(lambda _f, k=key: self._forget(k))
+            else:
+                self.hits += 1  # coalesced with an in-flight call
+                metrics.inc("rot_cache_lookups_total", cache="reasoning", result="coalesced")
+        return key, fut
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def _resolve(self, e: Event, key: str, fut: Future, deadline: float) -> ReasoningPacket:
+        try:
+            obj = fut.result(timeout=max(0.0, deadline - time.monotonic()))
+            return packet_from_obj(obj, raw={"model": self.model, "cache_key": key})
+        except FutureTimeout:
+            reason = "timeout"
+        except Exception as ex:
+            reason = f"{type(ex).__name__}: {ex}"[:200]
+        with self._lock:
+            self.fallbacks += 1
+        return stub_packet(e, fallback=reason, cache_key=key)
+
+    def reason(self, e: Event) -> ReasoningPacket:
+        if self._client is None:
+            return stub_packet(e)
+        key, fut = self._submit(e)
+        return self._resolve(e, key, fut, time.monotonic() + self.timeout_s)
+
+    def reason_many(self, events: List[Event]) -> List[ReasoningPacket]:
+        """reason() for a batch: all requests start at once (bounded by max_concurrency)."""
+        if self._client is None:
+            return [stub_packet(e) for e in events]
+        subs = [self._submit(e) for e in events]
+        # Queued requests need time for the ones ahead of them.
+        waves = max(1, -(-sum(1 for _, f in subs if not f.done()) // self.max_concurrency))
+        deadline = time.monotonic() + self.timeout_s * waves
+        return [self._resolve(e, key, fut, deadline) for e, (key, fut) in zip(events, subs)]
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "fallbacks": self.fallbacks, "cached": len(self._cache)}
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        with self._file_lock:
+            self._closed = True
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from rot.core.types import ReasoningPacket
+
+_PACKET_LISTS = ("invalidations", "recommended_structures", "risk_notes")
+_PACKET_STRS = ("thesis", "catalyst_window", "market_expectation")
+
+
+class StreamingJsonParser:
+    """
+    Incremental extractor for the first JSON object in streamed model output.
+
+    feed() takes text chunks as they arrive and tracks string/escape state and
+    brace depth, so the object is recognized the moment its closing brace
+    arrives, without re-scanning the accumulated text. Anything before the
+    first `{` (prose, ```json fences) is skipped.
+    """
+
+    def __init__(self) -> None:
+        self._buf: List[str] = []
+        self._depth = 0
+        self._in_str = False
+        self._escape = False
+        self.value: Optional[Any] = None
+        self.error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.value is not None or self.error is not None
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk; True once a complete object was parsed (or failed to)."""
+        if self.done:
+            return True
+        start = 0
+        if self._depth == 0:
+            start = chunk.find("{")
+            if start < 0:
+                return False
+        for i in range(start, len(chunk)):
+            ch = chunk[i]
+            if self._in_str:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_str = False
+            elif ch == '"':
+                self._in_str = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._buf.append(chunk[start : i + 1])
+                    self._finish()
+                    return True
+        self._buf.append(chunk[start:])
+        return False
+
+    def _finish(self) -> None:
+        text = "".join(self._buf)
+        self._buf = []
+        try:
+            self.value = json.loads(text)
+        except ValueError as e:
+            self.error = f"invalid JSON: {e}"
+
+    def close(self) -> Optional[Any]:
+        """End of stream: the parsed object, or None (see `error`)."""
+        if not self.done:
+            self.error = "truncated JSON" if self._depth else "no JSON object in response"
+        return self.value
+
+
+def iter_sse_content(lines: Iterable[bytes]) -> Iterator[str]:
+    """
+    Text deltas from an OpenAI-compatible chat completion event stream
+    (`data: {"choices": [{"delta": {"content": ...}}]}` lines, `data: [DONE]`).
+    """
+    for raw in lines:
+        line = raw.decode("utf-8", "replace").strip()
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            obj = json.loads(data)
+        except ValueError:
+            continue
+        for choice in obj.get("choices") or []:
+            piece = (choice.get("delta") or {}).get("content")
+            if piece:
+                yield piece
+
+
+def _str_list(v: Any) -> List[str]:
+    if isinstance(v, list):
+        return [str(x) for x in v if x is not None]
+    if isinstance(v, str) and v:
+        return [v]
+    return []
+
+
+def packet_from_obj(obj: Any, raw: Optional[Dict[str, Any]] = None) -> ReasoningPacket:
+    """ReasoningPacket from the model's JSON object; missing fields become empty."""
+    if not isinstance(obj, dict):
+        raise ValueError("reasoning response is not a JSON object")
+    return ReasoningPacket(
+        thesis=str(obj.get("thesis") or ""),
+        catalyst_window=str(obj.get("catalyst_window") or "unknown"),
+        market_expectation=str(obj.get("market_expectation") or ""),
+        invalidations=_str_list(obj.get("invalidations")),
+        recommended_structures=_str_list(obj.get("recommended_structures")),
+        risk_notes=_str_list(obj.get("risk_notes")),
+        raw=dict(raw or {}, response=obj),
+    )
+
+
+def parse_packet(text: str) -> ReasoningPacket:
+    """Non-streaming convenience: ReasoningPacket from a full response text."""
+    p = StreamingJsonParser()
+    p.feed(text)
+    obj = p.close()
+    if obj is None:
+        raise ValueError(p.error or "no JSON object in response")
+    return packet_from_obj(obj)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from typing import Dict, List
+
+from rot.core.types import Event
+
+# Bump when the prompt changes: it is part of every cache key.
+PROMPT_VERSION = "v1"
+
+SYSTEM_PROMPT = """You are a skeptical options research assistant.
+You receive an event extracted from Reddit chatter and return ONE JSON object,
+no prose, with exactly these keys:
+  "thesis": string, one or two sentences,
+  "catalyst_window": string (e.g. "earnings 2025-01-30", "intraday", "unknown"),
+  "market_expectation": string, what is likely priced in,
+  "invalidations": list of strings,
+  "recommended_structures": list of strings, defined-risk option structures only,
+  "risk_notes": list of strings.
+Treat Reddit claims as unverified. Never recommend undefined-risk trades."""
+
+_WS = re.compile(r"\s+")
+_EXCERPT_CHARS = 600
+
+
+def _norm(text: str) -> str:
+    return _WS.sub(" ", text).strip()
+
+
+def event_content(e: Event) -> Dict[str, object]:
+    """
+    The parts of an event the model sees, normalized: sorted entities,
+    whitespace-collapsed excerpts ordered by post id. Market data, scores and
+    other volatile meta are left out, so the same post re-detected in a later
+    cycle produces the same content.
+    """
+    evidence = sorted(
+        ({"post_id": ev.post_id, "subreddit": ev.subreddit, "excerpt": _norm(ev.excerpt)[:_EXCERPT_CHARS]} for ev in e.evidence),
+        key=lambda d: (d["post_id"], d["excerpt"]),
+    )
+    return {
+        "event_type": e.event_type,
+        "entities": sorted(set(e.entities)),
+        "stance": e.stance,
+        "time_horizon": e.time_horizon,
+        "evidence": evidence,
+    }
+
+
+def cache_key(e: Event, model: str = "") -> str:
+    """Content address of the request for `e`: sha256 over prompt version, model and content."""
+    payload = json.dumps(
+        {"v": PROMPT_VERSION, "model": model, "event": event_content(e)},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_messages(e: Event) -> List[Dict[str, str]]:
+    user = json.dumps(event_content(e), ensure_ascii=False, indent=1)
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Event:\n{user}\n\nReturn the JSON object."},
+    ]
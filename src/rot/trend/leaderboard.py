@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+from typing import Any, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+from rot.core.types import TrendCandidate
+from rot.market.symbol_validator import ValidationMemo
+
+T = TypeVar("T")
+
+
+class TopK(Generic[T]):
+    """
+    Streaming bounded top-k by score (min-heap of size k).
+
+    items() matches sorted(..., reverse=True)[:k]: ties keep arrival order.
+    """
+
+    def __init__(self, k: int) -> None:
+        self.k = max(0, int(k))
+        self._heap: List[Tuple[float, int, T]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, score: float, item: T) -> None:
+        if self.k == 0:
+            return
+        # -seq: among equal scores the earliest arrival ranks highest
+        entry = (score, -next(self._seq), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List[T]:
+        return [e[2] for e in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+
+class Leaderboards:
+    """
+    All candidate leaderboards for one run, filled in a single pass:
+
+      all            every candidate
+      ticker         candidates with at least one valid symbol, as (candidate, symbols)
+      by_subreddit   per subreddit
+      by_ticker      per valid symbol
+    """
+
+    def __init__(self, n: int = 5, memo: Optional[ValidationMemo] = None) -> None:
+        self.n = n
+        self.memo = memo
+        self.all: TopK[TrendCandidate] = TopK(n)
+        self.ticker: TopK[Tuple[TrendCandidate, List[str]]] = TopK(n)
+        self.by_subreddit: Dict[str, TopK[TrendCandidate]] = {}
+        self.by_ticker: Dict[str, TopK[TrendCandidate]] = {}
+        self.ticker_count = 0
+
+    def add(self, c: TrendCandidate, symbols: Iterable[str] = ()) -> List[str]:
+        """Rank `c`; `symbols` are raw extracted tickers. Returns the valid ones."""
+        score = c.trend_score
+        self.all.push(score, c)
+
+        sub = c.snapshot.post.subreddit
+        board = self.by_subreddit.get(sub)
+        if board is None:
+            board = self.by_subreddit[sub] = TopK(self.n)
+        board.push(score, c)
+
+        good = self.memo.valid_symbols(symbols) if self.memo is not None else sorted(set(symbols))[:5]
+        if good:
+            self.ticker_count += 1
+            self.ticker.push(score, (c, good))
+            for s in good:
+                board = self.by_ticker.get(s)
+                if board is None:
+                    board = self.by_ticker[s] = TopK(self.n)
+                board.push(score, c)
+        return good
+
+    def extend(self, candidates: Iterable[TrendCandidate], extracted: Dict[str, List[str]]) -> None:
+        candidates = list(candidates)
+        if self.memo is not None:
+            # one validator round-trip for every symbol of the run
+            self.memo.prime(s for c in candidates for s in extracted.get(c.key, []))
+        for c in candidates:
+            self.add(c, extracted.get(c.key, []))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "all": len(self.all),
+            "ticker": len(self.ticker),
+            "ticker_candidates": self.ticker_count,
+            "subreddits": len(self.by_subreddit),
+            "tickers": len(self.by_ticker),
+        }
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Iterable, List
 
 from rot.core.types import TrendCandidate
+from rot.trend.leaderboard import TopK
 
 
-def top_n_candidates(candidates: List[TrendCandidate], n: int = 5) -> List[TrendCandidate]:
-    return sorted(candidates, key=lambda c: c.trend_score, reverse=True)[:n]
+def top_n_candidates(candidates: Iterable[TrendCandidate], n: int = 5) -> List[TrendCandidate]:
+    top: TopK[TrendCandidate] = TopK(n)
+    for c in candidates:
+        top.push(c.trend_score, c)
+    return top.items()
@@ -1,30 +1,25 @@
 from __future__ import annotations
 
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from rot.core.types import TrendCandidate
-from rot.market.symbol_validator import SymbolValidator
+from rot.market.symbol_validator import SymbolValidator, ValidationMemo
+from rot.trend.leaderboard import TopK
 
 
 def top_ticker_candidates(
-    candidates: List[TrendCandidate],
+    candidates: Iterable[TrendCandidate],
     extracted: Dict[str, List[str]],
     validator: SymbolValidator,
     n: int = 5,
+    memo: Optional[ValidationMemo] = None,
 ) -> List[Tuple[TrendCandidate, List[str]]]:
-    pairs: List[Tuple[TrendCandidate, List[str]]] = []
+    memo = memo or ValidationMemo(validator)
+    top: TopK[Tuple[TrendCandidate, List[str]]] = TopK(n)
 
     for c in candidates:
-        syms = extracted.get(c.key, [])
-        good = []
-        for s in syms:
-            s2 = validator.normalize(s)
-            if validator.is_valid(s2):
-                good.append(s2)
-        good = sorted(set(good))[:5]
+        good = memo.valid_symbols(extracted.get(c.key, []))
         if good:
-            pairs.append((c, good))
-
-    pairs.sort(key=lambda x: x[0].trend_score, reverse=True)
-    return pairs[:n]
+            top.push(c.trend_score, (c, good))
 
+    return top.items()
@@ -1,46 +1,154 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 from rot.core.types import ThreadSnapshot, TrendCandidate
 from rot.trend.trend_store import TrendStore
 
+# TrendCandidate.features, in the order detect() unpacks them
+_FEATURES = (
+    "score_rate", "comment_rate", "score_rate_last", "comment_rate_last",
+    "score_rate_window", "comment_rate_window", "score_accel", "comment_accel", "samples",
+)
+
+
+def _rates(r: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Rate features from TrendStore.recent(), as (n, 2) arrays of (score,
+    comments): last-interval rate, whole-window rate (oldest in-window sample
+    to newest) and acceleration between the last two intervals.
+    """
+    last3, valid, first = r["last3"], r["valid"], r["first"]
+    ts, x = last3[:, :, 0], last3[:, :, 1:]
+    dt_last = np.maximum(1.0, ts[:, 2] - ts[:, 1])[:, None]
+    dt_prev = np.maximum(1.0, ts[:, 1] - ts[:, 0])[:, None]
+    last = np.where(valid[:, 1, None], (x[:, 2] - x[:, 1]) / dt_last, 0.0)
+    prev = np.where(valid[:, 0, None], (x[:, 1] - x[:, 0]) / dt_prev, 0.0)
+    span = np.maximum(1.0, ts[:, 2] - first[:, 0])[:, None]
+    return {
+        "last": last,
+        "window": np.where(r["samples"][:, None] >= 2, (x[:, 2] - first[:, 1:]) / span, 0.0),
+        "accel": np.where(valid[:, 0, None], (last - prev) / ((dt_last + dt_prev) / 2.0), 0.0),
+    }
+
 
 class TrendEngine:
-    def __init__(self, store: TrendStore, window_s: int = 1800, threshold: float = 0.01) -> None:
+    """
+    Scores posts from their recent (ts, score, num_comments) history.
+
+    Every snapshot is appended to its post's ring buffer in the TrendStore and
+    features for the whole batch are computed at once on NumPy arrays:
+    last-interval, whole-window and EWMA-smoothed rates plus acceleration for
+    both score and comments. trend_score uses the EWMA rates, which the store
+    keeps up to date as samples arrive, so a batch costs O(posts) however deep
+    the rings are; detect() computes the other features for candidates only.
+
+    A post seen for the first time (or whose previous sample fell out of the
+    window) has no rate yet. It is scored from its lifetime rate since
+    `created_utc` but only becomes a candidate at `first_threshold`, which is
+    much stricter than `threshold`: most new posts wait for their second poll,
+    as before, while a post that is already exploding is not held back.
+    None keeps every first sighting out.
+    """
+
+    def __init__(
+        self,
+        store: TrendStore,
+        window_s: int = 1800,
+        threshold: float = 0.01,
+        ewma_halflife_s: float = 300.0,
+        first_threshold: Optional[float] = 1.0,
+    ) -> None:
         self.store = store
         self.window_s = window_s
+        if store.window_s is None:
+            store.window_s = window_s
         self.threshold = threshold
+        self.ewma_halflife_s = ewma_halflife_s
+        store.ewma_halflife_s = ewma_halflife_s
+        self.first_threshold = first_threshold
+
+    def features(self, snapshots: List[ThreadSnapshot]) -> Dict[str, np.ndarray]:
+        """Append `snapshots` to the store and return per-snapshot feature columns."""
+        _, slots, rate, _ = self._score(snapshots)
+        return self._columns(slots, rate)
+
+    def _score(self, snapshots: List[ThreadSnapshot]) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Append `snapshots` to the store. Returns their keys, slots, (n, 2)
+        trend rates (score, comments) and the first-sighting mask; the rates
+        are the store's EWMA, or the lifetime rate for a first sighting.
+        """
+        posts = [snap.post for snap in snapshots]
+        keys = [f"{p.subreddit}:{p.id}" for p in posts]
+        # one comprehension per field: cheaper than filling lists in one loop
+        now = np.array([snap.snapshot_ts for snap in snapshots], dtype=np.int64)
+        score = np.array([p.score for p in posts], dtype=np.float64)
+        com = np.array([p.num_comments for p in posts], dtype=np.float64)
+
+        slots = self.store.append(keys, now, score, com)
+        rate = self.store.ewma.take(slots, axis=0)
+        # the EWMA is unset exactly when the previous sample is not in window
+        first = np.isnan(rate[:, 0])
+        idx = np.flatnonzero(first)
+        if len(idx):
+            created = np.array([posts[i].created_utc for i in idx.tolist()], dtype=np.int64)
+            age = np.maximum(1, now[idx] - created)
+            rate[idx, 0] = score[idx] / age
+            rate[idx, 1] = com[idx] / age
+        return keys, slots, rate, first
+
+    def _columns(self, slots: np.ndarray, rate: np.ndarray) -> Dict[str, np.ndarray]:
+        """Feature columns for already-appended `slots`, in _FEATURES order."""
+        r = self.store.recent(slots, self.window_s)
+        rates = _rates(r)
+        return {
+            "score_rate": rate[:, 0],
+            "comment_rate": rate[:, 1],
+            "score_rate_last": rates["last"][:, 0],
+            "comment_rate_last": rates["last"][:, 1],
+            "score_rate_window": rates["window"][:, 0],
+            "comment_rate_window": rates["window"][:, 1],
+            "score_accel": rates["accel"][:, 0],
+            "comment_accel": rates["accel"][:, 1],
+            "samples": r["samples"].astype(np.float64),
+        }
 
     def detect(self, snapshots: List[ThreadSnapshot]) -> List[TrendCandidate]:
-        out: List[TrendCandidate] = []
-
-        for snap in snapshots:
-            key = f"{snap.post.subreddit}:{snap.post.id}"
-            prev = self.store.update(key, snap)
-            if prev is None:
-                continue
-
-            dt = max(1, snap.snapshot_ts - prev.snapshot_ts)
-            dscore = snap.post.score - prev.post.score
-            dcom = snap.post.num_comments - prev.post.num_comments
-
-            features: Dict[str, float] = {
-                "score_rate": dscore / dt,
-                "comment_rate": dcom / dt,
-            }
-            trend_score = features["score_rate"] + 2.0 * features["comment_rate"]
-
-            if trend_score >= self.threshold:
-                out.append(
-                    TrendCandidate(
-                        key=key,
-                        window_s=self.window_s,
-                        features=features,
-                        trend_score=trend_score,
-                        reason="rate_threshold",
-                        snapshot=snap,
-                    )
-                )
-
-        return out
+        if not snapshots:
+            return []
+
+        keys, slots, rate, first = self._score(snapshots)
+        trend = rate[:, 0] + 2.0 * rate[:, 1]
+        first_threshold = np.inf if self.first_threshold is None else self.first_threshold
+        hits = np.flatnonzero(trend >= np.where(first, first_threshold, self.threshold))
+        if not len(hits):
+            return []
+        # the remaining features only for the hits
+        cols = self._columns(slots[hits], rate[hits])
+
+        window_s = self.window_s
+        # one dict literal per hit from pre-extracted columns, no per-hit NumPy access
+        return [
+            TrendCandidate(
+                keys[i],
+                window_s,
+                {
+                    "score_rate": sr, "comment_rate": cr,
+                    "score_rate_last": sl, "comment_rate_last": cl,
+                    "score_rate_window": sw, "comment_rate_window": cw,
+                    "score_accel": sa, "comment_accel": ca,
+                    "samples": k,
+                },
+                t,
+                "lifetime_rate" if k < 2 else "rate_threshold",
+                snapshots[i],
+            )
+            for i, t, sr, cr, sl, cl, sw, cw, sa, ca, k in zip(
+                hits.tolist(),
+                trend[hits].tolist(),
+                *(cols[name].tolist() for name in _FEATURES),
+            )
+        ]
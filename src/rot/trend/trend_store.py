@@ -1,15 +1,342 @@
 from __future__ import annotations
 
-from typing import Dict, Optional
+from itertools import repeat
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
 
 from rot.core.types import ThreadSnapshot
 
 
+class TrendPoint(NamedTuple):
+    """One (ts, score, num_comments) sample of a post."""
+
+    ts: int
+    score: int
+    num_comments: int
+
+    @classmethod
+    def from_snapshot(cls, snap: ThreadSnapshot) -> "TrendPoint":
+        return cls(int(snap.snapshot_ts), int(snap.post.score), int(snap.post.num_comments))
+
+
 class TrendStore:
-    def __init__(self) -> None:
-        self._last: Dict[str, ThreadSnapshot] = {}
+    """
+    Per-post ring buffers of TrendPoint samples, bounded in time and size.
+
+    Samples live in one (capacity, depth, 3) NumPy array of (ts, score,
+    num_comments), one row ("slot") per `subreddit:post_id`, so the engine can
+    compute features for every tracked post in a handful of array operations
+    and a sample is read or written with a single gather/scatter. append()
+    maps a whole batch of keys to slots with one dict lookup each.
+
+    Every append is also recorded in an append log (slot, sequence number,
+    newest timestamp seen so far), oldest first; an entry is current while it
+    is its slot's latest append. After each append the log is consumed from
+    its head: current entries older than `window_s` are expired, then, past
+    `max_entries`, the next current entries are the least recently updated
+    slots and are evicted. Both cost O(posts in the batch) amortized, never a
+    pass over every tracked post; superseded entries are dropped when the log
+    is compacted. window_s defaults to the owning TrendEngine's window.
+
+    Each slot also carries a time-weighted EWMA of its interval rates
+    (score, comments), folded in as samples are written, so smoothing costs
+    O(posts) per batch instead of a pass over every ring. A gap longer than
+    `window_s` restarts it.
+    """
+
+    def __init__(
+        self,
+        window_s: Optional[int] = None,
+        max_entries: int = 50_000,
+        depth: int = 16,
+        initial_capacity: int = 1024,
+        ewma_halflife_s: float = 300.0,
+    ) -> None:
+        self.window_s = window_s
+        self.max_entries = max(1, int(max_entries))
+        self.depth = max(3, int(depth))
+        self.ewma_halflife_s = ewma_halflife_s
+        self._index: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._newest_ts = 0
+        self._expired = 0
+        self._evicted = 0
+        self._seq = 0
+
+        cap = max(1, int(initial_capacity))
+        self.samples = np.zeros((cap, self.depth, 3), dtype=np.float64)  # (ts, score, num_comments)
+        self.written = np.zeros(cap, dtype=np.int64)  # samples ever written; head = written % depth
+        self.last_ts = np.zeros(cap, dtype=np.int64)
+        self.ewma = np.zeros((cap, 2), dtype=np.float64)  # (score, comments) rate, NaN until started
+        self.touched = np.zeros(cap, dtype=np.int64)  # append sequence number, for LRU
+        self._stamp = np.zeros(cap, dtype=np.intp)  # scratch: batch position, for duplicate checks
+        self.alive = np.zeros(cap, dtype=bool)
+        self.keys = np.empty(cap, dtype=object)
+        self._used = 0
+
+        # append log: slot, sequence number, running max timestamp (non-decreasing)
+        self._log_slot = np.zeros(cap, dtype=np.intp)
+        self._log_seq = np.zeros(cap, dtype=np.int64)
+        self._log_ts = np.zeros(cap, dtype=np.int64)
+        self._log_head = 0
+        self._log_tail = 0
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def capacity(self) -> int:
+        return self.samples.shape[0]
+
+    def _grow(self, need: int) -> None:
+        cap = self.capacity
+        while cap < need:
+            cap *= 2
+        for name in ("samples", "written", "last_ts", "ewma", "touched", "_stamp", "alive", "keys"):
+            old = getattr(self, name)
+            new = np.zeros((cap,) + old.shape[1:], dtype=old.dtype)
+            new[: old.shape[0]] = old
+            setattr(self, name, new)
+
+    def _alloc(self, keys: List[str]) -> np.ndarray:
+        """Fresh slots for `keys` (all new), from the free list first."""
+        n = len(keys)
+        reuse = min(n, len(self._free))
+        slots = self._free[len(self._free) - reuse :]
+        del self._free[len(self._free) - reuse :]
+        extra = n - reuse
+        if extra:
+            if self._used + extra > self.capacity:
+                self._grow(self._used + extra)
+            slots.extend(range(self._used, self._used + extra))
+            self._used += extra
+        out = np.asarray(slots, dtype=np.intp)
+        self.written[out] = 0
+        self.ewma[out] = np.nan
+        self.alive[out] = True
+        self.keys[out] = keys
+        self._index.update(zip(keys, slots))
+        return out
+
+    def _release(self, slots: np.ndarray) -> None:
+        index = self._index
+        for k in self.keys[slots].tolist():
+            del index[k]
+        self.alive[slots] = False
+        self.keys[slots] = None
+        self._free.extend(slots.tolist())
+
+    def append(
+        self,
+        keys: Sequence[str],
+        ts: np.ndarray,
+        score: np.ndarray,
+        comments: np.ndarray,
+    ) -> np.ndarray:
+        """Append one sample per key; returns the slot of each key (same order)."""
+        n = len(keys)
+        slots = np.fromiter(map(self._index.get, keys, repeat(-1)), dtype=np.intp, count=n)
+        new = np.flatnonzero(slots < 0)
+        if len(new):
+            self._alloc(list(dict.fromkeys(keys[i] for i in new.tolist())))
+            slots[new] = [self._index[keys[i]] for i in new.tolist()]
+
+        if not n:
+            return slots
+
+        # later keys in the batch count as more recently updated
+        seq = self._seq + np.arange(n)
+        self.touched[slots] = seq
+        self._seq += n
+
+        if self._distinct(slots):
+            self._write(slots, ts, score, comments)
+        else:
+            # Same post twice in one batch: keep sample order per post.
+            for i in range(n):
+                self._write(slots[i : i + 1], ts[i : i + 1], score[i : i + 1], comments[i : i + 1])
+
+        self._newest_ts = max(self._newest_ts, int(ts.max()))
+        self._log(slots, seq)
+        self._evict()
+        return slots
+
+    def _distinct(self, slots: np.ndarray) -> bool:
+        """No slot twice in `slots`: each position must read back its own stamp."""
+        pos = np.arange(len(slots))
+        self._stamp[slots] = pos
+        return bool((self._stamp.take(slots) == pos).all())
+
+    def _log(self, slots: np.ndarray, seq: np.ndarray) -> None:
+        n = len(slots)
+        if self._log_tail + n > len(self._log_slot):
+            self._compact_log(n)
+        t = self._log_tail
+        self._log_slot[t : t + n] = slots
+        self._log_seq[t : t + n] = seq
+        self._log_ts[t : t + n] = self._newest_ts
+        self._log_tail = t + n
+
+    def _current(self, lo: int, hi: int) -> np.ndarray:
+        """Mask of the log entries in [lo, hi) that are still their slot's latest append."""
+        slots = self._log_slot[lo:hi]
+        return self.alive.take(slots) & (self.touched.take(slots) == self._log_seq[lo:hi])
+
+    def _compact_log(self, extra: int) -> None:
+        """Drop consumed and superseded entries; make room for `extra` more."""
+        h, t = self._log_head, self._log_tail
+        keep = h + np.flatnonzero(self._current(h, t))
+        size = max(len(self._log_slot), 2 * (len(keep) + extra))
+        for name in ("_log_slot", "_log_seq", "_log_ts"):
+            old = getattr(self, name)
+            new = old if size == len(old) else np.zeros(size, dtype=old.dtype)
+            new[: len(keep)] = old.take(keep)
+            setattr(self, name, new)
+        self._log_head, self._log_tail = 0, len(keep)
+
+    def _write(self, slots: np.ndarray, ts: np.ndarray, score: np.ndarray, comments: np.ndarray) -> None:
+        d = self.depth
+        flat = self.samples.reshape(-1)
+        # take()/put() on the flat buffer rather than fancy indexing: same
+        # result, several times faster
+        written = self.written.take(slots)
+        prev = (slots * d + (written - 1) % d) * 3  # newest sample so far
+        prev_ts = flat.take(prev)
+        now = ts.astype(np.float64)
+
+        ok = written > 0
+        if self.window_s is not None:
+            ok &= prev_ts >= now - self.window_s
+        dt = np.maximum(1.0, now - prev_ts)
+        step = np.empty((len(slots), 2))
+        np.subtract(score, flat.take(prev + 1), out=step[:, 0])
+        np.subtract(comments, flat.take(prev + 2), out=step[:, 1])
+        step /= dt[:, None]
+        alpha = -np.expm1(dt * (-np.log(2.0) / self.ewma_halflife_s))
+        old = self.ewma.take(slots, axis=0)
+        ewma = old + alpha[:, None] * (step - old)
+        # NaN marks "not started": the first in-window step seeds the EWMA
+        np.copyto(ewma, step, where=np.isnan(old))
+        ewma[~ok] = np.nan
+        self.ewma[slots] = ewma
+
+        cur = (slots * d + written % d) * 3
+        flat.put(cur, now)
+        flat.put(cur + 1, score)
+        flat.put(cur + 2, comments)
+        self.last_ts[slots] = ts
+        self.written[slots] = written + 1
+
+    def _evict(self) -> None:
+        h, t = self._log_head, self._log_tail
+        if self.window_s is not None:
+            # log timestamps never decrease: the expired entries are a prefix
+            cut = h + int(np.searchsorted(self._log_ts[h:t], self._newest_ts - self.window_s))
+            if cut > h:
+                dead = self._log_slot[h:cut][self._current(h, cut)]
+                if len(dead):
+                    self._release(dead)
+                    self._expired += len(dead)
+                h = cut
+        excess = len(self._index) - self.max_entries
+        while excess > 0 and h < t:
+            # current entries from the head on are the least recently updated slots
+            hi = min(t, h + max(2 * excess, 256))
+            pos = np.flatnonzero(self._current(h, hi))[:excess]
+            if len(pos):
+                self._release(self._log_slot.take(h + pos))
+                self._evicted += len(pos)
+                excess -= len(pos)
+            h = h + int(pos[-1]) + 1 if excess == 0 else hi
+        self._log_head = h
+
+    def window(self, slots: np.ndarray, window_s: Optional[int] = None) -> Tuple[np.ndarray, ...]:
+        """
+        Chronological samples for `slots`, right-aligned so column -1 is the
+        newest sample. Returns (ts, score, comments, valid) arrays of shape
+        (len(slots), depth); `valid` masks unwritten columns and samples older
+        than window_s before each row's newest sample.
+        """
+        d = self.depth
+        written = self.written[slots]
+        flat = slots[:, None] * d + (written[:, None] + np.arange(d)) % d
+        rows = self.samples.reshape(-1, 3)[flat]
+        ts = rows[..., 0].astype(np.int64)
+        valid = np.arange(d) >= (d - np.minimum(written, d)[:, None])
+        window_s = self.window_s if window_s is None else window_s
+        if window_s is not None:
+            valid &= ts >= (ts[:, -1:] - window_s)
+        return ts, rows[..., 1], rows[..., 2], valid
+
+    def recent(self, slots: np.ndarray, window_s: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        What the engine needs per slot, without reordering whole rings:
+        "last3", the newest three samples as (n, 3, 3) rows of (ts, score,
+        num_comments), oldest first, with a "valid" mask like window(); the
+        number of in-window "samples"; "first", the oldest in-window sample
+        (n, 3); and the "ewma" rates (n, 2).
+        """
+        d = self.depth
+        rows = self.samples.reshape(-1, 3)
+        written = self.written.take(slots)
+        count = np.minimum(written, d)
+        base = slots * d
+        window_s = self.window_s if window_s is None else window_s
+
+        last3 = rows.take(base[:, None] + (written[:, None] + np.arange(-3, 0)) % d, axis=0)
+        valid = np.arange(3) >= 3 - count[:, None]
+        # oldest written sample: position 0 until the ring wraps, then head
+        first = base + np.where(written < d, 0, written % d)
+        samples = count
+        if window_s is not None:
+            horizon = last3[:, -1, 0] - window_s
+            valid &= last3[:, :, 0] >= horizon[:, None]
+            # Polls are frequent relative to the window, so usually the whole
+            # ring is in window; only the other rows need a scan.
+            old = np.flatnonzero(rows.take(first, axis=0)[:, 0] < horizon)
+            if len(old):
+                ring = self.samples[slots[old], :, 0]
+                in_window = (np.arange(d) < count[old, None]) & (ring >= horizon[old, None])
+                samples[old] = in_window.sum(axis=1)
+                first[old] = base[old] + np.argmin(np.where(in_window, ring, np.inf), axis=1)
+        return {
+            "last3": last3,
+            "valid": valid,
+            "samples": samples,
+            "first": rows.take(first, axis=0),
+            "ewma": self.ewma.take(slots, axis=0),
+        }
+
+    def update(self, key: str, snap: ThreadSnapshot) -> Optional[TrendPoint]:
+        """Append one snapshot; returns the previous in-window sample, if any."""
+        p = TrendPoint.from_snapshot(snap)
+        slots = self.append([key], np.array([p.ts]), np.array([p.score]), np.array([p.num_comments]))
+        ts, score, comments, valid = self.window(slots)
+        if not valid[0, -2]:
+            return None
+        return TrendPoint(int(ts[0, -2]), int(score[0, -2]), int(comments[0, -2]))
+
+    def get(self, key: str) -> Optional[TrendPoint]:
+        slot = self._index.get(key)
+        if slot is None:
+            return None
+        ts, score, comments = self.samples[slot, (self.written[slot] - 1) % self.depth]
+        return TrendPoint(int(ts), int(score), int(comments))
 
-    def update(self, key: str, snap: ThreadSnapshot) -> Optional[ThreadSnapshot]:
-        prev = self._last.get(key)
-        self._last[key] = snap
-        return prev
+    def stats(self) -> Dict[str, int]:
+        """Entry count, eviction counters and resident size in bytes."""
+        arrays = sum(
+            a.nbytes for a in (self.samples, self.written, self.last_ts, self.ewma, self.touched, self.alive, self.keys)
+        )
+        # ~100 bytes per dict entry + key string
+        index = sum(len(k) + 49 + 100 for k in self._index)
+        return {
+            "entries": len(self._index),
+            "max_entries": self.max_entries,
+            "capacity": self.capacity,
+            "depth": self.depth,
+            "expired": self._expired,
+            "evicted_lru": self._evicted,
+            "approx_bytes": arrays + index,
+        }
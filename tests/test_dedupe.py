@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+from rot.core.types import Event, Evidence, Post, ThreadSnapshot, TrendCandidate
+from rot.extract.dedupe import EventClusterer
+
+STORY = "GME short squeeze incoming as borrow fees spike to record highs this morning"
+
+
+def _pair(post_id: str, title: str, ts: int, score: float = 1.0) -> Tuple[TrendCandidate, Event]:
+    post = Post(post_id, ts, "wallstreetbets", title, "", f"/r/wsb/{post_id}", 10, 5, 0.9, "u_" + post_id, "")
+    cand = TrendCandidate(f"wallstreetbets:{post_id}", 1800, {}, score, "rate_threshold", ThreadSnapshot(ts, post))
+    ev = Event("other", ["GME"], "unknown", "unknown", [Evidence(post_id, post.permalink, post.subreddit, title)], 0.3, {})
+    return cand, ev
+
+
+def test_duplicates_in_one_run_become_one_event():
+    events = EventClusterer().cluster([_pair("a", STORY, 100, 2.0), _pair("b", STORY + "!!", 100, 1.0)])
+    assert len(events) == 1
+    assert [ev.post_id for ev in events[0].evidence] == ["a", "b"]
+    assert events[0].meta["cluster"]["size"] == 2
+
+
+def test_late_repost_of_emitted_story_is_dropped():
+    cl = EventClusterer()
+    assert len(cl.cluster([_pair("a", STORY, 100)])) == 1
+    assert cl.cluster([_pair("b", STORY + "!!", 200)]) == []
+    # the original post still trending is not a repost
+    assert len(cl.cluster([_pair("a", STORY, 300)])) == 1
+
+
+def test_repost_kept_when_cluster_never_produced_an_event():
+    cl = EventClusterer()
+    # indexed, but its event never came out of cluster()
+    cl.index.add("a", 100, STORY.lower(), ["GME"], Evidence("a", "", "wallstreetbets", STORY))
+    assert len(cl.cluster([_pair("b", STORY + "!!", 200)])) == 1
+    assert cl.cluster([_pair("c", STORY + "??", 300)]) == []
+
+
+def test_unrelated_posts_stay_apart():
+    other = "Fed minutes hint at a pause while treasury yields slide across the curve"
+    assert len(EventClusterer().cluster([_pair("a", STORY, 100), _pair("x", other, 100)])) == 2
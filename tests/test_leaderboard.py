@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import random
+
+from rot.trend.leaderboard import TopK
+
+
+def test_topk_matches_sorted():
+    rng = random.Random(3)
+    for k in (0, 1, 5, 50):
+        # few distinct scores, so ties are common
+        items = [(float(rng.randint(0, 20)), i) for i in range(500)]
+        top: TopK[int] = TopK(k)
+        for score, i in items:
+            top.push(score, i)
+        want = [i for _, i in sorted(items, key=lambda x: x[0], reverse=True)[:k]]
+        assert top.items() == want
+        assert len(top) == min(k, len(items))
+
+
+def test_topk_ties_keep_arrival_order():
+    top: TopK[str] = TopK(2)
+    for name in ("a", "b", "c"):
+        top.push(1.0, name)
+    assert top.items() == ["a", "b"]
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from rot.market.provider import InMemoryProvider, YFinanceProvider
+
+
+def test_concurrent_quotes_share_one_fetch():
+    provider = InMemoryProvider({"AAPL": [1.0, 2.0], "MSFT": [3.0]}, latency_s=0.2)
+    start = threading.Barrier(8)
+    results: List[Dict[str, Dict[str, Any]]] = []
+
+    def ask() -> None:
+        start.wait()
+        results.append(provider.quotes(["AAPL", "MSFT"]))
+
+    threads = [threading.Thread(target=ask) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    fetched = [s for call in provider.calls for s in call]
+    assert sorted(fetched) == ["AAPL", "MSFT"]
+    assert len(results) == 8
+    for r in results:
+        assert r["AAPL"]["last_close"] == 2.0
+        assert r["MSFT"]["last_close"] == 3.0
+
+
+def test_failed_fetch_is_transient_for_waiters_too():
+    class Broken(InMemoryProvider):
+        def _fetch_quotes(self, symbols):
+            raise ConnectionError("down")
+
+    out = Broken().quotes(["AAPL"])
+    assert out["AAPL"]["transient"] is True
+    assert Broken().exists(["AAPL"]) == {"AAPL": None}
+
+
+class _FakeYahoo(YFinanceProvider):
+    """YFinanceProvider with canned yf.download frames; `up` is whether Yahoo answers."""
+
+    def __init__(self, closes: Dict[str, List[float]], up: bool = True, **kw: Any) -> None:
+        super().__init__(session=object(), **kw)
+        self.closes = closes
+        self.up = up
+        self.downloads: List[List[str]] = []
+
+    def _download(self, chunk: List[str]) -> Optional[pd.DataFrame]:
+        self.downloads.append(list(chunk))
+        have = {s: self.closes[s] for s in chunk if self.up and s in self.closes}
+        if not have:
+            return pd.DataFrame()
+        frames = {(s, "Close"): pd.Series(c) for s, c in have.items()}
+        return pd.DataFrame(frames)
+
+
+def test_empty_chunk_with_sentinel_up_is_a_real_miss():
+    p = _FakeYahoo({"SPY": [500.0], "AAPL": [1.0]}, chunk_size=2)
+    out = p.exists(["BADA", "BADB", "AAPL"])
+    assert out == {"BADA": False, "BADB": False, "AAPL": True}
+    assert ["SPY"] in p.downloads
+
+
+def test_empty_chunk_with_sentinel_down_is_transient():
+    p = _FakeYahoo({"SPY": [500.0], "AAPL": [1.0]}, up=False, chunk_size=2)
+    assert p.exists(["BADA", "BADB", "AAPL"]) == {"BADA": None, "BADB": None, "AAPL": None}
+    # the sentinel is asked once per fetch, not per chunk
+    assert p.downloads.count(["SPY"]) == 1
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import pytest
+
+from rot.ingest.scheduler import PollScheduler
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.t = 0.0
+        self.slept: list = []
+
+    def __call__(self) -> float:
+        return self.t
+
+    def sleep(self, s: float) -> None:
+        self.slept.append(s)
+        self.t += s
+
+
+BUSY, QUIET = ("wallstreetbets", "new"), ("stocks", "hot")
+
+
+def _scheduler(clock: _FakeClock, **kw) -> PollScheduler:
+    return PollScheduler([BUSY, QUIET], base_interval_s=20.0, coalesce_s=0.0, clock=clock, sleep=clock.sleep, **kw)
+
+
+def test_everything_due_at_start_then_waits_an_interval():
+    clock = _FakeClock()
+    sched = _scheduler(clock)
+    assert sched.wait() == [BUSY, QUIET]
+    assert clock.slept == []
+    sched.record(BUSY, listed=100, changed=10)
+    sched.record(QUIET, listed=100, changed=10)
+    assert sched.wait() == [BUSY, QUIET]
+    assert clock.slept == [20.0]
+
+
+def test_busy_source_polled_more_often_within_budget():
+    clock = _FakeClock()
+    sched = _scheduler(clock)
+    polls = {BUSY: 0, QUIET: 0}
+    while clock.t < 3600:
+        for src in sched.wait():
+            polls[src] += 1
+            sched.record(src, listed=100, changed=50 if src == BUSY else 2)
+    assert polls[BUSY] > 2 * polls[QUIET]
+    busy, quiet = sched.states[BUSY], sched.states[QUIET]
+    assert busy.interval_s < 20.0 < quiet.interval_s
+    # same request budget as polling both every 20s
+    assert sched.projected_rpm() == pytest.approx(6.0, rel=0.01)
+
+
+def test_late_source_resyncs_instead_of_bursting():
+    clock = _FakeClock()
+    sched = _scheduler(clock)
+    sched.wait()
+    clock.t = 500.0  # stalled for many intervals
+    sched.record(BUSY, listed=100, changed=10)
+    assert sched.states[BUSY].overruns == 1
+    assert sched.states[BUSY].next_due == 500.0
+
+
+def test_rejects_bad_config():
+    with pytest.raises(ValueError):
+        PollScheduler([])
+    with pytest.raises(ValueError):
+        PollScheduler([BUSY], min_change=1.0)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import json
+import time
+
+from rot.ingest.seen_store import SeenStore, SqliteSeenStore
+
+
+def test_sqlite_dedupes_unchanged_posts(tmp_path):
+    store = SqliteSeenStore(path=str(tmp_path / "seen.sqlite3"), import_json=None)
+    items = [("a", 10, 1), ("b", 5, 0)]
+    assert store.is_changed_many(items) == [True, True]
+    now = int(time.time())
+    for pid, score, nc in items:
+        store.update(pid, score, nc, now)
+    # pending updates count before save()
+    assert store.is_changed_many(items + [("a", 11, 1), ("b", 5, 2), ("c", 0, 0)]) == [
+        False, False, True, True, True,
+    ]
+    store.close()
+
+    reopened = SqliteSeenStore(path=str(tmp_path / "seen.sqlite3"), import_json=None)
+    assert reopened.is_changed_many(items) == [False, False]
+    assert len(reopened) == 2
+    reopened.close()
+
+
+def test_sqlite_expires_old_records(tmp_path):
+    now = int(time.time())
+    store = SqliteSeenStore(path=str(tmp_path / "seen.sqlite3"), import_json=None, horizon_s=3600)
+    store.update("old", 1, 1, now - 7200)
+    store.update("new", 1, 1, now - 60)
+    store.save()  # the horizon applies on save
+    assert store.get("old") is None
+    assert store.get("new") is not None
+    assert store.expire(now) == 1
+    assert len(store) == 0
+    store.close()
+
+
+def test_sqlite_imports_json_state_once(tmp_path):
+    legacy = tmp_path / "seen.json"
+    legacy.write_text(json.dumps({"a": {"score": 3, "num_comments": 1, "last_seen_ts": 1}}), encoding="utf-8")
+    store = SqliteSeenStore(path=str(tmp_path / "seen.sqlite3"), import_json=str(legacy))
+    assert store.is_changed_many([("a", 3, 1)]) == [False]
+    store.close()
+
+    js = SeenStore(str(legacy))
+    assert js.is_changed("a", 3, 1) is False
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Set
+
+from rot.market.provider import InMemoryProvider, _error, quote_from_closes
+from rot.market.symbol_validator import SymbolValidator
+
+
+class _Flaky(InMemoryProvider):
+    """InMemoryProvider whose lookups for `down` symbols fail (transient)."""
+
+    def __init__(self, closes: Dict[str, List[float]]) -> None:
+        super().__init__(closes)
+        self.down: Set[str] = set()
+
+    def _fetch_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        self.calls.append(list(symbols))
+        return {
+            s: _error(s, "timeout") if s in self.down else quote_from_closes(s, self.closes.get(s, []))
+            for s in symbols
+        }
+
+
+class _Clock:
+    def __init__(self, t: float = 1_700_000_000.0) -> None:
+        self.t = t
+
+    def __call__(self) -> float:
+        return self.t
+
+
+def _validator(tmp_path, provider, clock, **kw) -> SymbolValidator:
+    return SymbolValidator(
+        cache_path=str(tmp_path / "valid.json"), provider=provider, clock=clock,
+        ttl_s=1000, negative_ttl_s=100, retry_s=10, **kw,
+    )
+
+
+def test_positive_and_negative_ttl(tmp_path):
+    provider, clock = _Flaky({"AAPL": [1.0, 2.0]}), _Clock()
+    v = _validator(tmp_path, provider, clock)
+    assert v.validate_many(["AAPL", "ZZZZ"]) == {"AAPL": True, "ZZZZ": False}
+    assert provider.calls == [["AAPL", "ZZZZ"]]
+
+    clock.t += 50  # both cached
+    assert v.validate_many(["aapl", "$ZZZZ"]) == {"AAPL": True, "ZZZZ": False}
+    assert len(provider.calls) == 1
+
+    clock.t += 100  # negative verdict expired, positive one not
+    v.validate_many(["AAPL", "ZZZZ"])
+    assert provider.calls[-1] == ["ZZZZ"]
+
+    clock.t += 1000  # positive verdict expired too
+    v.validate_many(["AAPL"])
+    assert provider.calls[-1] == ["AAPL"]
+
+
+def test_transient_failure_is_not_a_verdict(tmp_path):
+    provider, clock = _Flaky({"MSFT": [3.0]}), _Clock()
+    provider.down.add("MSFT")
+    v = _validator(tmp_path, provider, clock)
+    assert v.validate_many(["MSFT"]) == {"MSFT": False}
+
+    clock.t += 5  # backing off: no lookup
+    assert v.validate_many(["MSFT"]) == {"MSFT": False}
+    assert len(provider.calls) == 1
+
+    provider.down.clear()
+    clock.t += 10  # retry_s passed
+    assert v.validate_many(["MSFT"]) == {"MSFT": True}
+    assert len(provider.calls) == 2
+
+
+def test_verdicts_persist_but_failures_do_not(tmp_path):
+    provider, clock = _Flaky({"AAPL": [1.0]}), _Clock()
+    provider.down.add("NVDA")
+    v = _validator(tmp_path, provider, clock)
+    v.validate_many(["AAPL", "NVDA", "ZZZZ"])
+    v.flush()
+
+    again = _validator(tmp_path, _Flaky({}), clock)
+    assert again.validate_many(["AAPL", "ZZZZ"]) == {"AAPL": True, "ZZZZ": False}
+    assert again.provider.calls == []
+    again.validate_many(["NVDA"])
+    assert again.provider.calls == [["NVDA"]]